@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from queryplan.attribution import operator_name
+from queryplan.plannode import InnerNode, PlanNode
+from queryplan.queryoperator import OperatorType
+from queryplan.queryplan import decode_query_plan
+from util import logger
+from util.resultcsv import read_results
+
+
+# columns of the query a plan belongs to, repeated for every operator
+query_columns = ["title", "dbms", "version", "query", "plan_fingerprint"]
+
+# columns of the operators
+node_columns = ["node_id", "parent_id", "depth", "operator", "operator_type", "join_type", "method", "table_name", "tables",
+                "estimated_cardinality", "exact_cardinality", "self_time", "cumulative_time", "peak_memory", "loops"]
+
+
+def plan_features(plan: PlanNode) -> Dict[str, list]:
+    """
+    Flatten a plan into one row per operator. Nodes are numbered in pre-order, the parent of the root is -1. The result
+    operator added by the parsers is skipped.
+
+    Args:
+        plan (PlanNode): The root of the plan.
+
+    Returns:
+        Dict[str, list]: The node columns, see `node_columns`. `tables` are the base tables in the subtree of an
+        operator, sorted and separated by commas.
+    """
+    if plan.operator.operator_type == OperatorType.Result and isinstance(plan, InnerNode) and len(plan.children) == 1:
+        plan = plan.children[0]
+
+    columns = {column: [] for column in node_columns}
+    tables = []
+    # pre-order with an explicit stack of nodes with their parent's id and their depth
+    stack = [(plan, -1, 0)]
+    while stack:
+        node, parent_id, depth = stack.pop()
+        node_id = len(tables)
+        operator = node.operator
+        table_name = getattr(operator, "table_name", None)
+
+        columns["node_id"].append(node_id)
+        columns["parent_id"].append(parent_id)
+        columns["depth"].append(depth)
+        columns["operator"].append(operator_name(operator))
+        columns["operator_type"].append(operator.operator_type.name)
+        columns["join_type"].append(getattr(operator, "type", None) if operator.operator_type in [OperatorType.Join, OperatorType.GroupJoin] else None)
+        columns["method"].append(getattr(operator, "method", None))
+        columns["table_name"].append(table_name)
+        columns["estimated_cardinality"].append(node.estimated_cardinality)
+        columns["exact_cardinality"].append(node.exact_cardinality)
+        columns["self_time"].append(node.self_time)
+        columns["cumulative_time"].append(node.cumulative_time)
+        columns["peak_memory"].append(node.peak_memory)
+        columns["loops"].append(node.loops)
+        tables.append({table_name.lower()} if table_name else set())
+
+        if isinstance(node, InnerNode):
+            stack.extend((child, node_id, depth + 1) for child in reversed(node.children))
+
+    # children follow their parent in pre-order, so the tables of all children are complete before their parent's
+    parent_ids = columns["parent_id"]
+    for node_id in range(len(tables) - 1, 0, -1):
+        tables[parent_ids[node_id]] |= tables[node_id]
+    columns["tables"] = [",".join(sorted(t)) for t in tables]
+    return columns
+
+
+def _row_features(row: dict) -> Optional[Dict[str, list]]:
+    try:
+        columns = plan_features(decode_query_plan(row["plan"]).plan)
+    except Exception as e:
+        logger.log_warn(f"Could not export the plan of {row['title']} {row['query']}: {type(e).__name__}: {e}")
+        return None
+
+    nodes = len(columns["node_id"])
+    for column in query_columns:
+        columns[column] = [row.get(column) or ""] * nodes
+    runtime = float(row["client_total_median"]) if row.get("client_total_median") else float("nan")
+    columns["runtime"] = [runtime] * nodes
+    return columns
+
+
+def load_features(filenames: List[str], workers: Optional[int] = None) -> pd.DataFrame:
+    """
+    Flatten the plans of all successful queries in the result csvs into a table with one row per operator. Plans are
+    decoded and flattened by a pool of processes.
+
+    Args:
+        filenames (List[str]): The result csvs with query plans.
+        workers (Optional[int]): The number of processes (default: the number of cpus).
+
+    Returns:
+        pd.DataFrame: One row per operator with a `plan_id` unique over all plans, the columns of the query and of the
+        operator, and the median runtime of the query (ms).
+    """
+    rows = []
+    for filename in filenames:
+        rows.extend({column: row.get(column) for column in query_columns + ["state", "plan", "client_total_median"]}
+                    for row in read_results(filename) if row.get("plan") and row.get("state") == "success")
+    logger.log_driver(f"Exporting {len(rows)} plans")
+
+    columns = {column: [] for column in ["plan_id"] + query_columns + ["runtime"] + node_columns}
+    plans = 0
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for features in executor.map(_row_features, rows, chunksize=16):
+            if features is None:
+                continue
+            columns["plan_id"].extend([plans] * len(features["node_id"]))
+            for column, values in features.items():
+                columns[column].extend(values)
+            plans += 1
+
+    df = pd.DataFrame(columns)
+    for column in ["estimated_cardinality", "exact_cardinality", "self_time", "cumulative_time", "peak_memory", "loops", "runtime"]:
+        df[column] = pd.to_numeric(df[column], errors="coerce").astype("float64")
+    return df
+
+
+def save_features(df: pd.DataFrame, output: str):
+    """
+    Write the operator table as Parquet or, for `.npz` files, as one compressed NumPy array per column. Missing strings
+    become empty strings and missing numbers NaN in NumPy arrays.
+
+    Args:
+        df (pd.DataFrame): The operator table.
+        output (str): The output file, `.parquet` or `.npz`.
+    """
+    if os.path.dirname(output):
+        os.makedirs(os.path.dirname(output), exist_ok=True)
+
+    if output.endswith(".npz"):
+        arrays = {}
+        for column in df.columns:
+            if pd.api.types.is_numeric_dtype(df[column]):
+                arrays[column] = df[column].to_numpy()
+            else:
+                arrays[column] = np.array(df[column].fillna("").astype(str).tolist(), dtype=str)
+        np.savez_compressed(output, **arrays)
+    else:
+        df.to_parquet(output, index=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the operators of the query plans in result csvs as columnar table for learned cost models")
+    parser.add_argument("filenames", nargs="+", help="result csvs with query plans")
+    parser.add_argument("-o", "--output", dest="output", required=True, help="output file, .parquet or .npz")
+    parser.add_argument("-j", "--workers", dest="workers", type=int, default=None, help="number of processes (default: number of cpus)")
+    args = parser.parse_args()
+
+    df = load_features(args.filenames, args.workers)
+    save_features(df, args.output)
+    logger.log_driver(f"Wrote {len(df)} operators of {df['plan_id'].nunique()} plans to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+import argparse
+import csv
+import math
+from collections import defaultdict
+from statistics import geometric_mean, median
+from typing import Dict, List
+
+from natsort import natsorted
+
+from util import formatter, logger
+
+
+def load_join_orders(filenames: List[str]) -> Dict[tuple, dict]:
+    """
+    Load the runtimes of the forced join orders of the join order exploration.
+
+    Args:
+        filenames (List[str]): The `_joinorders.csv` files.
+
+    Returns:
+        Dict[tuple, dict]: The runtime of the optimizer's plan and the runtimes of the orders per title and query. Orders
+        that did not finish have no runtime.
+    """
+    queries = defaultdict(lambda: {"optimizer": math.nan, "orders": {}})
+    for filename in filenames:
+        with open(filename, "r") as file:
+            for row in csv.DictReader(file):
+                entry = queries[(row["title"], row["query"])]
+                entry["optimizer"] = float(row["optimizer_median"])
+                entry["orders"][row["join_order"]] = float(row["client_total_median"]) if row["state"] == "success" else None
+    return queries
+
+
+def rank(optimizer: float, orders: Dict[str, float]) -> dict:
+    """
+    Place the optimizer's plan among the forced join orders. Orders that did not finish are slower than the optimizer's
+    plan, as they only time out after its runtime.
+
+    Args:
+        optimizer (float): The runtime of the optimizer's plan (ms).
+        orders (Dict[str, float]): The runtimes of the orders (ms), None for orders that did not finish.
+
+    Returns:
+        dict: The `rank` of the optimizer's plan (1 = no order is faster), the `fraction` of orders that are faster, the
+        `best` order if it is faster than the optimizer's plan, the best runtime, and the `slowdown` of the optimizer's
+        plan over the best runtime.
+    """
+    finished = {order: runtime for order, runtime in orders.items() if runtime is not None}
+    faster = sum(runtime < optimizer for runtime in finished.values())
+    best = min(finished, key=finished.get) if finished else None
+    if best is not None and finished[best] >= optimizer:
+        best = None
+    best_runtime = finished[best] if best is not None else optimizer
+    return {
+        "rank": faster + 1,
+        "fraction": faster / len(orders) if orders else math.nan,
+        "best": best,
+        "best_runtime": best_runtime,
+        "slowdown": optimizer / best_runtime if best_runtime > 0 else math.nan,
+        "finished": len(finished),
+    }
+
+
+def report(filenames: List[str]):
+    """
+    Report the rank of the optimizer's join order among the forced left-deep orders of every query and the slowdown of
+    the optimizer's plan over the best order as a measure of plan quality.
+
+    Args:
+        filenames (List[str]): The `_joinorders.csv` files.
+    """
+    queries = load_join_orders(filenames)
+    if not queries:
+        logger.log_warn("No join orders found, enable `join_orders` in the benchmark definition")
+        return
+
+    for title in natsorted({title for title, _ in queries}):
+        logger.log_header(title)
+        slowdowns = []
+        fractions = []
+        optimal = 0
+        names = natsorted(query for t, query in queries if t == title)
+        for query in names:
+            entry = queries[(title, query)]
+            ranked = rank(entry["optimizer"], entry["orders"])
+            slowdowns.append(ranked["slowdown"])
+            fractions.append(ranked["fraction"])
+            optimal += ranked["rank"] == 1
+            print(f"{query.ljust(10)} rank {str(ranked['rank']).rjust(4)} of {str(len(entry['orders']) + 1).ljust(4)} "
+                  f"({ranked['fraction'] * 100:5.1f}% of the orders faster, {ranked['finished']} finished)  "
+                  f"optimizer {formatter.format_time(entry['optimizer']).rjust(12)}  best {formatter.format_time(ranked['best_runtime']).rjust(12)}  "
+                  f"{ranked['slowdown']:.2f}x  {ranked['best'] or ''}")
+
+        valid = [slowdown for slowdown in slowdowns if not math.isnan(slowdown) and slowdown > 0]
+        logger.log_driver(f"optimizer's join order is the fastest in {optimal} of {len(names)} queries, "
+                          f"slowdown over the best order: {geometric_mean(valid) if valid else math.nan:.2f}x (geomean), "
+                          f"median fraction of faster orders: {median(fractions) * 100:.1f}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rank the optimizer's join order among the forced left-deep join orders of the join order exploration")
+    parser.add_argument("filenames", nargs="+", help="_joinorders.csv files")
+    args = parser.parse_args()
+
+    report(args.filenames)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+import argparse
+import string
+from collections import defaultdict
+from typing import Dict, List
+
+from natsort import natsorted
+
+from queryplan.jointree import JoinTree, extract_join_trees
+from queryplan.queryplan import decode_query_plan
+from util import formatter, logger
+from util.resultcsv import read_results
+
+
+def format_cardinality(cardinality) -> str:
+    return "?" if cardinality is None else "{:,}".format(int(cardinality)).replace(",", "'")
+
+
+def load_join_trees(filenames: List[str], titles: List[str] = None, queries: List[str] = None) -> Dict[str, Dict[str, dict]]:
+    """
+    Load the main join tree, i.e., the one joining the most tables, of every query plan in the result csvs.
+
+    Args:
+        filenames (List[str]): The result csvs with query plans.
+        titles (List[str]): The systems to compare (default: all).
+        queries (List[str]): The queries to compare (default: all).
+
+    Returns:
+        Dict[str, Dict[str, dict]]: The canonical join tree and the median runtime per query and system.
+    """
+    trees = defaultdict(dict)
+    for filename in filenames:
+        for row in read_results(filename):
+            if not row.get("plan") or (titles and row["title"] not in titles) or (queries and row["query"] not in queries):
+                continue
+
+            forest = extract_join_trees(decode_query_plan(row["plan"]).plan)
+            if not forest:
+                continue
+            tree = max(forest, key=lambda t: len(t.tables)).canonical()
+            trees[row["query"]][row["title"]] = {"tree": tree, "runtime": float(row["client_total_median"])}
+    return trees
+
+
+def intermediate_results(tree: JoinTree) -> int:
+    """
+    Returns:
+        int: The sum of the exact cardinalities of all joins (C_out), the classic cost of a join order.
+    """
+    return sum(join.exact_cardinality or 0 for join in tree.joins())
+
+
+def report(filenames: List[str], titles: List[str] = None, queries: List[str] = None, verbose: bool = False):
+    """
+    Compare the join orders of the systems per query. Systems with the same join order get the same letter, so that a
+    runtime difference can be attributed either to the join order or to the execution of the same order.
+
+    Args:
+        filenames (List[str]): The result csvs with query plans.
+        titles (List[str]): The systems to compare (default: all).
+        queries (List[str]): The queries to compare (default: all).
+        verbose (bool): Whether to print the intermediate cardinalities of every join.
+    """
+    trees = load_join_trees(filenames, titles, queries)
+
+    # title -> [queries with the join order of the fastest system, queries]
+    same_as_fastest = defaultdict(lambda: [0, 0])
+
+    for query in natsorted(trees.keys()):
+        systems = trees[query]
+        logger.log_header(f"Query {query}")
+
+        orders = {}
+        for title in systems:
+            orders.setdefault(str(systems[title]["tree"]), string.ascii_uppercase[len(orders) % 26])
+
+        fastest = min(systems, key=lambda title: systems[title]["runtime"])
+        for title in sorted(systems, key=lambda title: systems[title]["runtime"]):
+            tree = systems[title]["tree"]
+            order = orders[str(tree)]
+            print(f"  {order}  {title.ljust(24)} {formatter.format_time(systems[title]['runtime']).rjust(14)}  "
+                  f"{tree.shape.ljust(6)}  C_out {format_cardinality(intermediate_results(tree)).rjust(15)}  {tree}")
+            if verbose:
+                for join in tree.joins():
+                    print(f"        {format_cardinality(join.estimated_cardinality).rjust(15)} est {format_cardinality(join.exact_cardinality).rjust(15)} exact  "
+                          f"{join.method or ''} {' ⋈ '.join(sorted(join.tables))}")
+
+            same_as_fastest[title][0] += str(tree) == str(systems[fastest]["tree"])
+            same_as_fastest[title][1] += 1
+
+    logger.log_header("Join order of the fastest system")
+    for title, (same, total) in same_as_fastest.items():
+        logger.log_driver(f"{title} used the join order of the fastest system in {same} of {total} queries")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the join orders of the systems in result csvs")
+    parser.add_argument("filenames", nargs="+", help="result csvs with query plans")
+    parser.add_argument("-t", "--titles", dest="titles", nargs="*", default=None, help="systems to compare (default: all)")
+    parser.add_argument("-q", "--queries", dest="queries", nargs="*", default=None, help="queries to compare (default: all)")
+    parser.add_argument("-v", "--verbose", dest="verbose", default=False, action="store_true", help="print the intermediate cardinalities")
+    args = parser.parse_args()
+
+    report(args.filenames, args.titles, args.queries, args.verbose)
+
+
+if __name__ == "__main__":
+    main()
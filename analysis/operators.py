@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+import argparse
+from collections import defaultdict
+from typing import Dict, List
+
+from queryplan.attribution import operator_name, plan_nodes, top_operators
+from queryplan.plannode import PlanNode
+from queryplan.queryplan import decode_query_plan
+from util import formatter, logger
+from util.resultcsv import read_results
+
+
+def describe(node: PlanNode) -> str:
+    """
+    Returns:
+        str: A short description of the operator of a plan node, e.g., `Join (hash)` or `TableScan lineitem`.
+    """
+    operator = node.operator
+    description = operator_name(operator)
+    if getattr(operator, "method", None):
+        description += f" ({operator.method})"
+    if getattr(operator, "table_name", None):
+        description += f" {operator.table_name}"
+    return description
+
+
+def summarize(filenames: List[str], k: int, queries: List[str] = None):
+    """
+    Report the k most expensive operators of each query and the share of the runtime per operator class of each system.
+
+    Args:
+        filenames (List[str]): The result csvs with query plans.
+        k (int): The number of operators to report per query.
+        queries (List[str]): The queries to report (default: all queries).
+    """
+    # title -> operator class -> self time
+    classes: Dict[str, Dict[str, float]] = defaultdict(lambda: defaultdict(float))
+
+    for filename in filenames:
+        logger.log_header(filename)
+        for row in read_results(filename):
+            if not row.get("plan") or (queries and row["query"] not in queries):
+                continue
+
+            plan = decode_query_plan(row["plan"]).plan
+            total = plan.cumulative_time
+            if total is None:
+                logger.log_warn_verbose(f"{row['title']} does not report operator times for {row['query']}")
+                continue
+
+            for node in plan_nodes(plan):
+                if node.self_time is not None:
+                    classes[row["title"]][operator_name(node.operator)] += node.self_time
+
+            logger.log_driver(f"{row['title']} {row['query']} ({formatter.format_time(total)})")
+            for node in top_operators(plan, k):
+                share = node.self_time / total * 100 if total > 0 else 0
+                memory = f", {node.peak_memory / 2 ** 20:.1f} MiB" if node.peak_memory is not None else ""
+                print(f"    {formatter.format_time(node.self_time).rjust(14)} {share:5.1f}%  {describe(node)}{memory}")
+
+    logger.log_header("Runtime per operator class")
+    for title, times in classes.items():
+        total = sum(times.values())
+        logger.log_driver(f"{title} ({formatter.format_time(total)})")
+        for name, time in sorted(times.items(), key=lambda item: item[1], reverse=True):
+            share = time / total * 100 if total > 0 else 0
+            print(f"    {formatter.format_time(time).rjust(14)} {share:5.1f}%  {name}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report the most expensive operators of the query plans in result csvs")
+    parser.add_argument("filenames", nargs="+", help="result csvs with query plans")
+    parser.add_argument("-k", dest="k", type=int, default=5, help="number of operators per query (default: 5)")
+    parser.add_argument("-q", "--queries", dest="queries", nargs="*", default=None, help="queries to report (default: all)")
+    args = parser.parse_args()
+
+    summarize(args.filenames, args.k, args.queries)
+
+
+if __name__ == "__main__":
+    main()
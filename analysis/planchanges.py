@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+import argparse
+import math
+from typing import Dict, List
+
+from natsort import natsorted
+
+from queryplan.fingerprint import plan_fingerprint, plan_structure
+from queryplan.queryplan import decode_query_plan
+from util import formatter, logger
+from util.resultcsv import read_results
+
+
+def load_plans(filenames: List[str], by: str, configuration: str) -> Dict[str, dict]:
+    """
+    Load the plan fingerprints and runtimes of one system configuration.
+
+    Args:
+        filenames (List[str]): The result csvs.
+        by (str): The column identifying the configuration, i.e., title or version.
+        configuration (str): The value of the column.
+
+    Returns:
+        Dict[str, dict]: The fingerprint, structure, and median runtime per query.
+    """
+    plans = {}
+    for filename in filenames:
+        for row in read_results(filename):
+            if row[by] != configuration or not row.get("plan"):
+                continue
+
+            query_plan = decode_query_plan(row["plan"])
+            plans[row["query"]] = {
+                # results written before fingerprints were stored only contain the plan
+                "fingerprint": row.get("plan_fingerprint") or plan_fingerprint(query_plan),
+                "structure": plan_structure(query_plan.plan),
+                "runtime": float(row["client_total_median"]),
+            }
+    return plans
+
+
+def report(filenames: List[str], by: str, baseline: str, candidate: str, show: bool = False):
+    """
+    List the queries whose plan differs between two system configurations, together with their runtime delta.
+
+    Args:
+        filenames (List[str]): The result csvs with query plans.
+        by (str): The column identifying the configurations, i.e., title or version.
+        baseline (str): The baseline configuration.
+        candidate (str): The candidate configuration.
+        show (bool): Whether to print the structure of changed plans.
+    """
+    baseline_plans = load_plans(filenames, by, baseline)
+    candidate_plans = load_plans(filenames, by, candidate)
+    queries = natsorted(set(baseline_plans.keys()) & set(candidate_plans.keys()))
+    if not queries:
+        logger.log_warn(f"No queries with plans for both {baseline} and {candidate}")
+        return
+
+    changed = [query for query in queries if baseline_plans[query]["fingerprint"] != candidate_plans[query]["fingerprint"]]
+
+    logger.log_header(f"Plan changes from {baseline} to {candidate}")
+    for query in changed:
+        old, new = baseline_plans[query], candidate_plans[query]
+        delta = new["runtime"] - old["runtime"]
+        ratio = new["runtime"] / old["runtime"] if old["runtime"] > 0 else math.nan
+        print(f"{query.ljust(10)} {formatter.format_time(old['runtime']).rjust(14)} -> {formatter.format_time(new['runtime']).rjust(14)}  "
+              f"{'+' if delta >= 0 else '-'}{formatter.format_time(abs(delta))} ({ratio:.2f}x)")
+        if show:
+            print(f"    - {old['structure']}")
+            print(f"    + {new['structure']}")
+
+    unchanged = [query for query in queries if query not in changed]
+    changed_delta = sum(candidate_plans[query]["runtime"] - baseline_plans[query]["runtime"] for query in changed)
+    unchanged_delta = sum(candidate_plans[query]["runtime"] - baseline_plans[query]["runtime"] for query in unchanged)
+    logger.log_driver(f"{len(changed)} of {len(queries)} plans changed (runtime delta: {formatter.format_time(changed_delta)} in changed plans, "
+                      f"{formatter.format_time(unchanged_delta)} in unchanged plans)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report the queries whose plan changed between two system configurations")
+    parser.add_argument("filenames", nargs="+", help="result csvs with query plans")
+    parser.add_argument("--baseline", dest="baseline", required=True, help="title (or version) of the baseline")
+    parser.add_argument("--candidate", dest="candidate", required=True, help="title (or version) of the candidate")
+    parser.add_argument("--by", dest="by", choices=["title", "version"], default="title", help="column identifying the configurations (default: title)")
+    parser.add_argument("--show", dest="show", default=False, action="store_true", help="print the structure of changed plans")
+    args = parser.parse_args()
+
+    report(args.filenames, args.by, args.baseline, args.candidate, args.show)
+
+
+if __name__ == "__main__":
+    main()
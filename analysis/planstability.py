@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+import argparse
+import math
+import string
+from statistics import median
+from typing import Dict, List
+
+import simplejson as json
+from natsort import natsorted
+
+from queryplan.fingerprint import plan_structure
+from queryplan.queryplan import decode_query_plan
+from util import formatter, logger
+from util.resultcsv import plan_store, read_results
+
+
+def load_samples(filenames: List[str]) -> Dict[tuple, List[dict]]:
+    """
+    Load the plan samples of the plan stability mode.
+
+    Args:
+        filenames (List[str]): The result csvs or directories.
+
+    Returns:
+        Dict[tuple, List[dict]]: The successful samples with their fingerprint, runtime, and plan per title and query.
+    """
+    samples = {}
+    for filename in filenames:
+        store = plan_store(filename)
+        for row in read_results(filename, columns=["title", "query", "plan_samples"]):
+            if not row.get("plan_samples"):
+                continue
+            entries = []
+            for sample in json.loads(row["plan_samples"], allow_nan=True):
+                if sample["state"] != "success" or not sample["plan_fingerprint"]:
+                    continue
+                # inline plans are json objects, everything else is the key of a stored plan
+                plan = sample["plan"]
+                sample["plan"] = plan if plan.startswith("{") else store.get(plan).decode()
+                entries.append(sample)
+            samples[(row["title"], row["query"])] = entries
+    return samples
+
+
+def plan_runtimes(samples: List[dict]) -> List[dict]:
+    """
+    Group the samples of a query by their plan.
+
+    Args:
+        samples (List[dict]): The samples of a query.
+
+    Returns:
+        List[dict]: The fingerprint, plan, sample numbers, and runtimes of every distinct plan, in the order of their first
+        sample.
+    """
+    plans = {}
+    for sample in samples:
+        plan = plans.setdefault(sample["plan_fingerprint"], {"fingerprint": sample["plan_fingerprint"], "plan": sample["plan"], "samples": [], "runtimes": []})
+        plan["samples"].append(sample["sample"])
+        plan["runtimes"].append(float(sample["client_total"]))
+    return list(plans.values())
+
+
+def report(filenames: List[str], show: bool = False):
+    """
+    List the queries with more than one distinct plan in their samples, together with the runtimes of every plan.
+
+    Args:
+        filenames (List[str]): The result csvs with plan samples.
+        show (bool): Whether to print the structure of the plans.
+    """
+    samples = load_samples(filenames)
+    if not samples:
+        logger.log_warn("No plan samples found, enable `query_plan.stability` in the benchmark definition")
+        return
+
+    for title in natsorted({title for title, _ in samples}):
+        queries = natsorted(query for t, query in samples if t == title)
+        logger.log_header(title)
+
+        unstable = 0
+        for query in queries:
+            plans = plan_runtimes(samples[(title, query)])
+            if len(plans) <= 1:
+                continue
+            unstable += 1
+
+            medians = [median(plan["runtimes"]) for plan in plans]
+            spread = max(medians) / min(medians) if min(medians) > 0 else math.nan
+            print(f"{query.ljust(10)} {len(plans)} plans, slowest plan {spread:.2f}x the fastest")
+            for label, plan, plan_median in zip(string.ascii_uppercase, plans, medians):
+                runtimes = plan["runtimes"]
+                print(f"    {label} {plan['fingerprint']} {len(runtimes):>3}x  median {formatter.format_time(plan_median).rjust(12)}  "
+                      f"min {formatter.format_time(min(runtimes)).rjust(12)}  max {formatter.format_time(max(runtimes)).rjust(12)}  "
+                      f"samples {','.join(str(sample) for sample in plan['samples'])}")
+                if show:
+                    print(f"      {plan_structure(decode_query_plan(plan['plan']).plan)}")
+
+        logger.log_driver(f"{unstable} of {len(queries)} queries with more than one plan")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report the queries whose plan changed between the executions of the plan stability mode")
+    parser.add_argument("filenames", nargs="+", help="result csvs with plan samples")
+    parser.add_argument("--show", dest="show", default=False, action="store_true", help="print the structure of the plans")
+    args = parser.parse_args()
+
+    report(args.filenames, args.show)
+
+
+if __name__ == "__main__":
+    main()
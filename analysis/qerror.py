@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+import argparse
+import os
+from typing import List
+
+import numpy as np
+import pandas as pd
+
+from queryplan.attribution import operator_name
+from queryplan.plannode import PlanNode, fold
+from queryplan.queryoperator import OperatorType
+from queryplan.queryplan import decode_query_plan
+from util import logger
+from util.resultcsv import read_results
+
+
+join_operators = {OperatorType.Join, OperatorType.GroupJoin}
+
+
+def plan_operators(plan: PlanNode) -> List[dict]:
+    """
+    Collect the cardinalities of all operators of a plan, together with their join depth, i.e., the number of joins in
+    the subtree of the operator including itself. The result operator added by the parsers is skipped.
+
+    Args:
+        plan (PlanNode): The root of the plan.
+
+    Returns:
+        List[dict]: One entry per operator.
+    """
+    operators = []
+
+    def visit(node: PlanNode, children: List[int]) -> int:
+        joins = sum(children)
+        if node.operator.operator_type in join_operators:
+            joins += 1
+
+        if node.operator.operator_type != OperatorType.Result:
+            operators.append({
+                "operator": operator_name(node.operator),
+                "join_depth": joins,
+                "estimated_cardinality": node.estimated_cardinality,
+                "exact_cardinality": node.exact_cardinality,
+                "self_time": node.self_time,
+            })
+        return joins
+
+    fold(plan, visit)
+    return operators
+
+
+def load_operators(filenames: List[str]) -> pd.DataFrame:
+    """
+    Load the operators of all plans in the result csvs.
+
+    Args:
+        filenames (List[str]): The result csvs with query plans.
+
+    Returns:
+        pd.DataFrame: One row per operator with the system, query, cardinalities, and the runtime of the query.
+    """
+    rows = []
+    for filename in filenames:
+        for row in read_results(filename):
+            if not row.get("plan"):
+                continue
+
+            plan = decode_query_plan(row["plan"]).plan
+            for operator in plan_operators(plan):
+                operator.update(title=row["title"], dbms=row["dbms"], version=row["version"], query=row["query"],
+                                runtime=float(row["client_total_median"]))
+                rows.append(operator)
+
+    columns = ["title", "dbms", "version", "query", "runtime", "operator", "join_depth", "estimated_cardinality", "exact_cardinality", "self_time"]
+    return pd.DataFrame(rows, columns=columns)
+
+
+def q_errors(operators: pd.DataFrame) -> pd.Series:
+    """
+    Compute the q-error max(estimate / exact, exact / estimate) of each operator. Cardinalities are clamped to at
+    least one row, so that empty results do not yield infinite errors.
+
+    Args:
+        operators (pd.DataFrame): The operators as returned by `load_operators`.
+
+    Returns:
+        pd.Series: The q-error of each operator, NaN if a cardinality is missing.
+    """
+    estimated = np.maximum(pd.to_numeric(operators["estimated_cardinality"], errors="coerce").to_numpy(dtype=float), 1)
+    exact = np.maximum(pd.to_numeric(operators["exact_cardinality"], errors="coerce").to_numpy(dtype=float), 1)
+    return pd.Series(np.maximum(estimated / exact, exact / estimated), index=operators.index)
+
+
+def summarize_q_errors(q_error: pd.Series, by: pd.DataFrame | pd.Series | list) -> pd.DataFrame:
+    grouped = q_error.groupby(by, sort=True)
+    return pd.DataFrame({
+        "operators": grouped.count(),
+        "median": grouped.median(),
+        "p90": grouped.quantile(0.9),
+        "p95": grouped.quantile(0.95),
+        "max": grouped.max(),
+        "geomean": np.exp(np.log(q_error).groupby(by, sort=True).mean()),
+    })
+
+
+def analyze(operators: pd.DataFrame) -> dict[str, pd.DataFrame]:
+    """
+    Aggregate the q-errors of the operators by system, operator type, and join depth, and per query.
+
+    Args:
+        operators (pd.DataFrame): The operators as returned by `load_operators`.
+
+    Returns:
+        dict[str, pd.DataFrame]: The reports, keyed by name.
+    """
+    operators = operators.assign(q_error=q_errors(operators)).dropna(subset=["q_error"])
+    systems = [operators["title"], operators["version"]]
+
+    reports = {
+        "systems": summarize_q_errors(operators["q_error"], systems),
+        "operators": summarize_q_errors(operators["q_error"], systems + [operators["operator"]]),
+        "join_depth": summarize_q_errors(operators["q_error"], systems + [operators["join_depth"]]),
+    }
+
+    # a query is as good as its worst estimate
+    queries = operators.groupby(["title", "version", "query"], sort=True).agg(
+        max_q_error=("q_error", "max"), median_q_error=("q_error", "median"), runtime=("runtime", "first"))
+    reports["queries"] = queries
+
+    # rank correlation, as neither q-errors nor runtimes are normally distributed
+    correlation = queries.groupby(level=["title", "version"]).apply(
+        lambda group: pd.Series({
+            "queries": len(group),
+            "max_q_error_runtime": group["max_q_error"].corr(group["runtime"], method="spearman"),
+            "median_q_error_runtime": group["median_q_error"].corr(group["runtime"], method="spearman"),
+        }))
+    timed = operators.dropna(subset=["self_time"])
+    if not timed.empty:
+        correlation["operator_q_error_self_time"] = timed.groupby(["title", "version"]).apply(
+            lambda group: group["q_error"].corr(group["self_time"].astype(float), method="spearman"))
+    reports["correlation"] = correlation
+
+    return reports
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Analyze the cardinality estimation quality (q-error) of the query plans in result csvs")
+    parser.add_argument("filenames", nargs="+", help="result csvs with query plans")
+    parser.add_argument("-o", "--output", dest="output", type=str, default=None, help="directory to store the reports as csv")
+    args = parser.parse_args()
+
+    operators = load_operators(args.filenames)
+    if operators.empty:
+        logger.log_warn("No query plans found, retrieve them with `query_plan: {retrieve: true}`")
+        return
+
+    reports = analyze(operators)
+    with pd.option_context("display.max_rows", None, "display.width", None, "display.float_format", "{:,.2f}".format):
+        for name, report in reports.items():
+            logger.log_header(name)
+            print(report)
+
+    if args.output is not None:
+        os.makedirs(args.output, exist_ok=True)
+        for name, report in reports.items():
+            report.to_csv(os.path.join(args.output, f"qerror_{name}.csv"))
+        logger.log_driver(f"Stored the reports in {args.output}")
+
+
+if __name__ == "__main__":
+    main()
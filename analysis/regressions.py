@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+import argparse
+import math
+import sys
+from typing import Dict, List, Optional
+
+import numpy as np
+import simplejson as json
+from natsort import natsorted
+from scipy import stats
+
+from dbms.dbms import Result
+from util import formatter, logger
+from util.resultcsv import read_results
+
+# runtimes are rounded to microseconds, so that trivial queries may take 0 ms
+_MIN_RUNTIME = 1e-3
+
+
+def load_runtimes(filenames: List[str], title: str, version: Optional[str] = None) -> Dict[str, np.ndarray]:
+    """
+    Load the runtimes of the repetitions of the successful queries of one system configuration.
+
+    Args:
+        filenames (List[str]): The result csvs or directories.
+        title (str): The title of the configuration.
+        version (Optional[str]): The version of the configuration (default: any version).
+
+    Returns:
+        Dict[str, np.ndarray]: The runtimes (ms) per query, of the last result if a query was executed several times.
+    """
+    runtimes = {}
+    versions = set()
+    for filename in filenames:
+        for row in read_results(filename, columns=["title", "version", "query", "state", "client_total"], resolve=False):
+            if row["title"] != title or (version is not None and row["version"] != version):
+                continue
+            versions.add(row["version"])
+            if row["state"] != Result.SUCCESS:
+                runtimes.pop(row["query"], None)
+                continue
+            runtimes[row["query"]] = np.array(json.loads(row["client_total"], allow_nan=True), dtype=np.float64)
+
+    if len(versions) > 1:
+        logger.log_warn(f"{title} has results of the versions {', '.join(natsorted(versions))}, select one with a version")
+    return runtimes
+
+
+def adjust(p_values: np.ndarray, method: str) -> np.ndarray:
+    """
+    Adjust p-values for testing many queries at once.
+
+    Args:
+        p_values (np.ndarray): The p-values of the queries.
+        method (str): `bh` (Benjamini-Hochberg, controls the false discovery rate), `holm` (Holm-Bonferroni, controls the
+            family-wise error rate), or `none`.
+
+    Returns:
+        np.ndarray: The adjusted p-values.
+    """
+    n = len(p_values)
+    if n == 0 or method == "none":
+        return p_values
+    order = np.argsort(p_values)
+    ranked = p_values[order]
+    if method == "bh":
+        adjusted = np.minimum.accumulate((ranked * n / np.arange(1, n + 1))[::-1])[::-1]
+    elif method == "holm":
+        adjusted = np.maximum.accumulate(ranked * (n - np.arange(n)))
+    else:
+        raise ValueError(f"unknown correction {method}")
+    result = np.empty(n)
+    result[order] = np.minimum(adjusted, 1.0)
+    return result
+
+
+def bootstrap_speedup(baseline: List[np.ndarray], candidate: List[np.ndarray], samples: int, confidence: float, seed: int) -> tuple:
+    """
+    Bootstrap a confidence interval of the geometric mean speedup over all queries. Every sample draws the repetitions
+    of each query with replacement and the queries themselves with replacement, so that the interval covers both the
+    noise of the measurements and the choice of the queries.
+
+    Args:
+        baseline (List[np.ndarray]): The runtimes of the repetitions of the baseline per query.
+        candidate (List[np.ndarray]): The runtimes of the repetitions of the candidate per query, in the same order.
+        samples (int): The number of bootstrap samples.
+        confidence (float): The confidence level, e.g., 0.95.
+        seed (int): The seed of the samples.
+
+    Returns:
+        tuple: The geometric mean speedup (baseline / candidate) and the lower and upper bound of its interval.
+    """
+    rng = np.random.default_rng(seed)
+
+    def resampled_medians(runtimes: np.ndarray) -> np.ndarray:
+        return np.maximum(np.median(runtimes[rng.integers(0, len(runtimes), size=(samples, len(runtimes)))], axis=1), _MIN_RUNTIME)
+
+    # the log speedup of every query in every sample
+    log_speedups = np.stack([np.log(resampled_medians(b)) - np.log(resampled_medians(c)) for b, c in zip(baseline, candidate)], axis=1)
+    queries = rng.integers(0, len(baseline), size=(samples, len(baseline)))
+    geomeans = np.exp(np.take_along_axis(log_speedups, queries, axis=1).mean(axis=1))
+
+    point = math.exp(np.mean([np.log(max(np.median(b), _MIN_RUNTIME)) - np.log(max(np.median(c), _MIN_RUNTIME)) for b, c in zip(baseline, candidate)]))
+    lower, upper = np.quantile(geomeans, [(1 - confidence) / 2, (1 + confidence) / 2])
+    return point, float(lower), float(upper)
+
+
+def compare(baseline: Dict[str, np.ndarray], candidate: Dict[str, np.ndarray], alpha: float = 0.05, correction: str = "bh", min_change: float = 0.0) -> List[dict]:
+    """
+    Test every query for a change of its runtime with the two-sided Mann-Whitney U test on the runtimes of the
+    repetitions, which does not assume normally distributed runtimes.
+
+    Args:
+        baseline (Dict[str, np.ndarray]): The runtimes of the baseline per query.
+        candidate (Dict[str, np.ndarray]): The runtimes of the candidate per query.
+        alpha (float): The significance level after the correction.
+        correction (str): The multiple-testing correction, see `adjust`.
+        min_change (float): The minimum relative change of the median runtime of a significant change, e.g., 0.05.
+
+    Returns:
+        List[dict]: The `query`, the median runtimes, the `ratio` of the medians (candidate / baseline), the raw and
+        adjusted p-value, and whether the change is `significant`, for the queries with runtimes in both configurations.
+    """
+    queries = natsorted(query for query in baseline.keys() & candidate.keys() if len(baseline[query]) > 0 and len(candidate[query]) > 0)
+    results = []
+    for query in queries:
+        b, c = baseline[query], candidate[query]
+        # identical runtimes, e.g., of a single repetition, cannot be ranked
+        p_value = 1.0 if np.ptp(np.concatenate([b, c])) == 0 else stats.mannwhitneyu(b, c, alternative="two-sided").pvalue
+        results.append({
+            "query": query,
+            "baseline": float(np.median(b)),
+            "candidate": float(np.median(c)),
+            "ratio": float(np.median(c) / np.median(b)) if np.median(b) > 0 else math.nan,
+            "p_value": float(p_value),
+        })
+
+    adjusted = adjust(np.array([result["p_value"] for result in results]), correction)
+    for result, p_value in zip(results, adjusted):
+        result["adjusted_p_value"] = float(p_value)
+        result["significant"] = bool(p_value < alpha and abs(result["ratio"] - 1) >= min_change)
+    return results
+
+
+def report(filenames: List[str], baseline: str, candidate: str, baseline_version: Optional[str] = None, candidate_version: Optional[str] = None,
+           alpha: float = 0.05, correction: str = "bh", min_change: float = 0.0, samples: int = 10000, confidence: float = 0.95, seed: int = 0) -> int:
+    """
+    Report the queries whose runtime changed significantly between two system configurations, the regressions and the
+    improvements ranked by their change, and the geometric mean speedup over all queries with its confidence interval.
+
+    Returns:
+        int: The number of significant regressions.
+    """
+    baseline_runtimes = load_runtimes(filenames, baseline, baseline_version)
+    candidate_runtimes = load_runtimes(filenames, candidate, candidate_version)
+    results = compare(baseline_runtimes, candidate_runtimes, alpha, correction, min_change)
+    if not results:
+        logger.log_warn(f"No successful queries of both {baseline} and {candidate}")
+        return 0
+
+    baseline_name = baseline + ("" if baseline_version is None else f" ({baseline_version})")
+    candidate_name = candidate + ("" if candidate_version is None else f" ({candidate_version})")
+    significant = [result for result in results if result["significant"]]
+    regressions = sorted((result for result in significant if result["ratio"] > 1), key=lambda result: -result["ratio"])
+    improvements = sorted((result for result in significant if result["ratio"] < 1), key=lambda result: result["ratio"])
+
+    for header, ranked in [("Regressions", regressions), ("Improvements", improvements)]:
+        logger.log_header(f"{header} from {baseline_name} to {candidate_name}")
+        for result in ranked:
+            print(f"{result['query'].ljust(10)} {formatter.format_time(result['baseline']).rjust(14)} -> {formatter.format_time(result['candidate']).rjust(14)}  "
+                  f"{result['ratio']:.2f}x  p = {result['adjusted_p_value']:.2g}")
+
+    queries = [result["query"] for result in results]
+    speedup, lower, upper = bootstrap_speedup([baseline_runtimes[query] for query in queries], [candidate_runtimes[query] for query in queries], samples, confidence, seed)
+    repetitions = min(min(len(baseline_runtimes[query]), len(candidate_runtimes[query])) for query in queries)
+    if repetitions < 4:
+        logger.log_warn(f"Some queries have only {repetitions} repetitions, too few for the test to find significant changes")
+    logger.log_driver(f"{len(regressions)} regressions and {len(improvements)} improvements in {len(results)} queries "
+                      f"({correction} corrected, alpha = {alpha}), geomean speedup {speedup:.3f}x ({confidence * 100:g}% CI {lower:.3f}x - {upper:.3f}x)")
+    return len(regressions)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Find the queries whose runtime changed significantly between two system configurations, e.g., versions or settings")
+    parser.add_argument("filenames", nargs="+", help="result csvs or directories")
+    parser.add_argument("--baseline", dest="baseline", required=True, help="title of the baseline")
+    parser.add_argument("--candidate", dest="candidate", required=True, help="title of the candidate")
+    parser.add_argument("--baseline-version", dest="baseline_version", default=None, help="version of the baseline (default: any)")
+    parser.add_argument("--candidate-version", dest="candidate_version", default=None, help="version of the candidate (default: any)")
+    parser.add_argument("--alpha", dest="alpha", type=float, default=0.05, help="significance level (default: 0.05)")
+    parser.add_argument("--correction", dest="correction", choices=["bh", "holm", "none"], default="bh",
+                        help="multiple-testing correction, Benjamini-Hochberg or Holm-Bonferroni (default: bh)")
+    parser.add_argument("--min-change", dest="min_change", type=float, default=0.0, help="minimum relative change of a significant change, e.g., 0.05 (default: 0)")
+    parser.add_argument("--samples", dest="samples", type=int, default=10000, help="number of bootstrap samples (default: 10000)")
+    parser.add_argument("--confidence", dest="confidence", type=float, default=0.95, help="confidence level of the interval (default: 0.95)")
+    parser.add_argument("--seed", dest="seed", type=int, default=0, help="seed of the bootstrap samples")
+    parser.add_argument("--fail-on-regression", dest="fail", default=False, action="store_true", help="exit with status 1 if there is a significant regression")
+    args = parser.parse_args()
+
+    regressions = report(args.filenames, args.baseline, args.candidate, args.baseline_version, args.candidate_version,
+                         args.alpha, args.correction, args.min_change, args.samples, args.confidence, args.seed)
+    if args.fail and regressions > 0:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
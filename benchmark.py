@@ -2,27 +2,31 @@
 from __future__ import annotations
 
 import argparse
-import csv
+import contextlib
+import functools
 import itertools
 import math
 import os
 import random
-import sys
+import re
+import shutil
 from dataclasses import dataclass, field
 from statistics import median, geometric_mean
 from typing import Dict, List
 
-import simplejson as json
 from dotenv import load_dotenv
 
 from benchmarks.benchmark import benchmark_arguments, benchmarks, Benchmark
-from dbms.dbms import Result, database_systems
+from dbms.dbms import DBMS, Result, database_systems
 from util import logger, formatter, schemajson
-from util.resultcsv import ResultCSV
+from util.joinorder import explicit_join_query, left_deep_orders, parse_join_query
+from util.resultcsv import JoinOrderCSV, ResultCSV
+from util.resumestate import ResumeState
 from util.template import Template
+from util.golden import GoldenResults
+from util.validation import Validator
 
 workdir = os.getcwd()
-csv.field_size_limit(sys.maxsize)
 
 
 @dataclass
@@ -44,6 +48,7 @@ class Runtime:
     oom: int = 0
     timeout: int = 0
     global_timeout: int = 0
+    wrong_result: int = 0
 
     global_time: float = 0
     times: List[float] = field(default_factory=lambda: [])
@@ -62,9 +67,10 @@ def run_benchmark(benchmark: Benchmark, systems: List[System], definition: dict,
     benchmark.dbgen()
 
     result_name = os.path.join(result_dir, benchmark.result_name)
-    result_csv = result_name + ".csv"
+    results = definition.get("results", {})
+    result_format = results.get("format", "csv")
+    result_csv = result_name + "." + result_format
     executed_queries = {}
-    failed_query = (None, None)
     benchmark_type = definition.get("type", "queries")
 
     if definition.get("clear", False):
@@ -75,49 +81,56 @@ def run_benchmark(benchmark: Benchmark, systems: List[System], definition: dict,
         runtimes[system.title] = Runtime(title=system.title)
         executed_queries[system.title] = []
 
-    if os.path.exists(result_csv) and benchmark_type == "queries":
-        logger.log_driver(f"Found results in {result_csv}, skipping already executed queries")
-        with open(result_csv, 'r') as csv_file:
-            reader = csv.DictReader(csv_file)
-
-            for row in reader:
-                title = row["title"]
-                query = row["query"]
-                state = row["state"]
-                times = [float(x) for x in json.loads(row["client_total"], allow_nan=True)]
-
+    # the executed queries and their running totals, so that resuming does not read the results
+    resume_state = ResumeState(os.path.join(result_dir, "resume.sqlite"), benchmark.result_name, result_csv)
+    if benchmark_type == "queries":
+        with resume_state:
+            executed = resume_state.executed_queries()
+            if executed:
+                logger.log_driver(f"Found results in {result_csv}, skipping already executed queries")
+            for title, queries in executed.items():
                 if title not in runtimes:
                     continue
 
-                executed_queries[title].append(query)
-
-                runtimes[title].queries += 1
-                if state not in [Result.FATAL, Result.GLOBAL_TIMEOUT]:
-                    assert len(times) > 0
-                    runtimes[title].global_time += median(times)
-                    runtimes[title].times.append(median(times))
-
-                match state:
-                    case Result.SUCCESS:
-                        runtimes[title].success += 1
-                    case Result.ERROR:
-                        runtimes[title].error += 1
-                    case Result.FATAL:
-                        runtimes[title].fatal += 1
-                    case Result.OOM:
-                        runtimes[title].oom += 1
-                    case Result.TIMEOUT:
-                        runtimes[title].timeout += 1
-                    case Result.GLOBAL_TIMEOUT:
-                        runtimes[title].global_timeout += 1
-
-    if os.path.exists(result_csv + "_current") and benchmark_type == "queries":
-        with open(result_csv + "_current", 'r') as file:
-            title, query = file.readline().split(",")
-            failed_query = (title, query)
-            logger.log_driver(f"Last execution of {query} failed in {title}")
-
-    with ResultCSV(result_csv, append=True) as result_csv_file:
+                executed_queries[title] = list(queries)
+                totals = resume_state.totals(title)
+                for key, value in totals.items():
+                    setattr(runtimes[title], key, value)
+
+            for title, query in resume_state.crashed():
+                logger.log_driver(f"Last execution of {query} failed in {title}")
+
+    # the results of the systems are compared to the results of the reference system or to the golden results
+    validation = definition.get("validation", None) if benchmark_type == "queries" else None
+    validator = None
+    if validation is not None:
+        golden = None
+        if validation.get("golden") is not None:
+            golden = GoldenResults(os.path.join(workdir, validation["golden"]), benchmark, rows=validation.get("golden_rows", 100))
+        validator = Validator(validation.get("reference"), validation.get("relative_tolerance", 1e-6), validation.get("absolute_tolerance", 1e-9), golden=golden)
+        if golden is not None:
+            logger.log_driver(f"Found {len(validator.golden_results)} golden results in {golden.directory}")
+        if validator.reference is not None and validator.reference not in [system.title for system in systems]:
+            logger.log_warn(f"Reference system {validator.reference} is not part of the benchmark, only validating against its stored results")
+        # the reference system runs first, so that its results are known when the other systems run
+        systems = sorted(systems, key=lambda system: system.title != validator.reference)
+        if os.path.exists(result_csv):
+            validator.load(result_csv)
+
+    store_plans = definition.get("query_plan", {}).get("store", True)
+    store_raw_plans = definition.get("query_plan", {}).get("store_raw", True)
+    store_results = results.get("store", True)
+    join_orders = definition.get("join_orders", None) if benchmark_type == "queries" else None
+    if result_format == "parquet":
+        # pyarrow is only needed for the columnar results
+        from util.resultparquet import ResultParquet
+        result_file = ResultParquet(result_csv, append=True, store_plans=store_plans, store_results=store_results, store_raw_plans=store_raw_plans,
+                                    row_group_size=results.get("row_group", 32))
+    else:
+        result_file = ResultCSV(result_csv, append=True, store_plans=store_plans, store_results=store_results, store_raw_plans=store_raw_plans)
+    # the state is closed last, as the buffered results are committed when the results are closed
+    with resume_state, result_file as result_csv_file, \
+            (JoinOrderCSV(result_name + "_joinorders.csv") if join_orders is not None else contextlib.nullcontext()) as join_order_csv:
         for system in systems:
             logger.log_header(system.title)
             logger.log_driver(f"Running {system.title} on {benchmark.result_name} (dbms: {system.dbms}, params: {system.params}, settings: {system.settings})")
@@ -164,7 +177,7 @@ def run_benchmark(benchmark: Benchmark, systems: List[System], definition: dict,
                         rmedian = formatter.format_time(math.nan if len(runtime.times) == 0 else median(runtime.times))
 
                         logger.log_driver(
-                            f"total runtime {rsum} (geomean: {rgeomean}, median: {rmedian}) of {runtime.queries} queries (success: {runtime.success}, error: {runtime.error}, fatal: {runtime.fatal}, oom: {runtime.oom}, timeout: {runtime.timeout}, global timeout: {runtime.global_timeout})")
+                            f"total runtime {rsum} (geomean: {rgeomean}, median: {rmedian}) of {runtime.queries} queries (success: {runtime.success}, error: {runtime.error}, fatal: {runtime.fatal}, oom: {runtime.oom}, timeout: {runtime.timeout}, global timeout: {runtime.global_timeout}, wrong result: {runtime.wrong_result})")
                         continue
 
             with dbms_descriptions[system.dbms].instantiate(benchmark, db_dir, data_dir, system.params, system.settings) as dbms:
@@ -176,11 +189,24 @@ def run_benchmark(benchmark: Benchmark, systems: List[System], definition: dict,
                     repetitions = definition["repetitions"]
                     warmup = definition["warmup"]
 
+                    query_plan = definition.get("query_plan", {})
+                    retrieve_query_plan = query_plan.get("retrieve", False)
+                    system_representation = query_plan.get("system_representation", False)
+                    stability = query_plan.get("stability", None)
+
                     with logger.LogProgress("Running queries...", len(queries) * (repetitions + warmup), base=repetitions + warmup) as progress:
                         for (name, query) in queries:
                             result = Result()
 
-                            if system.title == failed_query[0] and name == failed_query[1]:
+                            claim = resume_state.claim(system.title, name)
+                            if claim in [ResumeState.EXECUTED, ResumeState.RUNNING]:
+                                # another process runs the same benchmark
+                                logger.log_verbose_dbms(f"{name.ljust(10)} skipped, {claim} by another process", dbms)
+                                for i in range(repetitions + warmup):
+                                    progress.finish()
+                                continue
+
+                            if claim == ResumeState.CRASHED:
                                 # Fatal error in the last execution of the query
                                 result.state = Result.FATAL
                                 result.message = "olapbench: system crash!"
@@ -189,17 +215,34 @@ def run_benchmark(benchmark: Benchmark, systems: List[System], definition: dict,
                                 result.state = Result.GLOBAL_TIMEOUT
                                 result.message = "olapbench: global timeout!"
 
-                            result_csv_file.start_olap(system.title, name)
-
                             progress.next(f'Running {name}...')
                             if result.state == Result.SUCCESS:
                                 for i in range(warmup):
                                     dbms._execute(query, fetch_result, timeout=timeout, fetch_result_limit=fetch_result_limit)
                                     progress.finish()
 
+                                # the resources are recorded for one measured repetition, the last one that does not profile the plan
+                                metrics_repetition = repetitions - 2 if retrieve_query_plan and repetitions > 1 else repetitions - 1
                                 for i in range(repetitions):
-                                    result.merge(dbms._execute(query, fetch_result, timeout=timeout, fetch_result_limit=fetch_result_limit))
+                                    # capture the plan the system profiled during the last measured repetition
+                                    dbms.capture_plan = retrieve_query_plan and i == repetitions - 1
+                                    dbms.collect_metrics = i == metrics_repetition
+                                    result.merge(dbms.execute(query, fetch_result, timeout=timeout, fetch_result_limit=fetch_result_limit))
                                     progress.finish()
+                                dbms.capture_plan = False
+                                dbms.collect_metrics = True
+
+                                # only complete results are comparable
+                                if fetch_result and fetch_result_limit == 0 and result.state == Result.SUCCESS:
+                                    result.digest_result()
+
+                                    difference = validator.validate(name, query, system.title, result) if validator is not None else None
+                                    if difference is not None:
+                                        logger.log_warn_verbose(f"Wrong result of {name}: {difference}")
+                                        result.state = Result.WRONG_RESULT
+                                        result.message = f"olapbench: wrong result, {difference}"
+                                    elif validator is not None and system.title == validator.reference:
+                                        validator.add_reference(name, f"{system.title} ({dbms.version})", result)
 
                             med = median(result.client_total) if len(result.client_total) > 0 else math.nan
                             if not math.isnan(med):
@@ -210,14 +253,33 @@ def run_benchmark(benchmark: Benchmark, systems: List[System], definition: dict,
                                 result.state = Result.GLOBAL_TIMEOUT
                                 med = math.nan
 
-                            query_plan = definition.get("query_plan", {})
-                            retrieve_query_plan = query_plan.get("retrieve", False)
+                            profile = definition.get("profile", None)
+                            if profile is not None and result.state == Result.SUCCESS and name in profile.get("queries", [name]):
+                                profile_path = os.path.join(result_name + "_profiles", *[path_component(c) for c in [system.title, dbms.version, name]])
+                                try:
+                                    files = dbms.profile(query, profile_path, fetch_result, timeout=timeout, fetch_result_limit=fetch_result_limit,
+                                                         frequency=profile.get("frequency", 999), svg=profile.get("svg", False))
+                                    for file in files:
+                                        logger.log_verbose_dbms(f"Stored profile of {name} in {file}", dbms)
+                                except Exception as e:
+                                    logger.log_warn(f"Could not profile {name}: {e}")
+
                             if retrieve_query_plan and result.state == Result.SUCCESS:
-                                system_representation = query_plan.get("system_representation", False)
-                                result.plan = dbms.retrieve_query_plan(query, include_system_representation=system_representation)
+                                # only execute the query once more if the system did not profile the measured execution
+                                result.plan = dbms.captured_query_plan(query, include_system_representation=system_representation)
+                                if result.plan is None:
+                                    result.plan = dbms.retrieve_query_plan(query, include_system_representation=system_representation)
+
+                            if stability is not None and result.state == Result.SUCCESS:
+                                result.plan_samples = sample_plans(dbms, query, fetch_result, timeout, fetch_result_limit, stability, system_representation)
+
+                            if join_orders is not None and result.state == Result.SUCCESS:
+                                explore_join_orders(dbms, system.title, name, query, median(result.client_total), join_orders, fetch_result, timeout, fetch_result_limit, join_order_csv)
 
                             result.round(3)
-                            result_csv_file.olap(system.title, system.dbms, dbms.version, name, result)
+                            resume_state.complete(system.title, name)
+                            result_csv_file.olap(system.title, system.dbms, dbms.version, name, result,
+                                                 committed=functools.partial(resume_state.finish, system.title, name, result.state, med))
 
                             lname = name.ljust(10)
                             lmessage = ""
@@ -240,9 +302,13 @@ def run_benchmark(benchmark: Benchmark, systems: List[System], definition: dict,
                                 case Result.GLOBAL_TIMEOUT:
                                     lmessage = "global timeout"
                                     runtimes[system.title].global_timeout += 1
+                                case Result.WRONG_RESULT:
+                                    lmessage = "wrong result"
+                                    runtimes[system.title].wrong_result += 1
 
                             runtimes[system.title].queries += 1
-                            if result.state not in [Result.ERROR, Result.FATAL, Result.GLOBAL_TIMEOUT]:
+                            # wrong results do not count towards the runtime, so that a system cannot win by being wrong
+                            if result.state not in [Result.ERROR, Result.FATAL, Result.GLOBAL_TIMEOUT, Result.WRONG_RESULT]:
                                 assert not math.isnan(med)
                                 runtimes[system.title].times.append(med)
 
@@ -254,7 +320,7 @@ def run_benchmark(benchmark: Benchmark, systems: List[System], definition: dict,
                     rmedian = formatter.format_time(math.nan if len(runtime.times) == 0 else median(runtime.times))
 
                     logger.log_driver(
-                        f"total runtime {rsum} (geomean: {rgeomean}, median: {rmedian}) of {runtime.queries} queries (success: {runtime.success}, error: {runtime.error}, fatal: {runtime.fatal}, oom: {runtime.oom}, timeout: {runtime.timeout}, global timeout: {runtime.global_timeout})")
+                        f"total runtime {rsum} (geomean: {rgeomean}, median: {rmedian}) of {runtime.queries} queries (success: {runtime.success}, error: {runtime.error}, fatal: {runtime.fatal}, oom: {runtime.oom}, timeout: {runtime.timeout}, global timeout: {runtime.global_timeout}, wrong result: {runtime.wrong_result})")
 
                 elif benchmark_type == "launch":
                     logger.log_dbms(f"Connect to {system.title} using `{dbms.connection_string()}`", dbms)
@@ -264,6 +330,108 @@ def run_benchmark(benchmark: Benchmark, systems: List[System], definition: dict,
                     raise ValueError("benchmark type not supported")
 
 
+def sample_plans(dbms: DBMS, query: str, fetch_result: bool, timeout: int, fetch_result_limit: int, stability: dict, system_representation: bool) -> List[dict]:
+    """
+    Execute a query several more times and retrieve the plan of every execution, to find queries whose plan changes
+    between executions. Before every execution but the first, the statistics are refreshed and the system is restarted
+    if configured. Refreshed statistics persist for the following queries.
+
+    Args:
+        dbms (DBMS): The system.
+        query (str): The query.
+        fetch_result (bool): Whether to fetch the result.
+        timeout (int): The timeout in seconds.
+        fetch_result_limit (int): The maximum number of rows to fetch.
+        stability (dict): The number of `plans`, and whether to refresh the `statistics` and to `restart` the system.
+        system_representation (bool): Whether to include the system's representation of the operators.
+
+    Returns:
+        List[dict]: One sample per execution with its number, state, runtime (ms), and plan.
+    """
+    samples = []
+    for i in range(stability.get("plans", 5)):
+        if i > 0 and stability.get("restart", False):
+            dbms.restart()
+        if i > 0 and stability.get("statistics", False):
+            dbms.refresh_statistics()
+
+        dbms.capture_plan = True
+        result = dbms.execute(query, fetch_result, timeout=timeout, fetch_result_limit=fetch_result_limit)
+        dbms.capture_plan = False
+
+        plan = None
+        if result.state == Result.SUCCESS:
+            plan = dbms.captured_query_plan(query, include_system_representation=system_representation)
+            if plan is None:
+                plan = dbms.retrieve_query_plan(query, include_system_representation=system_representation)
+
+        client_total = round(result.client_total[0], 3) if result.client_total else math.nan
+        samples.append({"sample": i, "state": result.state, "client_total": client_total, "plan": plan})
+    return samples
+
+
+def explore_join_orders(dbms: DBMS, title: str, name: str, query: str, optimizer_runtime: float, join_orders: dict, fetch_result: bool, timeout: int,
+                        fetch_result_limit: int, join_order_csv: JoinOrderCSV):
+    """
+    Execute a query in left-deep join orders forced with explicit joins, to rank the join order of the optimizer among
+    all orders. Every order times out when it is slower than the best order so far by the timeout factor, but never
+    before the runtime of the optimizer's plan, so that orders that time out are always slower than the optimizer's.
+
+    Args:
+        dbms (DBMS): The system, only PostgreSQL can force join orders.
+        title (str): The title of the system.
+        name (str): The name of the query.
+        query (str): The query, with comma-separated tables in its from clause.
+        optimizer_runtime (float): The median runtime of the query with the optimizer's join order (ms).
+        join_orders (dict): The `budget` of orders, the `timeout_factor`, the `repetitions` of every order, and the `seed`
+            of the sample of orders if there are more orders than the budget.
+        fetch_result (bool): Whether to fetch the result.
+        timeout (int): The timeout in seconds.
+        fetch_result_limit (int): The maximum number of rows to fetch.
+        join_order_csv (JoinOrderCSV): The csv for the runtimes of the orders.
+    """
+    if dbms.name != "postgres":
+        logger.log_warn_verbose(f"Cannot force join orders in {dbms.name}")
+        return
+
+    try:
+        join_query = parse_join_query(query)
+    except ValueError as e:
+        logger.log_warn_verbose(f"Cannot explore the join orders of {name}: {e}")
+        return
+
+    orders = left_deep_orders(join_query, join_orders.get("budget", 100), join_orders.get("seed", 0))
+    timeout_factor = join_orders.get("timeout_factor", 2.0)
+    repetitions = join_orders.get("repetitions", 1)
+
+    best = optimizer_runtime
+    faster = 0
+    dbms.force_join_order(True)
+    try:
+        for order in orders:
+            order_timeout = max(timeout_factor * best, optimizer_runtime)
+            if timeout > 0:
+                order_timeout = min(order_timeout, timeout * 1000)
+
+            result = Result()
+            for _ in range(repetitions):
+                result.merge(dbms.execute(explicit_join_query(join_query, order), fetch_result, timeout=order_timeout / 1000, fetch_result_limit=fetch_result_limit))
+                if result.state != Result.SUCCESS:
+                    break
+            result.round(3)
+            join_order_csv.join_order(title, dbms.name, dbms.version, name, order, round(order_timeout, 3), optimizer_runtime, result)
+
+            if result.state == Result.SUCCESS:
+                runtime = median(result.client_total)
+                best = min(best, runtime)
+                faster += runtime < optimizer_runtime
+            logger.log_verbose_dbms(f"{name.ljust(10)} {','.join(order)} {formatter.format_time(median(result.client_total))} {result.state}", dbms)
+    finally:
+        dbms.force_join_order(False)
+
+    logger.log_verbose_dbms(f"{name.ljust(10)} {faster} of {len(orders)} join orders faster than the optimizer's ({formatter.format_time(optimizer_runtime)}, best: {formatter.format_time(best)})", dbms)
+
+
 def unfold(d: dict) -> List[dict]:
     """
     Unfolds a dictionary with list values into a list of dictionaries with all possible combinations of the values.
@@ -281,6 +449,13 @@ def unfold(d: dict) -> List[dict]:
     return [dict(zip(keys, combination)) for combination in itertools.product(*values)]
 
 
+def path_component(s: str) -> str:
+    """
+    Turns a title, version, or query name into a string that can be used as a single component of a file path.
+    """
+    return re.sub(r"[^\w.+-]", "_", s)
+
+
 def clear(benchmark: Benchmark, result_dir: str):
     """
     Deletes result files associated with the given benchmark.
@@ -300,10 +475,15 @@ def clear(benchmark: Benchmark, result_dir: str):
     result_name = os.path.join(result_dir, benchmark.result_name)
     logger.log_driver(f"Clearing results for {result_name}")
 
-    files_to_delete = [result_name + ext for ext in [".csv", ".csv_current"]]
+    files_to_delete = [result_name + ext for ext in [".csv", ".csv_current", "_joinorders.csv"]]
     for file_path in files_to_delete:
         delete_file(file_path)
 
+    shutil.rmtree(result_name + "_profiles", ignore_errors=True)
+    shutil.rmtree(result_name + "_plans", ignore_errors=True)
+    shutil.rmtree(result_name + "_results", ignore_errors=True)
+    shutil.rmtree(result_name + ".parquet", ignore_errors=True)
+
 
 def run_benchmarks(args):
     benchmark_descriptions = benchmarks()
@@ -7,6 +7,7 @@ from benchmarks.benchmark import Benchmark
 from dbms.dbms import DBMS
 from dbms.dbms import DBMSDescription
 from dbms.postgres import Postgres
+from util import logger
 
 
 class CedarDB(Postgres):
@@ -14,6 +15,11 @@ class CedarDB(Postgres):
     def __init__(self, benchmark: Benchmark, db_dir: str, data_dir: str, params: dict, settings: dict):
         super().__init__(benchmark, db_dir, data_dir, params, settings)
 
+        # pg_stat_statements is specific to PostgreSQL
+        if self._server_statistics:
+            logger.log_warn(f"{self.name} does not support server statistics, ignoring `server_statistics`")
+            self._server_statistics = False
+
     @property
     def name(self) -> str:
         return "cedardb"
@@ -2,18 +2,49 @@ import os
 import tempfile
 import threading
 import time
+import uuid
 
 import simplejson as json
 
 from benchmarks.benchmark import Benchmark
 from dbms.dbms import DBMS, Result, DBMSDescription
+from queryplan.parsers.clickhouseparser import ClickHouseParser
+from queryplan.queryplan import QueryPlan
 from util import logger, sql, process
 
 
+# metrics of system.query_log
+query_log_columns = {
+    "query_duration_ms": "query_duration_ms",
+    "memory_usage": "memory_usage",
+    "read_rows": "read_rows",
+    "read_bytes": "read_bytes",
+    "written_rows": "written_rows",
+    "written_bytes": "written_bytes",
+    "result_rows": "result_rows",
+    "result_bytes": "result_bytes",
+    "threads": "length(thread_ids)",
+}
+
+# selected cpu and i/o counters of system.query_log.ProfileEvents
+query_log_profile_events = [
+    "RealTimeMicroseconds", "UserTimeMicroseconds", "SystemTimeMicroseconds", "OSCPUVirtualTimeMicroseconds", "OSCPUWaitMicroseconds", "OSIOWaitMicroseconds",
+    "OSReadBytes", "OSWriteBytes", "OSReadChars", "OSWriteChars", "ReadCompressedBytes", "CompressedReadBufferBytes",
+    "SelectedParts", "SelectedMarks", "SelectedRows", "SelectedBytes",
+    "ExternalSortWritePart", "ExternalAggregationWritePart", "ExternalProcessingCompressedBytesTotal",
+]
+
+# columns of system.processors_profile_log that are assigned to the steps of a plan
+processors_profile_columns = ["id", "parent_ids", "plan_step", "plan_step_name", "plan_step_description", "elapsed_us", "output_rows"]
+
+
 class ClickHouse(DBMS):
 
     def __init__(self, benchmark: Benchmark, db_dir: str, data_dir: str, params: dict, settings: dict):
         super().__init__(benchmark, db_dir, data_dir, params, settings)
+        # the id of the last executed query, to find it in the system logs
+        self._last_query_id = None
+        self._server_statistics = params.get("server_statistics", False)
 
     @property
     def name(self) -> str:
@@ -108,25 +139,27 @@ class ClickHouse(DBMS):
 
         return result
 
-    def _execute(self, query: str, fetch_result: bool, timeout: int = 0, fetch_result_limit: int = 0) -> Result:
+    def _execute(self, query: str, fetch_result: bool, timeout: int = 0, fetch_result_limit: int = 0, settings: str = "") -> Result:
         result = Result()
 
         query_path = os.path.join(self.temp_dir.name, "query.sql")
         with open(query_path, 'w') as query_sql:
-            query_sql.write("set allow_experimental_join_condition=1;\n")
-            query_sql.write("set allow_experimental_analyzer=1;\n")
-            if timeout > 0:
-                query_sql.write(f"set max_execution_time={timeout};\n")
-
             query_sql.write(query)
             query_sql.write("\n")
 
         process.Process(f"docker cp {query_path} {self.container_name}:/tmp/query.sql").run()
 
+        # pass the settings on the command line, so that the query file only contains the tagged query
+        query_id = str(uuid.uuid4())
+        self._last_query_id = query_id
+        settings = f"--allow_experimental_join_condition=1 --allow_experimental_analyzer=1 {settings}".strip()
+        if timeout > 0:
+            settings += f" --max_execution_time={timeout}"
+
         begin = time.time()
         try:
             return_value = self._execute_in_container(
-                f'bash -c "clickhouse-client --time --format={"Null" if not fetch_result else "JSONCompactEachRowWithNamesAndTypes"} -d clickhouse --queries-file=/tmp/query.sql > /tmp/result.json"', timeout=timeout * 10)
+                f'bash -c "clickhouse-client --time --query_id={query_id} {settings} --format={"Null" if not fetch_result else "JSONCompactEachRowWithNamesAndTypes"} -d clickhouse --queries-file=/tmp/query.sql > /tmp/result.json"', timeout=timeout * 10)
         except Exception as e:
             client_total = time.time() - begin
             if self._container_status() != "running":
@@ -167,6 +200,77 @@ class ClickHouse(DBMS):
         result.total.append(total_time)
         return result
 
+    def execute(self, query: str, fetch_result: bool, timeout: int = 0, fetch_result_limit: int = 0) -> Result:
+        result = super().execute(query, fetch_result, timeout=timeout, fetch_result_limit=fetch_result_limit)
+        # only for the measured repetition whose metrics are kept, and after the monitors of the container stopped, so
+        # that flushing and reading the log is neither counted for the query nor slows down the other executions
+        if self._server_statistics and self.collect_metrics and result.state == Result.SUCCESS:
+            result.extra.update(self._query_log(self._last_query_id))
+        return result
+
+    def _query_log(self, query_id: str) -> dict:
+        """
+        Retrieve the metrics of a finished query from system.query_log.
+
+        Args:
+            query_id (str): The id the query was tagged with.
+
+        Returns:
+            dict: Peak memory, rows and bytes read, result size, threads, and selected profile events of the query.
+        """
+        query_log = f"select {', '.join(f'{expression} as {name}' for name, expression in query_log_columns.items())}, ProfileEvents from system.query_log where query_id = '{query_id}' and type = 'QueryFinish' format JSONEachRow"
+
+        try:
+            self._execute_in_container('clickhouse-client -d clickhouse --query "system flush logs"')
+            output = self._execute_in_container(f'clickhouse-client -d clickhouse --query "{query_log}"').output.decode('utf-8').strip()
+        except Exception as e:
+            logger.log_warn_verbose(f"Could not retrieve the query log: {e}")
+            return {}
+
+        if not output:
+            return {}
+
+        entry = json.loads(output.split('\n')[0])
+        extra = {column: float(entry[column]) for column in query_log_columns if column in entry}
+        profile_events = entry.get("ProfileEvents", {})
+        extra.update({event: float(profile_events[event]) for event in query_log_profile_events if event in profile_events})
+        return extra
+
+    def _processors_profile(self, query_id: str) -> list[dict]:
+        """
+        Retrieve the processors of a finished query from system.processors_profile_log. The query has to be executed with
+        `log_processors_profiles` enabled.
+
+        Args:
+            query_id (str): The id the query was tagged with.
+
+        Returns:
+            list[dict]: The processors with their step in the plan, their output rows, and their time.
+        """
+        processors_profile = f"select {', '.join(processors_profile_columns)} from system.processors_profile_log where query_id = '{query_id}' format JSONEachRow"
+
+        try:
+            self._execute_in_container('clickhouse-client -d clickhouse --query "system flush logs"')
+            output = self._execute_in_container(f'clickhouse-client -d clickhouse --query "{processors_profile}"').output.decode('utf-8').strip()
+        except Exception as e:
+            logger.log_warn_verbose(f"Could not retrieve the processors profile: {e}")
+            return []
+
+        return [json.loads(line) for line in output.split('\n') if line.strip()]
+
+    def retrieve_query_plan(self, query: str, include_system_representation: bool = False) -> QueryPlan:
+        # explain prints the json plan as one row per line
+        result = self._execute("explain json = 1, description = 1, actions = 1, header = 0 " + query.strip(), fetch_result=True)
+        if result.state != Result.SUCCESS:
+            raise Exception(f"could not explain the query: {result.message}")
+        explain = json.loads("\n".join(row[0] for row in result.result))
+
+        result = self._execute(query, fetch_result=False, settings="--log_processors_profiles=1")
+        processors = self._processors_profile(self._last_query_id) if result.state == Result.SUCCESS else []
+
+        plan_parser = ClickHouseParser(include_system_representation=include_system_representation)
+        return plan_parser.parse_json_plan(query, {"plan": explain, "processors": processors})
+
 
 class ClickHouseDescription(DBMSDescription):
     @staticmethod
@@ -2,6 +2,7 @@ import argparse
 import os
 import re
 from abc import ABC, abstractmethod
+from contextlib import ExitStack
 from enum import Enum
 from statistics import median
 from typing import Optional, List, Dict
@@ -10,6 +11,9 @@ import docker
 from benchmarks.benchmark import Benchmark
 from queryplan.queryplan import QueryPlan
 from util import numa, logger, formatter, sql
+from util.cgroup import Cgroup, CgroupMonitor
+from util.perf import PerfStat, PerfRecord
+from util.digest import ResultDigest
 
 
 class Result:
@@ -19,6 +23,8 @@ class Result:
     OOM = "oom"
     TIMEOUT = "timeout"
     GLOBAL_TIMEOUT = "global_timeout"
+    # the result differs from the result of the reference system
+    WRONG_RESULT = "wrong_result"
 
     def __init__(self):
         self.state: Result.State = Result.SUCCESS
@@ -29,8 +35,11 @@ class Result:
         self.rows: Optional[int] = None
         self.extra: Dict[str, float] = {}
         self.result: List[List[any]] = []
+        self.digest: Optional[str] = None
         self.message: str = ""
         self.plan: Optional[QueryPlan] = None
+        # plans of additional executions in plan stability mode, see `benchmark.sample_plans`
+        self.plan_samples: List[dict] = []
 
     def merge(self, other: 'Result'):
         """
@@ -52,12 +61,24 @@ class Result:
         # Update the number of rows
         self.rows = other.rows if other.rows is not None else self.rows
 
-        # Update the additional information
-        self.extra = other.extra if not self.extra else self.extra
+        # Update the additional information, metrics that only some runs record, e.g., the resources of one measured
+        # repetition, are added
+        for key, value in other.extra.items():
+            self.extra.setdefault(key, value)
         self.result = other.result if not self.result else self.result
+        self.digest = other.digest or self.digest
         self.message = other.message or self.message
         self.plan = other.plan or self.plan
 
+    def digest_result(self):
+        """
+        Digest the fetched rows, unless the digest was already computed while streaming the result.
+        """
+        if self.digest is None:
+            digest = ResultDigest()
+            digest.update(self.result)
+            self.digest = digest.hexdigest()
+
     def round(self, decimals: int):
         """
         Round all float values in the object's attributes to the specified number of decimal places.
@@ -123,10 +144,22 @@ class DBMS(ABC):
         self._index = DBMS.Index.from_string(params.get("index", "primary"))
         self._version = params.get("version", "latest")
         self._umbra_planner = params.get("umbra_planner", False)
+        self._fetch_stream = params.get("fetch_stream", False)
+        self._fetch_batch_size = params.get("fetch_batch_size", 10000)
+        self._fetch_copy = params.get("fetch_copy", False)
+        self._cgroup_metrics = params.get("cgroup_metrics", False)
+        self._perf_counters = params.get("perf_counters", False)
 
         self._settings = settings
 
         self.container = None
+        self._cgroup = None
+
+        # whether the next executions capture the plan the system profiled, see `captured_query_plan`
+        self.capture_plan = False
+        self._captured_plan = None
+        # whether the next executions record the resources they consume, see `execute`
+        self.collect_metrics = True
 
     @property
     @abstractmethod
@@ -220,6 +253,102 @@ class DBMS(ABC):
     def _execute(self, query: str, fetch_result: bool, timeout: int = 0, fetch_result_limit: int = 0) -> Result:
         raise NotImplementedError()
 
+    def execute(self, query: str, fetch_result: bool, timeout: int = 0, fetch_result_limit: int = 0) -> Result:
+        """
+        Execute a measured query. Additionally to the timings of `_execute`, the resources consumed by the container of
+        the system and, if enabled, its hardware performance counters are recorded in the extra information of the result.
+
+        Args:
+            query (str): The query to execute.
+            fetch_result (bool): Whether to fetch the result.
+            timeout (int): The timeout in seconds (default: 0 - no timeout).
+            fetch_result_limit (int): The maximum number of rows to fetch (default: 0 - no limit).
+
+        Returns:
+            Result: The result of the execution.
+        """
+        cgroup = self._container_cgroup()
+        if cgroup is None or not self.collect_metrics or not (self._cgroup_metrics or self._perf_counters):
+            return self._execute(query, fetch_result, timeout=timeout, fetch_result_limit=fetch_result_limit)
+
+        with ExitStack() as stack:
+            monitors = []
+            if self._cgroup_metrics:
+                monitors.append(stack.enter_context(CgroupMonitor(cgroup)))
+            if self._perf_counters:
+                try:
+                    monitors.append(stack.enter_context(PerfStat(cgroup)))
+                except Exception as e:
+                    logger.log_warn(f"Could not count performance counters, disabling them: {e}")
+                    self._perf_counters = False
+
+            result = self._execute(query, fetch_result, timeout=timeout, fetch_result_limit=fetch_result_limit)
+
+        for monitor in monitors:
+            if isinstance(monitor, PerfStat) and monitor.error is not None:
+                logger.log_warn(f"Could not count performance counters, disabling them: {monitor.error}")
+                self._perf_counters = False
+                continue
+            result.extra.update(monitor.metrics())
+        return result
+
+    def profile(self, query: str, path: str, fetch_result: bool, timeout: int = 0, fetch_result_limit: int = 0, frequency: int = 999, svg: bool = False) -> list[str]:
+        """
+        Execute a query once more while recording a sampled CPU profile of the processes in the container of the system.
+        The result of the execution is discarded.
+
+        Args:
+            query (str): The query to profile.
+            path (str): The path of the profile without extension.
+            fetch_result (bool): Whether to fetch the result.
+            timeout (int): The timeout in seconds (default: 0 - no timeout).
+            fetch_result_limit (int): The maximum number of rows to fetch (default: 0 - no limit).
+            frequency (int): The sampling frequency in Hz (default: 999).
+            svg (bool): Whether to render a flame graph in addition to the folded stacks.
+
+        Returns:
+            list[str]: The written files, empty if the system cannot be profiled.
+        """
+        cgroup = self._container_cgroup()
+        if cgroup is None:
+            logger.log_warn_verbose(f"Cannot profile {self.name}, no container cgroup available")
+            return []
+
+        with PerfRecord(cgroup, frequency=frequency) as record:
+            self._execute(query, fetch_result, timeout=timeout, fetch_result_limit=fetch_result_limit)
+        if record.error is not None:
+            logger.log_warn(f"Could not profile {self.name}: {record.error}")
+            return []
+        return record.save(path, svg=svg)
+
+    def _container_cgroup(self) -> Optional[Cgroup]:
+        if self.container is None:
+            return None
+
+        # the container changes when the system is restarted
+        if self._cgroup is None or self._cgroup[0] != self.container.id:
+            self._cgroup = (self.container.id, Cgroup.of_container(self.container))
+        return self._cgroup[1]
+
+    def _stream_result(self, fetch_batch, result: Result):
+        """
+        Consume a query result batch by batch. The rows are counted and digested on the fly, but not retained, so that
+        the memory usage is bounded by the batch size regardless of the size of the result.
+
+        Args:
+            fetch_batch: A function returning the next batch of rows, or an empty batch if the result is exhausted.
+            result (Result): The result to store the number of rows and the digest in.
+        """
+        digest = ResultDigest()
+        while True:
+            batch = fetch_batch()
+            if not batch:
+                break
+            digest.update(batch)
+
+        result.rows = digest.rows
+        result.digest = digest.hexdigest()
+
     def load_database(self):
         primary_key = self._index in [DBMS.Index.PRIMARY, DBMS.Index.FOREIGN]
         foreign_keys = self._index == DBMS.Index.FOREIGN
@@ -280,6 +409,22 @@ class DBMS(ABC):
                     progress.finish()
                     logger.log_verbose_dbms(f'Executed additional query in {formatter.format_time(time)}', self)
 
+    def refresh_statistics(self):
+        """
+        Collect the statistics of the optimizer again. Systems without a statistics command keep their statistics.
+        """
+        logger.log_warn_verbose(f"{self.name} cannot refresh its statistics")
+
+    def restart(self):
+        """
+        Restart the system in a new container. The database directory does not outlive the container, so the database
+        is loaded again.
+        """
+        logger.log_verbose_dbms(f"Restarting {self.name}", self)
+        self.__exit__(None, None, None)
+        self.__enter__()
+        self.load_database()
+
     def benchmark_query(self, queries: list[(str, str)], repetitions: int, warmup: int, timeout: int = 0, fetch_result: bool = True) -> list[str, Result]:
         results: dict[str, Result] = {}
 
@@ -293,8 +438,10 @@ class DBMS(ABC):
                     progress.finish()
 
                 for i in range(repetitions):
-                    result.merge(self._execute(query, fetch_result, timeout=timeout))
+                    self.collect_metrics = i == repetitions - 1
+                    result.merge(self.execute(query, fetch_result, timeout=timeout))
                     progress.finish()
+                self.collect_metrics = True
 
                 results[name] = result
 
@@ -303,6 +450,21 @@ class DBMS(ABC):
 
         return results
 
+    def captured_query_plan(self, query: str, include_system_representation: bool = False) -> Optional[QueryPlan]:
+        """
+        Parse the analyzed plan the system recorded during the last execution with `capture_plan` enabled.
+        Systems that do not profile their executions return None, and the plan has to be retrieved with
+        `retrieve_query_plan`, which executes the query once more.
+
+        Args:
+            query (str): The executed query.
+            include_system_representation (bool): Whether to include the system's representation of the operators.
+
+        Returns:
+            Optional[QueryPlan]: The captured plan, or None if no plan was captured.
+        """
+        return None
+
     def retrieve_query_plan(self, query: str, include_system_representation: bool = False) -> QueryPlan:
         return None
 
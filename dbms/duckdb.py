@@ -2,6 +2,7 @@ import os
 import tempfile
 import threading
 import time
+from typing import Optional
 
 import requests
 import simplejson as json
@@ -10,7 +11,7 @@ from benchmarks.benchmark import Benchmark
 from dbms.dbms import DBMS, Result, DBMSDescription
 from queryplan.parsers.duckdbparser import DuckDBParser
 from queryplan.queryplan import QueryPlan
-from util import logger, sql
+from util import deepjson, logger, sql
 
 duck = None
 
@@ -86,7 +87,7 @@ class DuckDB(DBMS):
             timer_kill = threading.Timer(timeout * 10, self._kill_container)
             timer_kill.start()
 
-        payload = {"query": query.strip(), "timeout": timeout, "fetch": fetch_result, "limit": fetch_result_limit}
+        payload = {"query": query.strip(), "timeout": timeout, "fetch": fetch_result, "limit": fetch_result_limit, "profile": self.capture_plan}
         response = requests.post(self.connection, json=payload)
 
         if timer_kill is not None:
@@ -113,6 +114,9 @@ class DuckDB(DBMS):
             if payload.get("compilation") is not None:
                 output.compilation.append(payload.get("compilation"))
 
+        if self.capture_plan:
+            self._captured_plan = payload.get("profile") if output.state == Result.SUCCESS else None
+
         if fetch_result:
             try:
                 with open(os.path.join(self.host_dir.name, "results.json"), 'r') as result_file:
@@ -123,11 +127,23 @@ class DuckDB(DBMS):
 
         return output
 
+    def refresh_statistics(self):
+        self._execute("analyze", False)
+
+    def captured_query_plan(self, query: str, include_system_representation: bool = False) -> Optional[QueryPlan]:
+        # the server returns the json profile that DuckDB writes for every query
+        if not self._captured_plan:
+            return None
+        json_plan = deepjson.loads(self._captured_plan, cls=json.JSONDecoder)
+        self._captured_plan = None
+        plan_parser = DuckDBParser(include_system_representation=include_system_representation)
+        return plan_parser.parse_json_plan(query, json_plan)
+
     def retrieve_query_plan(self, query: str, include_system_representation: bool = False) -> QueryPlan:
         result = self._execute(query="explain (format json, analyze) " + query.strip(), fetch_result=True).result
         if not result or not result[0]:
             return None
-        json_plan = json.loads(result[0][1])
+        json_plan = deepjson.loads(result[0][1], cls=json.JSONDecoder)
         plan_parser = DuckDBParser(include_system_representation=include_system_representation)
         query_plan = plan_parser.parse_json_plan(query, json_plan)
         return query_plan
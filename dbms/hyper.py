@@ -6,7 +6,7 @@ from dbms.dbms import DBMS, DBMSDescription
 from dbms.duckdb import DuckDB
 from queryplan.parsers.hyperparser import HyperParser
 from queryplan.queryplan import QueryPlan
-from util import sql
+from util import deepjson, sql
 
 
 class Hyper(DuckDB):
@@ -42,9 +42,13 @@ class Hyper(DuckDB):
     def _copy_statements(self, schema: dict) -> list[str]:
         return sql.copy_statements_postgres(schema, "/data")
 
+    def refresh_statistics(self):
+        # Hyper has no statistics command
+        DBMS.refresh_statistics(self)
+
     def retrieve_query_plan(self, query: str, include_system_representation: bool = False) -> QueryPlan:
         result = self._execute(query="explain (format json, analyze) " + query.strip(), fetch_result=True).result
-        json_plan = json.loads(result[0][0])["input"]
+        json_plan = deepjson.loads(result[0][0])["input"]
         plan_parser = HyperParser(include_system_representation=include_system_representation)
         query_plan = plan_parser.parse_json_plan(query, json_plan)
         return query_plan
@@ -9,6 +9,8 @@ import pymonetdb
 from benchmarks.benchmark import Benchmark
 from dbms.dbms import DBMS, Result
 from dbms.dbms import DBMSDescription
+from queryplan.parsers.monetdbparser import MonetDBParser
+from queryplan.queryplan import QueryPlan
 from util import sql, logger
 
 
@@ -100,6 +102,7 @@ class MonetDB(DBMS):
         try:
             self.cursor.execute(query)
         except Exception as e:
+            client_total = time.time() - begin
             logger.log_error_verbose(str(e))
             result.message = str(e)
             result.state = Result.TIMEOUT if "HYT00!Query aborted due to timeout" in result.message else Result.ERROR
@@ -110,6 +113,10 @@ class MonetDB(DBMS):
         if fetch_result:
             if fetch_result_limit > 0:
                 result.result = self.cursor.fetchmany(fetch_result_limit)
+            elif self._fetch_stream:
+                # pymonetdb uses the arraysize as the number of rows to transfer per block
+                self.cursor.arraysize = self._fetch_batch_size
+                self._stream_result(lambda: self.cursor.fetchmany(self._fetch_batch_size), result)
             else:
                 result.result = self.cursor.fetchall()
 
@@ -121,6 +128,23 @@ class MonetDB(DBMS):
         super().load_database()
         self.cursor.execute("call sys.analyze()")
 
+    def refresh_statistics(self):
+        self.cursor.execute("call sys.analyze()")
+
+    def retrieve_query_plan(self, query: str, include_system_representation: bool = False) -> QueryPlan:
+        self.cursor.execute("call sys.setquerytimeout(0)")
+        self.cursor.execute("plan " + query.strip())
+        lines = [row[0] for row in self.cursor.fetchall()]
+
+        # the trace has the time of every executed MAL instruction in microseconds
+        self.cursor.execute("trace " + query.strip())
+        rows = self.cursor.rowcount
+        self.cursor.execute("select ticks, stmt from sys.tracelog()")
+        trace = [[int(ticks), stmt] for ticks, stmt in self.cursor.fetchall()]
+
+        plan_parser = MonetDBParser(include_system_representation=include_system_representation)
+        return plan_parser.parse_json_plan(query, {"plan": lines, "trace": trace, "rows": rows})
+
 
 class MonetDBDescription(DBMSDescription):
     @staticmethod
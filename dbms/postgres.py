@@ -1,14 +1,21 @@
+import decimal
 import os
 import tempfile
 import threading
 import time
 
 import psycopg2
+import psycopg2.extras
 from benchmarks.benchmark import Benchmark
 from dbms.dbms import DBMS, Result, DBMSDescription
 from queryplan.parsers.postgresparser import PostgresParser
 from queryplan.queryplan import QueryPlan
-from util import sql, logger
+from util import deepjson, sql, logger
+from util.digest import ResultDigest
+
+# the minimum time (s) before a query that ignores its cancellation kills the container, sub-second timeouts, e.g., of
+# join orders, would otherwise kill it before the cancellation is processed
+min_kill_timeout = 10
 
 
 class Postgres(DBMS):
@@ -16,6 +23,8 @@ class Postgres(DBMS):
     def __init__(self, benchmark: Benchmark, db_dir: str, data_dir: str, params: dict, settings: dict):
         super().__init__(benchmark, db_dir, data_dir, params, settings)
 
+        self._server_statistics = params.get("server_statistics", False)
+
     @property
     def name(self) -> str:
         return "postgres"
@@ -44,6 +53,8 @@ class Postgres(DBMS):
         self._connection_string = f"PGPASSWORD='{password}' psql -h localhost -p {port} -U {user} -d {database}"
 
         self.connection.set_session(autocommit=True)
+        # plans of generated queries can be nested too deeply for the recursive json decoder
+        psycopg2.extras.register_default_json(self.connection, loads=deepjson.loads)
         self.cursor = self.connection.cursor()
 
         logger.log_verbose_dbms(f"Established connection to {self.name}", self)
@@ -86,6 +97,12 @@ class Postgres(DBMS):
         config("seq_page_cost", "1")
         config("enable_nestloop", "0")
 
+        # per-query server statistics
+        if self._server_statistics:
+            config("shared_preload_libraries", "pg_stat_statements")
+            config("pg_stat_statements.track_planning", "on")
+            config("track_io_timing", "on")
+
         # user settings
         for key, value in self._settings.items():
             config(key, value)
@@ -112,6 +129,9 @@ class Postgres(DBMS):
         self._start_container(postgres_environment, 5432, 54321, self.host_dir.name, "/db", docker_params=docker_params)
         self._connect("postgres", "postgres", "postgres", 54321)
 
+        if self._server_statistics:
+            self.cursor.execute("create extension if not exists pg_stat_statements")
+
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
@@ -129,24 +149,30 @@ class Postgres(DBMS):
     def _execute(self, query: str, fetch_result: bool, timeout: int = 0, fetch_result_limit: int = 0) -> Result:
         result = Result()
 
+        if self._server_statistics:
+            self.cursor.execute("select pg_stat_statements_reset()")
+
         timer = None
         timer_kill = None
         if timeout > 0:
-            timer_kill = threading.Timer(timeout * 10, self._kill_container)
+            timer_kill = threading.Timer(max(timeout * 10, min_kill_timeout), self._kill_container)
             timer_kill.start()
             timer = threading.Timer(timeout, self.connection.cancel)
             timer.start()
 
         begin = time.time()
         try:
-            self.cursor.execute(query)
-
-            result.rows = self.cursor.rowcount
-            if fetch_result:
-                if fetch_result_limit > 0:
-                    result.result = self.cursor.fetchmany(fetch_result_limit)
-                else:
-                    result.result = self.cursor.fetchall()
+            if fetch_result and fetch_result_limit == 0 and self._fetch_stream:
+                self._execute_streaming(query, result)
+            else:
+                self.cursor.execute(query)
+
+                result.rows = self.cursor.rowcount
+                if fetch_result:
+                    if fetch_result_limit > 0:
+                        result.result = self.cursor.fetchmany(fetch_result_limit)
+                    else:
+                        result.result = self.cursor.fetchall()
 
             client_total = time.time() - begin
             result.client_total.append(client_total * 1000)
@@ -178,16 +204,158 @@ class Postgres(DBMS):
             timer.cancel()
             timer.join()
 
+        if self._server_statistics:
+            self._collect_server_statistics(result)
+
         return result
 
+    def _collect_server_statistics(self, result: Result):
+        """
+        Read the statistics of the last statement from pg_stat_statements, which was reset right before the statement.
+        The column names differ between the PostgreSQL versions, missing columns are skipped.
+        """
+        self.cursor.execute("select * from pg_stat_statements where query not like '%pg_stat_statements%'")
+        columns = [column.name for column in self.cursor.description]
+
+        statistics = {}
+        for row in self.cursor.fetchall():
+            for column, value in zip(columns, row):
+                if isinstance(value, (int, float, decimal.Decimal)) and not isinstance(value, bool):
+                    statistics[column] = statistics.get(column, 0) + float(value)
+
+        if not statistics:
+            return
+
+        def get(*names: str) -> float | None:
+            values = [statistics[name] for name in names if name in statistics]
+            return sum(values) if values else None
+
+        # planning and execution times (PostgreSQL 12 only reports the total time)
+        planning = get("total_plan_time")
+        execution = get("total_exec_time", "total_time")
+        if execution is not None:
+            result.execution.append(execution)
+            result.total.append(execution + (planning or 0))
+        if planning is not None:
+            result.compilation.append(planning)
+
+        # buffer usage, spilling, and I/O timing (requires track_io_timing)
+        extra = {
+            "shared_blks_hit": get("shared_blks_hit"),
+            "shared_blks_read": get("shared_blks_read"),
+            "shared_blks_dirtied": get("shared_blks_dirtied"),
+            "shared_blks_written": get("shared_blks_written"),
+            "temp_blks_read": get("temp_blks_read"),
+            "temp_blks_written": get("temp_blks_written"),
+            "blk_read_time": get("blk_read_time", "shared_blk_read_time", "local_blk_read_time"),
+            "blk_write_time": get("blk_write_time", "shared_blk_write_time", "local_blk_write_time"),
+            "temp_blk_read_time": get("temp_blk_read_time"),
+            "temp_blk_write_time": get("temp_blk_write_time"),
+            "wal_bytes": get("wal_bytes"),
+        }
+        result.extra.update({k: v for k, v in extra.items() if v is not None})
+
+    def _execute_streaming(self, query: str, result: Result):
+        if self._fetch_copy:
+            # stream the result in the binary copy format, which avoids converting the rows to python objects
+            sink = _CopyDigestSink()
+            self.cursor.copy_expert(f"copy ({query.strip().rstrip(';')}) to stdout (format binary)", sink)
+            result.rows = sink.digest.rows
+            result.digest = sink.digest.hexdigest()
+            return
+
+        # named cursors are server-side cursors that have to live within a transaction
+        self.connection.autocommit = False
+        try:
+            with self.connection.cursor(name="olapbench") as cursor:
+                cursor.itersize = self._fetch_batch_size
+                cursor.execute(query)
+                self._stream_result(lambda: cursor.fetchmany(self._fetch_batch_size), result)
+            self.connection.commit()
+        except Exception:
+            if not self.connection.closed:
+                self.connection.rollback()
+            raise
+        finally:
+            if not self.connection.closed:
+                self.connection.autocommit = True
+
+    def refresh_statistics(self):
+        self._execute("analyze", False)
+
+    def force_join_order(self, enabled: bool):
+        """
+        Join the tables of the following queries in the order of the explicit joins in their from clause.
+
+        Args:
+            enabled (bool): Whether to force the join order or to let the optimizer choose it again.
+        """
+        self._execute("set join_collapse_limit = 1" if enabled else "reset join_collapse_limit", False)
+
     def retrieve_query_plan(self, query: str, include_system_representation: bool = False) -> QueryPlan:
-        result = self._execute(query="explain (format json, analyze) " + query.strip(), fetch_result=True).result
+        result = self._execute(query="explain (format json, analyze) " + query.strip(), fetch_result=True, fetch_result_limit=1).result
         json_plan = result[0][0][0]
         plan_parser = PostgresParser(include_system_representation=include_system_representation)
         query_plan = plan_parser.parse_json_plan(query, json_plan)
         return query_plan
 
 
+class _CopyDigestSink:
+    """
+    File-like sink for `copy ... to stdout (format binary)` that counts and digests the tuples while they are streamed.
+    Only the current incomplete tuple is buffered.
+    """
+
+    _HEADER_SIZE = 19  # signature (11 bytes), flags (4 bytes), and header extension length (4 bytes)
+
+    def __init__(self):
+        self.digest = ResultDigest()
+        self._buffer = bytearray()
+        self._header = False
+
+    def write(self, data: bytes) -> int:
+        self._buffer += data
+        buffer = self._buffer
+        offset = 0
+
+        if not self._header:
+            if len(buffer) < self._HEADER_SIZE:
+                return len(data)
+            extension = int.from_bytes(buffer[15:19], "big")
+            if len(buffer) < self._HEADER_SIZE + extension:
+                return len(data)
+            offset = self._HEADER_SIZE + extension
+            self._header = True
+
+        while len(buffer) - offset >= 2:
+            fields = int.from_bytes(buffer[offset:offset + 2], "big", signed=True)
+            if fields == -1:
+                # file trailer
+                offset += 2
+                break
+
+            end = offset + 2
+            for _ in range(fields):
+                if len(buffer) - end < 4:
+                    end = None
+                    break
+                length = int.from_bytes(buffer[end:end + 4], "big", signed=True)
+                end += 4 + max(length, 0)
+                if end > len(buffer):
+                    end = None
+                    break
+
+            if end is None:
+                # incomplete tuple, wait for more data
+                break
+
+            self.digest.update_encoded(bytes(buffer[offset:end]))
+            offset = end
+
+        del buffer[:offset]
+        return len(data)
+
+
 class PostgresDescription(DBMSDescription):
     @staticmethod
     def get_name() -> str:
@@ -1,8 +1,12 @@
 import tempfile
 
+import simplejson as json
+
 from benchmarks.benchmark import Benchmark
-from dbms.dbms import DBMS, DBMSDescription
+from dbms.dbms import DBMS, DBMSDescription, Result
 from dbms.sqlserver import SQLServer
+from queryplan.parsers.singlestoreparser import SingleStoreParser
+from queryplan.queryplan import QueryPlan
 from util import sql
 
 
@@ -64,6 +68,21 @@ class SingleStore(SQLServer):
     def load_database(self):
         DBMS.load_database(self)
 
+    def refresh_statistics(self):
+        schema = self._transform_schema(self._benchmark.get_schema())
+        for table in schema["tables"]:
+            self.cursor.execute(f"analyze table {table['name']}")
+
+    def retrieve_query_plan(self, query: str, include_system_representation: bool = False) -> QueryPlan:
+        result = self._execute(query="profile " + query.strip(), fetch_result=False)
+        if result.state != Result.SUCCESS:
+            raise Exception(f"could not profile the query: {result.message}")
+
+        self.cursor.execute("show profile json")
+        json_plan = json.loads(self.cursor.fetchone()[0])
+        plan_parser = SingleStoreParser(include_system_representation=include_system_representation)
+        return plan_parser.parse_json_plan(query, json_plan)
+
     def connection_string(self) -> str:
         return 'iusql "DRIVER={MariaDB};Server=127.0.0.1;Port=33061;DATABASE=benchy;TrustServerCertificate=yes;UID=root;PWD=SingleStore;OPTION=68157440" -v'
 
@@ -7,6 +7,7 @@ import pyodbc
 
 from benchmarks.benchmark import Benchmark
 from dbms.dbms import DBMS, DBMSDescription, Result
+from queryplan.parsers.sqlserverparser import SQLServerParser
 from queryplan.queryplan import QueryPlan
 from util import sql, logger
 
@@ -130,6 +131,9 @@ class SQLServer(DBMS):
             if fetch_result:
                 if fetch_result_limit > 0:
                     result.result = self.cursor.fetchmany(fetch_result_limit)
+                elif self._fetch_stream:
+                    self.cursor.arraysize = self._fetch_batch_size
+                    self._stream_result(lambda: self.cursor.fetchmany(self._fetch_batch_size), result)
                 else:
                     result.result = self.cursor.fetchall()
                     result.rows = len(result.result)
@@ -193,16 +197,28 @@ class SQLServer(DBMS):
         super().load_database()
         self.cursor.execute("DBCC CHECKDB")
 
+    def refresh_statistics(self):
+        self.cursor.execute("exec sp_updatestats")
+
     def retrieve_query_plan(self, query: str, include_system_representation: bool = False) -> QueryPlan:
-        self.cursor.execute("set showplan_xml on;")
-        self.cursor.commit()
-        result = self._execute(query=query.strip(), fetch_result=True).result
-        xml_plan = result[0][0]
-        self.cursor.commit()
-        self.cursor.execute("set showplan_xml off;")
-        self.cursor.commit()
-        print(xml_plan)
-        return QueryPlan(text=query, plan=xml_plan)
+        # the actual plan of every statement is returned as an additional result set after the results of the statement
+        self.cursor.execute("set statistics xml on;")
+        xml_plans = []
+        try:
+            self.cursor.execute(query.strip())
+            while True:
+                if self.cursor.description is not None and self.cursor.description[0][0] == "Microsoft SQL Server 2005 XML Showplan":
+                    xml_plans.extend(row[0] for row in self.cursor.fetchall())
+                if not self.cursor.nextset():
+                    break
+        finally:
+            self.cursor.execute("set statistics xml off;")
+
+        if not xml_plans:
+            raise Exception("sqlserver did not return a showplan")
+
+        plan_parser = SQLServerParser(include_system_representation=include_system_representation)
+        return plan_parser.parse_json_plan(query, xml_plans[-1])
 
 
 class SQLServerDescription(DBMSDescription):
@@ -12,7 +12,7 @@ from dbms.dbms import DBMSDescription
 from dbms.postgres import Postgres
 from queryplan.parsers.umbraparser import UmbraParser
 from queryplan.queryplan import QueryPlan
-from util import sql, logger
+from util import deepjson, sql, logger
 
 
 class Umbra(Postgres):
@@ -79,6 +79,11 @@ class Umbra(Postgres):
 
         self._umbra_db = params["umbra_db"] if "umbra_db" in params else None
 
+        # pg_stat_statements is specific to PostgreSQL
+        if self._server_statistics:
+            logger.log_warn(f"{self.name} does not support server statistics, ignoring `server_statistics`")
+            self._server_statistics = False
+
     @property
     def name(self) -> str:
         return "umbra"
@@ -171,11 +176,11 @@ class Umbra(Postgres):
         return "".join(res.result)
 
     def retrieve_query_plan(self, query: str, include_system_representation: bool = False) -> QueryPlan:
-        result = self._execute(query="explain (format json, analyze) " + query.strip(), fetch_result=True).result
+        result = self._execute(query="explain (format json, analyze) " + query.strip(), fetch_result=True, fetch_result_limit=1).result
         if not result or not result[0]:
             return None
         text_plan = result[0][0]
-        json_plan = json.loads(text_plan, allow_nan=True)
+        json_plan = deepjson.loads(text_plan, cls=json.JSONDecoder, allow_nan=True)
         plan_parser = UmbraParser(include_system_representation=include_system_representation)
         query_plan = plan_parser.parse_json_plan(query, json_plan)
         return query_plan
@@ -12,7 +12,7 @@ from dbms.dbms import DBMS, Result
 from dbms.umbra import UmbraDescription, Umbra
 from queryplan.parsers.umbraparser import UmbraParser
 from queryplan.queryplan import QueryPlan
-from util import logger, sql
+from util import deepjson, logger, sql
 from util.process import Process
 
 
@@ -230,7 +230,7 @@ class UmbraDev(Umbra):
     def retrieve_query_plan(self, query: str, include_system_representation: bool = False) -> QueryPlan:
         result = self._execute(query="explain (format json, analyze) " + query.strip(), fetch_result=True).result
         text_plan = "".join(result)
-        json_plan = json.loads(text_plan, allow_nan=True)
+        json_plan = deepjson.loads(text_plan, cls=json.JSONDecoder, allow_nan=True)
         plan_parser = UmbraParser(include_system_representation=include_system_representation)
         query_plan = plan_parser.parse_json_plan(query, json_plan)
         return query_plan
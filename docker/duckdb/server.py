@@ -44,6 +44,7 @@ async def execute_query(payload: dict):
     timeout = int(payload.get("timeout", 0))
     fetch = bool(payload.get("fetch", False))
     fetch_limit = int(payload.get("limit", 0))
+    return_profile = bool(payload.get("profile", False))
 
     if not query:
         return {"rows": -1, "error": "no query provided", "client_total": float('nan'), "total": float('nan')}
@@ -88,9 +89,11 @@ async def execute_query(payload: dict):
         timer.join()
 
     total = None
+    profile = None
     try:
-        with open(profile_output, 'r') as profile:
-            total = float(re.findall(r'result...([0-9.]*)', profile.read())[-1]) * 1000
+        with open(profile_output, 'r') as profile_file:
+            profile = profile_file.read()
+        total = float(re.findall(r'result...([0-9.]*)', profile)[-1]) * 1000
     except Exception:
         pass
 
@@ -99,7 +102,7 @@ async def execute_query(payload: dict):
         with open(results_path, "w") as f:
             f.write(json.dumps(result, use_decimal=True, default=sql_encoder))
 
-    return {"rows": rows, "error": error_message, "client_total": client_total, "total": total}
+    return {"rows": rows, "error": error_message, "client_total": client_total, "total": total, "profile": profile if return_profile else None}
 
 
 if __name__ == "__main__":
@@ -0,0 +1,60 @@
+from typing import List
+
+from queryplan.plannode import InnerNode, PlanNode, postorder, preorder
+from queryplan.queryoperator import CustomOperator, QueryOperator
+
+
+def operator_name(operator: QueryOperator) -> str:
+    """
+    Returns:
+        str: The operator class used to attribute runtime, e.g., Join, GroupBy, or the name of a custom operator.
+    """
+    if isinstance(operator, CustomOperator):
+        return operator.name
+    return operator.operator_type.name
+
+
+def attribute_times(plan_node: PlanNode):
+    """
+    Complete the times of a plan in place. Systems report either the self time of an operator (e.g., DuckDB) or its
+    cumulative time including the children (e.g., Postgres); the missing one is derived from the other and the times of
+    the children. Derived self times are clamped to zero, as parallel workers can make the children's times exceed the
+    time of their parent.
+
+    Args:
+        plan_node (PlanNode): The root of the plan.
+    """
+    for node in postorder(plan_node):
+        children = node.children if isinstance(node, InnerNode) else []
+        children_time = sum(child.cumulative_time for child in children if child.cumulative_time is not None)
+        if node.cumulative_time is None and node.self_time is not None:
+            node.cumulative_time = node.self_time + children_time
+        elif node.self_time is None and node.cumulative_time is not None:
+            node.self_time = max(node.cumulative_time - children_time, 0.0)
+        elif node.cumulative_time is None and children and all(child.cumulative_time is not None for child in children):
+            # operators added by the parsers take no time on their own
+            node.cumulative_time = children_time
+
+
+def plan_nodes(plan_node: PlanNode) -> List[PlanNode]:
+    """
+    Returns:
+        List[PlanNode]: All nodes of the plan in pre-order.
+    """
+    return list(preorder(plan_node))
+
+
+def top_operators(plan_node: PlanNode, k: int = 5) -> List[PlanNode]:
+    """
+    Determine the most expensive operators of a plan by their self time.
+
+    Args:
+        plan_node (PlanNode): The root of the plan.
+        k (int): The number of operators to return (default: 5).
+
+    Returns:
+        List[PlanNode]: The at most k nodes with the highest self time, most expensive first.
+    """
+    nodes = [node for node in plan_nodes(plan_node) if node.self_time is not None]
+    nodes.sort(key=lambda node: node.self_time, reverse=True)
+    return nodes[:k]
@@ -1,13 +1,25 @@
 from abc import ABC, abstractmethod
+from typing import List
 
-from queryplan.plannode import PlanNode
+from queryplan.plannode import InnerNode, PlanNode, fold
 
 
 class Cleaner(ABC):
 
-    @abstractmethod
     def clean(self, plan_node: PlanNode) -> PlanNode:
         """Return the new root"""
+        # post-order without recursion, every node is cleaned after its children have been cleaned and replaced
+        return fold(plan_node, self._clean)
+
+    def _clean(self, plan_node: PlanNode, children: List[PlanNode]) -> PlanNode:
+        if not isinstance(plan_node, InnerNode):
+            return plan_node
+        plan_node.children = children
+        return self.clean_node(plan_node)
+
+    @abstractmethod
+    def clean_node(self, plan_node: InnerNode) -> PlanNode:
+        """Clean an inner node whose children are cleaned already, return the node replacing it"""
         pass
 
     def replace_node(self, old: PlanNode, new: PlanNode) -> PlanNode:
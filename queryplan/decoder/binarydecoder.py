@@ -0,0 +1,134 @@
+import json
+import struct
+
+from queryplan.decoder.jsondecoder import operator_classes
+from queryplan.encoder.binaryencoder import BINARY_FORMAT_VERSION, NODE_SLOTS, TAG_FALSE, TAG_FLOAT, TAG_INT, TAG_JSON, TAG_NONE, TAG_STRING, TAG_TRUE
+from queryplan.plannode import InnerNode, LeafNode, PlanNode
+from queryplan.queryoperator import CustomOperator, OperatorType
+from queryplan.queryplan import QueryPlan
+
+_float = struct.Struct("<d")
+_operator_types = {operator_type.value[0]: operator_type for operator_type in OperatorType}
+
+
+class QueryPlanBinaryDecoder:
+    """
+    Restores plans encoded by the QueryPlanBinaryEncoder.
+    """
+
+    def __init__(self):
+        self._data = b""
+        self._pos = 0
+        self._strings = []
+
+    def decode(self, data: bytes) -> QueryPlan:
+        """
+        Args:
+            data (bytes): A query plan encoded by `QueryPlanBinaryEncoder.encode`.
+
+        Returns:
+            QueryPlan: The query plan.
+        """
+        text, plan = self._decode(data)
+        return QueryPlan(text=text, plan=plan)
+
+    def decode_plan_node(self, data: bytes) -> PlanNode:
+        return self._decode(data)[1]
+
+    def _read_varint(self) -> int:
+        data = self._data
+        byte = data[self._pos]
+        self._pos += 1
+        if byte < 0x80:
+            # most varints are ids, counts, and small cardinalities that fit into a single byte
+            return byte
+
+        result = byte & 0x7F
+        shift = 7
+        while True:
+            byte = data[self._pos]
+            self._pos += 1
+            result |= (byte & 0x7F) << shift
+            if byte < 0x80:
+                return result
+            shift += 7
+
+    def _read_signed_varint(self) -> int:
+        value = self._read_varint()
+        return (value >> 1) if not value & 1 else -((value + 1) >> 1)
+
+    def _read_value(self):
+        tag = self._data[self._pos]
+        self._pos += 1
+        if tag == TAG_INT:
+            return self._read_signed_varint()
+        elif tag == TAG_STRING:
+            return self._strings[self._read_varint()]
+        elif tag == TAG_NONE:
+            return None
+        elif tag == TAG_FLOAT:
+            value = _float.unpack_from(self._data, self._pos)[0]
+            self._pos += _float.size
+            return value
+        elif tag == TAG_TRUE:
+            return True
+        elif tag == TAG_FALSE:
+            return False
+        elif tag == TAG_JSON:
+            return json.loads(self._strings[self._read_varint()])
+        raise ValueError(f"invalid value tag {tag} at position {self._pos - 1}")
+
+    def _decode(self, data: bytes) -> tuple[str | None, PlanNode]:
+        self._data = data
+        self._pos = 1
+        if data[0] != BINARY_FORMAT_VERSION:
+            raise ValueError(f"unsupported binary plan format version {data[0]}")
+
+        self._strings = []
+        for _ in range(self._read_varint()):
+            length = self._read_varint()
+            self._strings.append(data[self._pos:self._pos + length].decode())
+            self._pos += length
+        text = self._read_value()
+
+        # the node slots present for each bitmask
+        mask_slots = {}
+
+        # parents whose children are not decoded yet, with the number of missing children
+        root = None
+        stack = []
+        while root is None or stack:
+            operator_type = _operator_types[self._read_varint()]
+            operator_id = self._read_value()
+            operator = CustomOperator(None, operator_id) if operator_type == OperatorType.CustomOperator else operator_classes[operator_type](operator_id)
+
+            mask = self._read_varint()
+            present = mask_slots.get(mask)
+            if present is None:
+                present = mask_slots[mask] = [slot for i, slot in enumerate(NODE_SLOTS) if mask & (1 << i)]
+            slots = {slot: self._read_value() for slot in present}
+
+            for _ in range(self._read_varint()):
+                attr = self._strings[self._read_varint()]
+                setattr(operator, attr, self._read_value())
+
+            children = self._read_varint()
+            system_representation = slots.pop("system_representation", [None])
+            if children:
+                node = InnerNode(operator, slots.pop("estimated_cardinality", None), slots.pop("exact_cardinality", None), [], None, **slots)
+            else:
+                node = LeafNode(operator, slots.pop("estimated_cardinality", None), slots.pop("exact_cardinality", None), None, **slots)
+            node.system_representation = system_representation
+
+            if stack:
+                parent = stack[-1]
+                parent[0].children.append(node)
+                parent[1] -= 1
+                if parent[1] == 0:
+                    stack.pop()
+            else:
+                root = node
+            if children:
+                stack.append([node, children])
+
+        return text, root
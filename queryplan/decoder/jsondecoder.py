@@ -0,0 +1,83 @@
+import json
+
+from queryplan.encoder.serdeskeys import *
+from queryplan.plannode import InnerNode, LeafNode, PlanNode
+from queryplan.queryoperator import ArrayUnnest, CustomOperator, EarlyProbe, GroupBy, GroupJoin, InlineTable, Iteration, IterationScan, Join, Map, OperatorType, PipelineBreakerScan, QueryOperator, RegexSplit, Result, Select, SetOperation, Sort, Subquery, TableScan, Temp, Window
+
+operator_classes = {
+    OperatorType.Result: Result,
+    OperatorType.TableScan: TableScan,
+    OperatorType.InlineTable: InlineTable,
+    OperatorType.Temp: Temp,
+    OperatorType.PipelineBreakerScan: PipelineBreakerScan,
+    OperatorType.Select: Select,
+    OperatorType.Map: Map,
+    OperatorType.Sort: Sort,
+    OperatorType.GroupBy: GroupBy,
+    OperatorType.Join: Join,
+    OperatorType.GroupJoin: GroupJoin,
+    OperatorType.EarlyProbe: EarlyProbe,
+    OperatorType.SetOperation: SetOperation,
+    OperatorType.Window: Window,
+    OperatorType.Iteration: Iteration,
+    OperatorType.IterationScan: IterationScan,
+    OperatorType.ArrayUnnest: ArrayUnnest,
+    OperatorType.RegexSplit: RegexSplit,
+    OperatorType.Subquery: Subquery,
+}
+
+
+class QueryPlanJsonDecoder:
+    """
+    Restores plan nodes from the representation written by the QueryPlanJsonEncoder.
+    """
+
+    def decode_plan_node(self, json_dict: dict) -> PlanNode:
+        # pre-order with an explicit stack, every node is added to the children of its already decoded parent
+        root = None
+        stack = [(json_dict, None)]
+        while stack:
+            entry, siblings = stack.pop()
+            node = self.create_plan_node(entry)
+            if siblings is None:
+                root = node
+            else:
+                siblings.append(node)
+
+            if isinstance(node, InnerNode):
+                stack.extend((child, node.children) for child in reversed(entry[JX_CHILDREN_KEY]))
+
+        return root
+
+    def create_plan_node(self, json_dict: dict) -> PlanNode:
+        """
+        Returns:
+            PlanNode: The node without its children, inner nodes get an empty list of children.
+        """
+        attrs = dict(json_dict[JX_ATTRS_KEY])
+        operator = self.create_operator(json_dict[JX_LABEL_KEY], attrs)
+
+        node_attrs = {}
+        for attr, val in attrs.items():
+            if attr in NODE_ATTRS:
+                node_attrs[attr] = val
+            else:
+                setattr(operator, attr, val)
+
+        # the encoder stores the system representation as json string
+        system_representation = node_attrs.pop(SYSTEM_REPRESENTATION_KEY, None)
+        system_representation = json.loads(system_representation) if system_representation is not None else [None]
+
+        if json_dict[JX_CHILDREN_KEY]:
+            node = InnerNode(operator, node_attrs.pop(ESTIMATED_CARDINALITY_KEY, None), node_attrs.pop(EXACT_CARDINALITY_KEY, None), [], None, **node_attrs)
+        else:
+            node = LeafNode(operator, node_attrs.pop(ESTIMATED_CARDINALITY_KEY, None), node_attrs.pop(EXACT_CARDINALITY_KEY, None), None, **node_attrs)
+        node.system_representation = system_representation
+        return node
+
+    def create_operator(self, label: str, attrs: dict) -> QueryOperator:
+        operator_id = attrs.pop(OPERATOR_ID_KEY, None)
+        operator_type = OperatorType[label]
+        if operator_type == OperatorType.CustomOperator:
+            return CustomOperator(attrs.pop(OPERATOR_NAME_KEY, None), operator_id)
+        return operator_classes[operator_type](operator_id)
@@ -0,0 +1,139 @@
+import json
+import struct
+
+from queryplan.encoder.plannodeencoder import PlanNodeEncoder
+from queryplan.plannode import InnerNode, PlanNode
+
+# format version, written as the first byte of every encoded plan
+BINARY_FORMAT_VERSION = 1
+
+# plan node attributes with a fixed slot, their presence is encoded as bitmask
+NODE_SLOTS = ["estimated_cardinality", "exact_cardinality", "self_time", "cumulative_time", "peak_memory", "loops", "system_representation"]
+
+# operator attributes stored with the operator type instead of as attribute
+OPERATOR_SLOTS = {"operator_type", "operator_id"}
+
+# value tags
+TAG_NONE = 0
+TAG_INT = 1
+TAG_FLOAT = 2
+TAG_STRING = 3
+TAG_TRUE = 4
+TAG_FALSE = 5
+TAG_JSON = 6
+
+_float = struct.Struct("<d")
+
+
+def write_varint(buffer: bytearray, value: int):
+    while value >= 0x80:
+        buffer.append((value & 0x7F) | 0x80)
+        value >>= 7
+    buffer.append(value)
+
+
+def write_signed_varint(buffer: bytearray, value: int):
+    # zigzag encoding, so that small negative values stay small
+    write_varint(buffer, (value << 1) if value >= 0 else ((-value << 1) - 1))
+
+
+class QueryPlanBinaryEncoder(PlanNodeEncoder):
+    """
+    Compact binary encoding of plans. Strings are interned in a table that precedes the nodes, the nodes follow in
+    pre-order. Every node consists of
+
+        varint operator type | operator id | varint bitmask of the present node slots | node slots |
+        varint number of operator attributes | (varint attribute name, value)* | varint number of children
+
+    Values are tagged: integers, e.g., cardinalities, are stored as zigzag varints, floats as 8 bytes, strings as index
+    into the string table, and lists and dicts as interned json strings.
+    """
+
+    def __init__(self):
+        self._strings = {}
+
+    def encode(self, query_plan) -> bytes:
+        """
+        Encode a query plan including its query text.
+
+        Args:
+            query_plan (QueryPlan): The query plan.
+
+        Returns:
+            bytes: The encoded plan.
+        """
+        return self._encode(query_plan.text, query_plan.plan)
+
+    def encode_plan_node(self, plan_node: PlanNode) -> bytes:
+        return self._encode(None, plan_node)
+
+    def _intern(self, s: str) -> int:
+        index = self._strings.get(s)
+        if index is None:
+            index = len(self._strings)
+            self._strings[s] = index
+        return index
+
+    def _write_value(self, buffer: bytearray, value):
+        if value is None:
+            buffer.append(TAG_NONE)
+        elif value is True:
+            buffer.append(TAG_TRUE)
+        elif value is False:
+            buffer.append(TAG_FALSE)
+        elif isinstance(value, int):
+            buffer.append(TAG_INT)
+            write_signed_varint(buffer, value)
+        elif isinstance(value, float):
+            buffer.append(TAG_FLOAT)
+            buffer += _float.pack(value)
+        elif isinstance(value, str):
+            buffer.append(TAG_STRING)
+            write_varint(buffer, self._intern(value))
+        else:
+            buffer.append(TAG_JSON)
+            write_varint(buffer, self._intern(json.dumps(value)))
+
+    def _encode(self, text: str | None, plan_node: PlanNode) -> bytes:
+        self._strings = {}
+        nodes = bytearray()
+
+        stack = [plan_node]
+        while stack:
+            node = stack.pop()
+            operator = node.operator
+
+            write_varint(nodes, operator.operator_type.value[0])
+            self._write_value(nodes, operator.operator_id)
+
+            mask = 0
+            for i, slot in enumerate(NODE_SLOTS):
+                if getattr(node, slot) is not None:
+                    mask |= 1 << i
+            write_varint(nodes, mask)
+            for i, slot in enumerate(NODE_SLOTS):
+                if mask & (1 << i):
+                    self._write_value(nodes, getattr(node, slot))
+
+            attrs = [(attr, val) for attr, val in operator.__dict__.items() if attr not in OPERATOR_SLOTS]
+            write_varint(nodes, len(attrs))
+            for attr, val in attrs:
+                write_varint(nodes, self._intern(attr))
+                self._write_value(nodes, val)
+
+            children = node.children if isinstance(node, InnerNode) else []
+            write_varint(nodes, len(children))
+            # the stack is last-in first-out, push the children in reverse to keep them in order
+            stack.extend(reversed(children))
+
+        buffer = bytearray([BINARY_FORMAT_VERSION])
+        self._write_value(buffer, text)
+        header = bytearray()
+        write_varint(header, len(self._strings))
+        for s in self._strings:
+            encoded = s.encode()
+            write_varint(header, len(encoded))
+            header += encoded
+
+        # the query text is interned as well, so the string table has to precede it
+        return bytes(buffer[:1] + header + buffer[1:] + nodes)
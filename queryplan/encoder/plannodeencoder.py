@@ -1,5 +1,7 @@
+import json
 from abc import ABC, abstractmethod
 
+from queryplan.encoder.serdeskeys import *
 from queryplan.plannode import PlanNode
 
 
@@ -8,3 +10,26 @@ class PlanNodeEncoder(ABC):
     @abstractmethod
     def encode_plan_node(self, plan_node: PlanNode) -> any:
         pass
+
+    @staticmethod
+    def node_attributes(plan_node: PlanNode) -> dict:
+        """
+        Returns:
+            dict: The attributes of the operator and of the plan node to encode, without the children. Lists and dicts
+            are encoded as json strings, attributes that are not set are omitted.
+        """
+        operator = plan_node.operator
+
+        attrs = {}
+        if operator.operator_id:
+            attrs[OPERATOR_ID_KEY] = operator.operator_id
+
+        # more operator OR plan node attributes?
+        for attr, val in dict(operator.__dict__, **dict(plan_node.attributes())).items():
+            if attr not in EXCLUDE_ATTRS:
+                # This would end up as "None", which is very misleading
+                if isinstance(val, list) or isinstance(val, dict):
+                    attrs[attr] = json.dumps(val)
+                elif val is not None:
+                    attrs[attr] = val
+        return attrs
@@ -13,6 +13,17 @@ LEAF_NODE_TAG_VALUE = "LeafNode"
 
 ESTIMATED_CARDINALITY_KEY = "estimated_cardinality"
 EXACT_CARDINALITY_KEY = "exact_cardinality"
+SELF_TIME_KEY = "self_time"
+CUMULATIVE_TIME_KEY = "cumulative_time"
+PEAK_MEMORY_KEY = "peak_memory"
+LOOPS_KEY = "loops"
+SYSTEM_REPRESENTATION_KEY = "system_representation"
+
+# python attribute names of plan nodes, all other attributes belong to the operator
+NODE_ATTRS = {
+    ESTIMATED_CARDINALITY_KEY, EXACT_CARDINALITY_KEY, SELF_TIME_KEY, CUMULATIVE_TIME_KEY, PEAK_MEMORY_KEY, LOOPS_KEY,
+    SYSTEM_REPRESENTATION_KEY
+}
 
 # plan metadata keys
 QUERY_TEXT_KEY = "queryText"
@@ -1,35 +1,32 @@
-import json
-from xml.etree.ElementTree import Element, tostring
+from xml.sax.saxutils import escape
 
 from queryplan.encoder.plannodeencoder import PlanNodeEncoder
-from queryplan.encoder.serdeskeys import *
 from queryplan.plannode import InnerNode, PlanNode
 
+# escaped like ElementTree escapes attribute values
+_attribute_entities = {"\"": "&quot;", "\r": "&#13;", "\n": "&#10;", "\t": "&#09;"}
+
 
 class QueryPlanXmlEncoder(PlanNodeEncoder):
 
     def encode_plan_node(self, plan_node: PlanNode) -> str:
-        return tostring(self.transform_plan_node(plan_node), encoding="unicode")
-
-    def transform_plan_node(self, plan_node: PlanNode) -> Element:
-        operator = plan_node.operator
-
-        element = Element(operator.operator_type.name)
-        if operator.operator_id:
-            element.attrib[OPERATOR_ID_KEY] = str(operator.operator_id)
-
-        # more operator OR plan node attributes?
-        for attr, val in dict(operator.__dict__, **plan_node.__dict__).items():
-            if attr not in EXCLUDE_ATTRS:
-                # This would end up as "None", which is very misleading
-                if isinstance(val, list) or isinstance(val, dict):
-                    element.attrib[attr] = json.dumps(val)
-                elif val is not None:
-                    # ensure all attribute values are strings
-                    element.attrib[attr] = str(val)
-
-        if isinstance(plan_node, InnerNode):
-            for child in plan_node.children:
-                element.append(self.transform_plan_node(child))
-
-        return element
+        # pre-order with an explicit stack, closing tags are pushed below the children of their element
+        parts = []
+        stack = [plan_node]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, str):
+                parts.append(node)
+                continue
+
+            tag = node.operator.operator_type.name
+            # ensure all attribute values are strings
+            attrs = "".join(f" {attr}=\"{escape(str(val), _attribute_entities)}\"" for attr, val in self.node_attributes(node).items())
+            if isinstance(node, InnerNode) and node.children:
+                parts.append(f"<{tag}{attrs}>")
+                stack.append(f"</{tag}>")
+                stack.extend(reversed(node.children))
+            else:
+                parts.append(f"<{tag}{attrs} />")
+
+        return "".join(parts)
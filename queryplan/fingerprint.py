@@ -0,0 +1,61 @@
+import hashlib
+
+from queryplan.attribution import operator_name
+from queryplan.plannode import InnerNode, PlanNode
+from queryplan.queryoperator import OperatorType
+from queryplan.queryplan import QueryPlan
+
+# operator attributes that describe the structure of a plan
+structural_attrs = ["type", "method", "table_name"]
+
+
+def plan_structure(plan_node: PlanNode) -> str:
+    """
+    Canonical representation of the structure of a plan: the operators with their join types and methods and scanned
+    tables, in the order of their inputs. Operator ids, cardinalities, and times are ignored, as well as the result
+    operator added by the parsers.
+
+    Args:
+        plan_node (PlanNode): The root of the plan.
+
+    Returns:
+        str: The structure, e.g., `Join[inner,hash](TableScan[a],Hash(TableScan[b]))`.
+    """
+    # pre-order with an explicit stack, the structure is written as a sequence of tokens to stay linear in the plan size
+    parts = []
+    stack = [plan_node]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, str):
+            parts.append(node)
+            continue
+
+        children = node.children if isinstance(node, InnerNode) else []
+        operator = node.operator
+        if operator.operator_type == OperatorType.Result and len(children) == 1:
+            stack.append(children[0])
+            continue
+
+        parts.append(operator_name(operator))
+        attrs = [str(getattr(operator, attr)) for attr in structural_attrs if getattr(operator, attr, None) is not None]
+        if attrs:
+            parts.append("[" + ",".join(attrs) + "]")
+        if children:
+            parts.append("(")
+            stack.append(")")
+            for i in reversed(range(len(children))):
+                stack.append(children[i])
+                if i:
+                    stack.append(",")
+    return "".join(parts)
+
+
+def plan_fingerprint(query_plan: QueryPlan) -> str:
+    """
+    Args:
+        query_plan (QueryPlan): The query plan.
+
+    Returns:
+        str: A hash of the structure of the plan, equal for plans that only differ in ids, cardinalities, and times.
+    """
+    return hashlib.blake2b(plan_structure(query_plan.plan).encode(), digest_size=8).hexdigest()
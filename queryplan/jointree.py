@@ -0,0 +1,157 @@
+from dataclasses import dataclass, field
+from typing import Iterator, List, Optional
+
+from queryplan.attribution import operator_name
+from queryplan.plannode import PlanNode, fold
+from queryplan.queryoperator import OperatorType
+
+join_operators = {OperatorType.Join, OperatorType.GroupJoin}
+
+
+@dataclass
+class JoinTree:
+    """
+    The join tree of a (sub-)query. Leaves are base table scans, inner nodes are binary joins. Every node carries the
+    cardinalities of its output, i.e., the intermediate result sizes.
+    """
+
+    tables: frozenset
+    estimated_cardinality: int | None
+    exact_cardinality: int | None
+    table: Optional[str] = None
+    children: List['JoinTree'] = field(default_factory=list)
+    type: Optional[str] = None
+    method: Optional[str] = None
+
+    @property
+    def is_leaf(self) -> bool:
+        return self.table is not None
+
+    def postorder(self) -> Iterator['JoinTree']:
+        """
+        Iterate over the nodes of the tree in post-order, using an explicit stack instead of recursion, as join trees of
+        generated queries can be thousands of joins deep.
+        """
+        stack = [(self, False)]
+        while stack:
+            node, visited = stack.pop()
+            if visited or node.is_leaf:
+                yield node
+                continue
+            stack.append((node, True))
+            stack.extend((child, False) for child in reversed(node.children))
+
+    def joins(self) -> List['JoinTree']:
+        """
+        Returns:
+            List[JoinTree]: The joins of the tree in post-order, i.e., in the order in which they complete.
+        """
+        return [node for node in self.postorder() if not node.is_leaf]
+
+    @property
+    def shape(self) -> str:
+        """
+        Returns:
+            str: `linear` if every join has a base table as one of its inputs (a left-deep tree up to the order of the
+            join inputs), `bushy` otherwise.
+        """
+        if all(any(child.is_leaf for child in join.children) for join in self.joins()):
+            return "linear"
+        return "bushy"
+
+    def canonical(self) -> 'JoinTree':
+        """
+        Returns:
+            JoinTree: The tree with the inputs of every join ordered independently of the build and probe side:
+            the larger subtree first, base tables last, ties broken by the tables' names. Linear trees become left-deep.
+        """
+        # the canonical subtrees whose parent is not built yet
+        results = []
+        for node in self.postorder():
+            if node.is_leaf:
+                results.append(node)
+                continue
+
+            split = len(results) - len(node.children)
+            children = results[split:]
+            del results[split:]
+            keys = [(child.is_leaf, -len(child.tables)) for child in children]
+            if len(set(keys)) < len(keys):
+                # only ties need the names, every name is computed once
+                keys = [key + (str(child),) for key, child in zip(keys, children)]
+            children = [child for _, child in sorted(zip(keys, children), key=lambda pair: pair[0])]
+            results.append(JoinTree(node.tables, node.estimated_cardinality, node.exact_cardinality, children=children, type=node.type, method=node.method))
+        return results[0]
+
+    def __str__(self) -> str:
+        parts = []
+        # the subtrees and separators still to print, the next one on top
+        stack = [self]
+        while stack:
+            item = stack.pop()
+            if isinstance(item, str):
+                parts.append(item)
+            elif item.is_leaf:
+                parts.append(item.table)
+            else:
+                stack.append(")")
+                for i, child in enumerate(reversed(item.children)):
+                    if i > 0:
+                        stack.append(" ⋈ ")
+                    stack.append(child)
+                stack.append("(")
+        return "".join(parts)
+
+
+def _leaf(plan_node: PlanNode, table: str) -> JoinTree:
+    return JoinTree(frozenset([table]), plan_node.estimated_cardinality, plan_node.exact_cardinality, table=table)
+
+
+def _extract(plan_node: PlanNode, inputs: List[Optional[JoinTree]], forest: List[JoinTree]) -> Optional[JoinTree]:
+    operator = plan_node.operator
+
+    if operator.operator_type == OperatorType.TableScan:
+        # index scans below a table scan (e.g., bitmap scans in Postgres) belong to the scan
+        table = operator.table_name.lower() if operator.table_name else f"<{operator_name(operator)} {operator.operator_id}>"
+        return _leaf(plan_node, table)
+
+    inputs = [tree for tree in inputs if tree is not None]
+
+    if operator.operator_type in join_operators and len(inputs) == 2:
+        tables = inputs[0].tables | inputs[1].tables
+        return JoinTree(tables, plan_node.estimated_cardinality, plan_node.exact_cardinality, children=inputs,
+                        type=getattr(operator, "type", None), method=getattr(operator, "method", None))
+
+    if operator.operator_type in [OperatorType.PipelineBreakerScan, OperatorType.IterationScan] and not inputs:
+        # scans of intermediate results that are computed elsewhere in the plan
+        return _leaf(plan_node, f"<{operator_name(operator)} {getattr(operator, 'scanned_id', None) or operator.operator_id}>")
+
+    if len(inputs) == 1:
+        # filters, projections, hashes, aggregations, ... do not change the join order
+        joined = inputs[0]
+        if operator.operator_type in [OperatorType.Select, OperatorType.Map] or operator_name(operator) in ["Hash", "Gather", "Materialize", "Memoize"]:
+            # the output of an operator on top of a base table scan is the filtered input of the join
+            if joined.is_leaf:
+                return _leaf(plan_node, joined.table)
+        return joined
+
+    # set operations and nodes combining independent subqueries end a join tree
+    forest.extend(inputs)
+    return None
+
+
+def extract_join_trees(plan_node: PlanNode) -> List[JoinTree]:
+    """
+    Extract the join trees of a plan parsed by any of the plan parsers.
+
+    Args:
+        plan_node (PlanNode): The root of the plan.
+
+    Returns:
+        List[JoinTree]: The join trees of the plan, one for the main query and one per independent subquery.
+    """
+    forest = []
+    tree = fold(plan_node, lambda node, inputs: _extract(node, inputs, forest))
+    if tree is not None:
+        forest.append(tree)
+    return forest
@@ -0,0 +1,130 @@
+from collections import defaultdict
+from typing import Generator
+
+from queryplan.attribution import attribute_times
+from queryplan.parsers.planparser import PlanParser
+from queryplan.plannode import InnerNode, LeafNode, PlanNode
+from queryplan.queryoperator import ArrayUnnest, CustomOperator, DBMSType, GroupBy, InlineTable, Join, Map, QueryOperator, Result, Select, SetOperation, Sort, TableScan, Window
+from queryplan.queryplan import QueryPlan
+
+
+class ClickHouseParser(PlanParser):
+    """
+    Parses the plan of `explain json = 1` of ClickHouse together with the processors of the execution recorded in
+    system.processors_profile_log. ClickHouse does not report estimates, the rows and times of the processors are
+    assigned to the plan step that created them.
+    """
+    name = "clickhouse"
+
+    def __init__(self, include_system_representation=True):
+        super().__init__(include_system_representation=include_system_representation)
+        self.include_system_representation = include_system_representation
+        self.op_counter = 0
+        self.step_profiles = {}
+
+    def parse_json_plan(self, query: str, json_plan: dict) -> QueryPlan:
+        raw = self.raw_plan(query, json_plan)
+        self.step_profiles = self.profile_steps(json_plan.get("processors", []))
+
+        # explain returns a list with one entry per statement
+        plan = json_plan["plan"]
+        if isinstance(plan, list):
+            assert len(plan) == 1
+            plan = plan[0]
+        plan = self.build_plan(plan["Plan"])
+        root = InnerNode(Result(-1), exact_cardinality=plan.exact_cardinality, estimated_cardinality=plan.estimated_cardinality,
+                         children=[plan], system_representation="// added by benchy")
+        attribute_times(root)
+        return QueryPlan(text=query, plan=root, raw=raw)
+
+    @staticmethod
+    def profile_steps(processors: list[dict]) -> dict[tuple[str, str], list[dict]]:
+        """
+        Aggregate the processors of system.processors_profile_log by the plan step that created them. The output rows of
+        a step are the rows of its processors that feed processors of other steps, its time is the time its processors
+        were busy, summed over all threads.
+
+        Args:
+            processors (list[dict]): The processors with their id, parent_ids, plan_step, plan_step_name,
+                plan_step_description, elapsed_us, and output_rows.
+
+        Returns:
+            dict[tuple[str, str], list[dict]]: The profiles of the steps by their name and description, several steps
+            with the same name and description are ordered by their id.
+        """
+        steps = defaultdict(list)
+        for processor in processors:
+            # processors added by the pipeline itself, e.g., for resizing, do not belong to a step
+            if int(processor.get("plan_step", 0)) == 0:
+                continue
+            steps[int(processor["plan_step"])].append(processor)
+
+        profiles = defaultdict(list)
+        for step in sorted(steps):
+            processors = steps[step]
+            ids = {int(processor["id"]) for processor in processors}
+            rows = sum(int(processor["output_rows"]) for processor in processors
+                       if not processor["parent_ids"] or any(int(parent) not in ids for parent in processor["parent_ids"]))
+            time = sum(float(processor["elapsed_us"]) for processor in processors) / 1000
+            profiles[(processors[0]["plan_step_name"], processors[0].get("plan_step_description", ""))].append({"rows": rows, "time": time})
+        return profiles
+
+    def build_initial_plan(self, json_plan: dict) -> Generator[dict, PlanNode, PlanNode]:
+        operator_name = json_plan["Node Type"]
+        operator_id = self.op_counter
+        self.op_counter += 1
+        operator = self.create_empty_operator(operator_name, operator_id)
+        operator.fill(json_plan, DBMSType.ClickHouse)
+
+        # steps that are not distinguished by their description are matched in the order of their ids
+        exact_cardinality = None
+        self_time = None
+        profiles = self.step_profiles.get((operator_name, json_plan.get("Description", "")))
+        if profiles:
+            profile = profiles.pop(0)
+            exact_cardinality = profile["rows"]
+            self_time = profile["time"]
+
+        system_representation = None
+        if self.include_system_representation:
+            system_representation = json_plan.copy()
+            system_representation.pop("Plans", None)
+
+        if self.is_leaf_operator(json_plan):
+            return LeafNode(operator, estimated_cardinality=None, exact_cardinality=exact_cardinality, system_representation=system_representation, self_time=self_time)
+
+        children = []
+        for child in json_plan["Plans"]:
+            children.append((yield child))
+        return InnerNode(operator, estimated_cardinality=None, exact_cardinality=exact_cardinality, children=children, system_representation=system_representation, self_time=self_time)
+
+    def create_empty_operator(self, operator_name: str, operator_id: int) -> QueryOperator:
+        match operator_name:
+            case "ReadNothing" | "ReadFromPreparedSource":
+                return InlineTable(operator_id)
+            case operator_name if operator_name.startswith("ReadFrom"):
+                return TableScan(operator_id)
+            case "Filter":
+                return Select(operator_id)
+            case "Expression":
+                return Map(operator_id)
+            case "Aggregating" | "MergingAggregated" | "Distinct":
+                return GroupBy(operator_id)
+            case "Sorting":
+                return Sort(operator_id)
+            case "Join" | "FilledJoin":
+                return Join(operator_id)
+            case "Union" | "IntersectOrExcept":
+                return SetOperation(operator_id)
+            case "Window":
+                return Window(operator_id)
+            case "ArrayJoin":
+                return ArrayUnnest(operator_id)
+            case "Limit":
+                return CustomOperator("Limit", operator_id)
+            case other:
+                # ClickHouse has many auxiliary steps (creating sets, totals, offsets, ...), they are kept by name
+                return CustomOperator(other, operator_id)
+
+    def is_leaf_operator(self, json_plan: dict) -> bool:
+        return not json_plan.get("Plans")
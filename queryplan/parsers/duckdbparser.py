@@ -1,3 +1,6 @@
+from typing import Generator
+
+from queryplan.attribution import attribute_times
 from queryplan.parsers.planparser import PlanParser
 from queryplan.plannode import InnerNode, LeafNode, PlanNode
 from queryplan.queryoperator import ArrayUnnest, CustomOperator, DBMSType, GroupBy, InlineTable, Iteration, IterationScan, Join, PipelineBreakerScan, QueryOperator, Result, Select, SetOperation, Sort, TableScan, Temp, Window
@@ -5,24 +8,29 @@ from queryplan.queryplan import QueryPlan
 
 
 class DuckDBParser(PlanParser):
+    name = "duckdb"
 
     def __init__(self, include_system_representation=True):
-        super().__init__()
+        super().__init__(include_system_representation=include_system_representation)
         self.include_system_representation = include_system_representation
         self.op_counter = 0
 
     def parse_json_plan(self, query: str, json_plan: dict) -> QueryPlan:
+        raw = self.raw_plan(query, json_plan)
         assert len(json_plan["children"]) == 1
         json_plan = json_plan["children"][0]
-        assert json_plan["operator_type"] == "EXPLAIN_ANALYZE" and len(json_plan["children"]) == 1
-        json_plan = json_plan["children"][0]
+        # plans from `explain analyze` are wrapped in an additional operator, profiles of regular executions are not
+        if json_plan["operator_type"] == "EXPLAIN_ANALYZE":
+            assert len(json_plan["children"]) == 1
+            json_plan = json_plan["children"][0]
 
-        plan = self.build_initial_plan(json_plan)
+        plan = self.build_plan(json_plan)
         root = InnerNode(Result(-1), exact_cardinality=plan.exact_cardinality,
                          estimated_cardinality=plan.estimated_cardinality, children=[plan], system_representation="// added by benchy")
-        return QueryPlan(text=query, plan=root)
+        attribute_times(root)
+        return QueryPlan(text=query, plan=root, raw=raw)
 
-    def build_initial_plan(self, json_plan: dict) -> PlanNode:
+    def build_initial_plan(self, json_plan: dict) -> Generator[dict, PlanNode, PlanNode]:
         operator_type = json_plan["operator_type"]
         operator_id = self.op_counter
         self.op_counter += 1
@@ -32,6 +40,10 @@ class DuckDBParser(PlanParser):
         estimated_cardinality = int(json_plan["extra_info"]["Estimated Cardinality"]) if "Estimated Cardinality" in json_plan["extra_info"] else None
         exact_cardinality = json_plan["operator_cardinality"]
 
+        # the operator timing excludes the children and is reported in seconds (`timing` before DuckDB 1.1)
+        timing = json_plan.get("operator_timing", json_plan.get("timing"))
+        self_time = timing * 1000 if timing is not None else None
+
         # append full duckdb representation (excluding children) to operator
         system_representation = None
         if self.include_system_representation:
@@ -42,12 +54,14 @@ class DuckDBParser(PlanParser):
 
         if self.is_leaf_operator(json_plan):
             # Has no children
-            return LeafNode(operator, estimated_cardinality=estimated_cardinality, exact_cardinality=exact_cardinality, system_representation=system_representation)
+            return LeafNode(operator, estimated_cardinality=estimated_cardinality, exact_cardinality=exact_cardinality, system_representation=system_representation,
+                            self_time=self_time)
         else:
             children = []
             for child in json_plan["children"]:
-                children.append(self.build_initial_plan(child))
-            return InnerNode(operator, estimated_cardinality=estimated_cardinality, exact_cardinality=exact_cardinality, children=children, system_representation=system_representation)
+                children.append((yield child))
+            return InnerNode(operator, estimated_cardinality=estimated_cardinality, exact_cardinality=exact_cardinality, children=children, system_representation=system_representation,
+                             self_time=self_time)
 
     def create_empty_operator(self, operator_name: str, operator_id: int) -> QueryOperator:
         match operator_name:
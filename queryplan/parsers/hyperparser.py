@@ -1,3 +1,5 @@
+from typing import Generator
+
 from queryplan.parsers.planparser import PlanParser
 from queryplan.plannode import InnerNode, LeafNode, PlanNode
 from queryplan.queryoperator import CustomOperator, DBMSType, EarlyProbe, GroupBy, GroupJoin, Join, Map, OperatorType, PipelineBreakerScan, Result, Select, SetOperation, Sort, TableScan, Temp, Window
@@ -12,22 +14,23 @@ set_operations = ["union", "intersect", "except",
 
 
 class HyperParser(PlanParser):
+    name = "hyper"
 
     def __init__(self, include_system_representation=True, duplicate_shared_pipelines=False):
-        super().__init__()
+        super().__init__(include_system_representation=include_system_representation, duplicate_shared_pipelines=duplicate_shared_pipelines)
         self.include_system_representation = include_system_representation
         self.duplicate_shared_pipelines = duplicate_shared_pipelines
 
     def parse_json_plan(self, query: str, json_plan) -> QueryPlan:
-        plan = self.build_initial_plan(json_plan)
+        plan = self.build_plan(json_plan)
         if self.duplicate_shared_pipelines:
             self.append_shared_pipelines()
         root = InnerNode(Result(-1), exact_cardinality=plan.exact_cardinality, estimated_cardinality=plan.estimated_cardinality,
                          children=[plan], system_representation="// added by benchy")
-        return QueryPlan(text=query, plan=root)
+        return QueryPlan(text=query, plan=root, raw=self.raw_plan(query, json_plan))
 
     # Builds the plan without shared pipelines
-    def build_initial_plan(self, json_plan) -> PlanNode:
+    def build_initial_plan(self, json_plan) -> Generator[dict, PlanNode, PlanNode]:
         operator_name = json_plan["operator"]
         operator_id = json_plan["operatorId"]
         operator = self.create_empty_operator(operator_name, operator_id)
@@ -37,6 +40,7 @@ class HyperParser(PlanParser):
         if "cardinality" in json_plan:
             estimated_cardinality = json_plan["cardinality"]
 
+        # the analyzed plan only counts the tuples, the operators have no times or memory
         exact_cardinality = json_plan["analyze"]["tuple-count"]
 
         # append full hyper representation (excluding children) to operator
@@ -57,22 +61,22 @@ class HyperParser(PlanParser):
                 if not isinstance(json_plan["input"], int):
                     if self.duplicate_shared_pipelines:
                         scanned_id = json_plan["input"]["operatorId"]
-                        child = self.build_initial_plan(json_plan["input"])
+                        child = yield json_plan["input"]
                         self.shared_pipelines[scanned_id] = child
                     else:
-                        children.append(self.build_initial_plan(json_plan["input"]))
+                        children.append((yield json_plan["input"]))
             elif "input" in json_plan:
                 if isinstance(json_plan["input"], list):
                     # Set operator with multiple children
                     for item in json_plan["input"]:
-                        children.append(self.build_initial_plan(item))
+                        children.append((yield item))
                 else:
                     # Has one child in the plan
-                    children.append(self.build_initial_plan(json_plan["input"]))
+                    children.append((yield json_plan["input"]))
             elif "left" in json_plan and "right" in json_plan:
                 # Has two children in the plan
-                children.append(self.build_initial_plan(json_plan["left"]))
-                children.append(self.build_initial_plan(json_plan["right"]))
+                children.append((yield json_plan["left"]))
+                children.append((yield json_plan["right"]))
 
             if self.duplicate_shared_pipelines:
                 # Store temp scan inner nodes
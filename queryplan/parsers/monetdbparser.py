@@ -0,0 +1,133 @@
+import re
+from typing import Generator
+
+from queryplan.attribution import attribute_times
+from queryplan.parsers.planparser import PlanParser
+from queryplan.plannode import InnerNode, LeafNode, PlanNode
+from queryplan.queryoperator import CustomOperator, DBMSType, GroupBy, InlineTable, Join, Map, PipelineBreakerScan, QueryOperator, Result, Select, SetOperation, TableScan
+from queryplan.queryplan import QueryPlan
+
+_TABLE = re.compile(r'^table\s*\("(?P<schema>[^"]*)"\."(?P<table>[^"]*)"\)')
+_COUNT = re.compile(r"\bCOUNT (?P<count>\d+)")
+_REF = re.compile(r"^&?\s*REF (?P<ref>\d+)\s*")
+
+
+class MonetDBParser(PlanParser):
+    """
+    Parses the relational plan of `plan` of MonetDB. The plan is text with one operator per line, operators with inputs
+    open a parenthesis that is closed after their inputs. MonetDB only reports the sizes of the scanned tables, the rows
+    of the query are the rows of the result. The MAL trace of the execution is kept in the raw plan.
+    """
+    name = "monetdb"
+
+    def __init__(self, include_system_representation=True):
+        super().__init__(include_system_representation=include_system_representation)
+        self.include_system_representation = include_system_representation
+        self.op_counter = 0
+
+    def parse_json_plan(self, query: str, json_plan: dict) -> QueryPlan:
+        raw = self.raw_plan(query, json_plan)
+        plan = self.build_plan(self.plan_tree(json_plan["plan"]))
+        root = InnerNode(Result(-1), exact_cardinality=json_plan.get("rows"), estimated_cardinality=plan.estimated_cardinality,
+                         children=[plan], system_representation="// added by benchy")
+        attribute_times(root)
+        return QueryPlan(text=query, plan=root, raw=raw)
+
+    @staticmethod
+    def plan_tree(lines: list[str]) -> dict:
+        """
+        Convert the lines of the text plan into nested operators.
+
+        Args:
+            lines (list[str]): The lines of the plan, the depth of an operator is marked by leading `| `.
+
+        Returns:
+            dict: The root operator with its `operator`, its `text`, its scanned `table` and `count`, the `ref` of a
+            shared input, and its `children`.
+        """
+        root = {"children": []}
+        stack = [root]
+        for line in lines:
+            text = line.strip().lstrip("| ").strip()
+            if not text:
+                continue
+            if text.startswith(")"):
+                # the closing parenthesis is followed by the arguments of the operator
+                stack.pop()
+                continue
+
+            node = {"operator": None, "text": text, "children": []}
+            ref = _REF.match(text)
+            if ref:
+                node["ref"] = int(ref.group("ref"))
+                text = text[ref.end():]
+            table = _TABLE.match(text)
+            count = _COUNT.search(text)
+            if count:
+                node["count"] = int(count.group("count"))
+
+            if text.endswith("("):
+                node["operator"] = text[:-1].strip()
+                stack.append(node)
+            elif table:
+                node["operator"] = "table"
+                node["table"] = table.group("table")
+            elif text.startswith("["):
+                node["operator"] = "values"
+            else:
+                # references to a shared input that is printed once
+                node["operator"] = "ref" if ref else text.split()[0]
+            stack[-2 if stack[-1] is node else -1]["children"].append(node)
+
+        assert len(root["children"]) == 1
+        return root["children"][0]
+
+    def build_initial_plan(self, json_plan: dict) -> Generator[dict, PlanNode, PlanNode]:
+        operator_name = json_plan["operator"]
+        operator_id = self.op_counter
+        self.op_counter += 1
+        operator = self.create_empty_operator(operator_name, operator_id)
+        operator.fill(json_plan, DBMSType.MonetDB)
+
+        # the count of a table is its size in the catalog
+        estimated_cardinality = json_plan.get("count")
+
+        system_representation = None
+        if self.include_system_representation:
+            system_representation = json_plan["text"]
+
+        if self.is_leaf_operator(json_plan):
+            return LeafNode(operator, estimated_cardinality=estimated_cardinality, exact_cardinality=None, system_representation=system_representation)
+
+        children = []
+        for child in json_plan["children"]:
+            children.append((yield child))
+        return InnerNode(operator, estimated_cardinality=estimated_cardinality, exact_cardinality=None, children=children, system_representation=system_representation)
+
+    def create_empty_operator(self, operator_name: str, operator_id: int) -> QueryOperator:
+        match operator_name:
+            case "table":
+                return TableScan(operator_id)
+            case "values":
+                return InlineTable(operator_id)
+            case "ref":
+                return PipelineBreakerScan(operator_id)
+            case "select":
+                return Select(operator_id)
+            case "project":
+                return Map(operator_id)
+            case "group by":
+                return GroupBy(operator_id)
+            case "join" | "left outer join" | "right outer join" | "full outer join" | "semijoin" | "antijoin":
+                return Join(operator_id)
+            case "crossproduct":
+                return CustomOperator("CrossProduct", operator_id)
+            case "union" | "munion" | "except" | "intersect":
+                return SetOperation(operator_id)
+            case "top N":
+                return CustomOperator("Limit", operator_id)
+            case other:
+                return CustomOperator(other, operator_id)
+
+    def is_leaf_operator(self, json_plan: dict) -> bool:
+        return not json_plan["children"]
@@ -1,14 +1,56 @@
 from abc import ABC, abstractmethod
+from typing import Generator
 
+from queryplan.plannode import PlanNode
 from queryplan.queryplan import QueryPlan
 
 
 class PlanParser(ABC):
+    # the name under which the parser is registered for re-parsing raw plans, see queryplan.reparse
+    name: str = None
 
-    def __init__(self):
+    def __init__(self, **options):
+        self.options = options
         self.shared_pipelines = {}
         self.temp_scan_nodes = []
 
+    def raw_plan(self, query: str, json_plan) -> dict:
+        """
+        Returns:
+            dict: The plan as reported by the system together with the query, the parser and its options, so that the
+            plan can be parsed again later.
+        """
+        return {"parser": self.name, "options": self.options, "query": query, "plan": json_plan}
+
+    def build_plan(self, json_plan) -> PlanNode:
+        """
+        Build the plan node for a json plan. Plans of generated queries can be nested far deeper than the recursion
+        limit, so instead of recursing, `build_initial_plan` yields the json of every child and receives the built child
+        node in return. The generators of all nodes on the path to the current node are kept on an explicit stack.
+
+        Args:
+            json_plan: The json plan as reported by the system.
+
+        Returns:
+            PlanNode: The plan node.
+        """
+        stack = [self.build_initial_plan(json_plan)]
+        node = None
+        while stack:
+            try:
+                json_child = stack[-1].send(node)
+            except StopIteration as stop:
+                stack.pop()
+                node = stop.value
+                continue
+            stack.append(self.build_initial_plan(json_child))
+            node = None
+        return node
+
+    @abstractmethod
+    def build_initial_plan(self, json_plan) -> Generator[any, PlanNode, PlanNode]:
+        pass
+
     @abstractmethod
     def parse_json_plan(self, query: str, json_plan: dict) -> QueryPlan:
         pass
@@ -1,3 +1,6 @@
+from typing import Generator
+
+from queryplan.attribution import attribute_times
 from queryplan.parsers.planparser import PlanParser
 from queryplan.plannode import InnerNode, LeafNode, PlanNode
 from queryplan.queryoperator import CustomOperator, DBMSType, GroupBy, Iteration, IterationScan, Join, Map, OperatorType, PipelineBreakerScan, Result, SetOperation, Sort, Subquery, TableScan, Temp, Window
@@ -5,20 +8,22 @@ from queryplan.queryplan import QueryPlan
 
 
 class PostgresParser(PlanParser):
+    name = "postgres"
 
     def __init__(self, include_system_representation=True):
-        super().__init__()
+        super().__init__(include_system_representation=include_system_representation)
         self.include_system_representation = include_system_representation
         self.op_counter = 0
         self.ctes = {}
 
     def parse_json_plan(self, query: str, json_plan: dict) -> QueryPlan:
-        plan = self.build_initial_plan(json_plan["Plan"])
+        plan = self.build_plan(json_plan["Plan"])
         root = InnerNode(Result(-1), exact_cardinality=plan.exact_cardinality, estimated_cardinality=plan.estimated_cardinality,
                          children=[plan], system_representation="// added by benchy")
-        return QueryPlan(text=query, plan=root)
+        attribute_times(root)
+        return QueryPlan(text=query, plan=root, raw=self.raw_plan(query, json_plan))
 
-    def build_initial_plan(self, json_plan: dict) -> PlanNode:
+    def build_initial_plan(self, json_plan: dict) -> Generator[dict, PlanNode, PlanNode]:
         operator_name = json_plan["Node Type"]
         operator_id = self.op_counter
         self.op_counter += 1
@@ -28,6 +33,11 @@ class PostgresParser(PlanParser):
         estimated_cardinality = json_plan["Plan Rows"]
         exact_cardinality = json_plan["Actual Rows"]
 
+        # the actual time is the average over all loops in milliseconds, including the children
+        loops = json_plan.get("Actual Loops")
+        cumulative_time = json_plan["Actual Total Time"] * loops if "Actual Total Time" in json_plan and loops is not None else None
+        peak_memory = self.peak_memory(json_plan)
+
         # append full umbra representation (excluding children) to operator
         system_representation = None
         if self.include_system_representation:
@@ -46,7 +56,7 @@ class PostgresParser(PlanParser):
         if not is_leaf(json_plan):
             for entry in json_plan["Plans"]:
                 if is_cte(entry):
-                    temp = self.build_initial_plan(entry)
+                    temp = yield entry
                     temp = InnerNode(Temp(self.op_counter), temp.estimated_cardinality, temp.exact_cardinality, [temp], system_representation="// added by benchy")
                     self.ctes[entry["Subplan Name"].replace("CTE ", "")] = (self.op_counter, False, temp)
                     self.op_counter += 1
@@ -57,19 +67,22 @@ class PostgresParser(PlanParser):
             operator.scanned_id = cte_id
             if not already_included:
                 self.ctes[cte_name] = (cte_id, True, cte_node)
-                return InnerNode(operator, estimated_cardinality, exact_cardinality, [cte_node], system_representation=system_representation)
+                return InnerNode(operator, estimated_cardinality, exact_cardinality, [cte_node], system_representation=system_representation,
+                                 cumulative_time=cumulative_time, peak_memory=peak_memory, loops=loops)
 
         if is_leaf(json_plan):
             # Has no children
-            return LeafNode(operator, estimated_cardinality, exact_cardinality, system_representation=system_representation)
+            return LeafNode(operator, estimated_cardinality, exact_cardinality, system_representation=system_representation,
+                            cumulative_time=cumulative_time, peak_memory=peak_memory, loops=loops)
         else:
             children = []
             for entry in json_plan["Plans"]:
                 if is_cte(entry):
                     continue
 
-                children.append(self.build_initial_plan(entry))
-            return InnerNode(operator, estimated_cardinality, exact_cardinality, children, system_representation=system_representation)
+                children.append((yield entry))
+            return InnerNode(operator, estimated_cardinality, exact_cardinality, children, system_representation=system_representation,
+                             cumulative_time=cumulative_time, peak_memory=peak_memory, loops=loops)
 
     def create_empty_operator(self, operator_name: str, operator_id: int):
         match operator_name:
@@ -120,6 +133,14 @@ class PostgresParser(PlanParser):
             case other:
                 raise ValueError(f"'{other}' is not a recognized POSTGRES operator")
 
+    def peak_memory(self, plan: dict) -> int | None:
+        # hashes and hash aggregates report their peak memory, sorts the memory they used if they did not spill
+        if "Peak Memory Usage" in plan:
+            return plan["Peak Memory Usage"] * 1024
+        if plan.get("Sort Space Type") == "Memory" and "Sort Space Used" in plan:
+            return plan["Sort Space Used"] * 1024
+        return None
+
     def is_leaf_operator(self, plan):
         if "Plans" in plan:
             return False
@@ -0,0 +1,83 @@
+from typing import Generator
+
+from queryplan.attribution import attribute_times
+from queryplan.parsers.planparser import PlanParser
+from queryplan.plannode import InnerNode, LeafNode, PlanNode
+from queryplan.queryoperator import CustomOperator, DBMSType, GroupBy, InlineTable, Join, QueryOperator, Result, Select, SetOperation, Sort, TableScan, Window
+from queryplan.queryplan import QueryPlan
+
+
+class SingleStoreParser(PlanParser):
+    """
+    Parses the json profile of `show profile json` of SingleStore after executing a query with `profile`.
+    """
+    name = "singlestore"
+
+    def __init__(self, include_system_representation=True):
+        super().__init__(include_system_representation=include_system_representation)
+        self.include_system_representation = include_system_representation
+        self.op_counter = 0
+
+    def parse_json_plan(self, query: str, json_plan: dict) -> QueryPlan:
+        raw = self.raw_plan(query, json_plan)
+        assert len(json_plan["explain"]) == 1
+        plan = self.build_plan(json_plan["explain"][0])
+        root = InnerNode(Result(-1), exact_cardinality=plan.exact_cardinality, estimated_cardinality=plan.estimated_cardinality,
+                         children=[plan], system_representation="// added by benchy")
+        attribute_times(root)
+        return QueryPlan(text=query, plan=root, raw=raw)
+
+    def build_initial_plan(self, json_plan: dict) -> Generator[dict, PlanNode, PlanNode]:
+        operator_name = json_plan["executor"]
+        operator_id = self.op_counter
+        self.op_counter += 1
+        operator = self.create_empty_operator(operator_name, operator_id)
+        operator.fill(json_plan, DBMSType.SingleStore)
+
+        # the estimate is reported as string, the actual values as statistics over the partitions
+        estimated_cardinality = round(float(json_plan["est_rows"])) if json_plan.get("est_rows") not in [None, ""] else None
+        exact_cardinality = json_plan["actual_row_count"]["value"] if "actual_row_count" in json_plan else None
+        # the time of the operator itself in milliseconds
+        self_time = json_plan["actual_total_time"]["value"] if "actual_total_time" in json_plan else None
+
+        system_representation = None
+        if self.include_system_representation:
+            system_representation = json_plan.copy()
+            system_representation.pop("inputs", None)
+
+        if self.is_leaf_operator(json_plan):
+            return LeafNode(operator, estimated_cardinality=estimated_cardinality, exact_cardinality=exact_cardinality, system_representation=system_representation,
+                            self_time=self_time)
+
+        children = []
+        for child in json_plan["inputs"]:
+            children.append((yield child))
+        return InnerNode(operator, estimated_cardinality=estimated_cardinality, exact_cardinality=exact_cardinality, children=children, system_representation=system_representation,
+                         self_time=self_time)
+
+    def create_empty_operator(self, operator_name: str, operator_id: int) -> QueryOperator:
+        match operator_name:
+            case "TableScan" | "ColumnStoreScan" | "IndexSeek" | "IndexRangeScan" | "OrderedColumnStoreScan":
+                return TableScan(operator_id)
+            case "Filter" | "ColumnStoreFilter":
+                return Select(operator_id)
+            case "Project":
+                return CustomOperator("Projection", operator_id)
+            case "HashGroupBy" | "StreamingGroupBy" | "ShuffleGroupBy" | "Distinct":
+                return GroupBy(operator_id)
+            case "HashJoin" | "MergeJoin" | "NestedLoopJoin":
+                return Join(operator_id)
+            case "Sort" | "TopSort":
+                return Sort(operator_id)
+            case "Union" | "UnionAll":
+                return SetOperation(operator_id)
+            case "Window":
+                return Window(operator_id)
+            case "ConstantTable":
+                return InlineTable(operator_id)
+            case other:
+                # distribution operators (gather, repartition, broadcast, ...) and limits are kept by name
+                return CustomOperator(other, operator_id)
+
+    def is_leaf_operator(self, json_plan: dict) -> bool:
+        return not json_plan.get("inputs")
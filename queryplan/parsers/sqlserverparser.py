@@ -0,0 +1,139 @@
+from typing import Generator
+from xml.etree import ElementTree
+
+from queryplan.attribution import attribute_times
+from queryplan.parsers.planparser import PlanParser
+from queryplan.plannode import InnerNode, LeafNode, PlanNode
+from queryplan.queryoperator import CustomOperator, DBMSType, GroupBy, InlineTable, Join, Map, QueryOperator, Result, Select, SetOperation, Sort, TableScan, Window
+from queryplan.queryplan import QueryPlan
+
+SHOWPLAN_NAMESPACE = "{http://schemas.microsoft.com/sqlserver/2004/07/showplan}"
+
+
+def _tag(name: str) -> str:
+    return SHOWPLAN_NAMESPACE + name
+
+
+class SQLServerParser(PlanParser):
+    """
+    Parses the showplan xml of SQL Server. Plans collected with `SET STATISTICS XML ON` contain the actual rows, loops,
+    and times of every operator, plans collected with `SET SHOWPLAN_XML ON` only the estimates.
+    """
+    name = "sqlserver"
+
+    def __init__(self, include_system_representation=True):
+        super().__init__(include_system_representation=include_system_representation)
+        self.include_system_representation = include_system_representation
+
+    def parse_json_plan(self, query: str, json_plan: str) -> QueryPlan:
+        # the showplan is xml, it is stored as is in the raw plan
+        root_element = ElementTree.fromstring(json_plan)
+        rel_ops = [query_plan.find(_tag("RelOp")) for query_plan in root_element.iter(_tag("QueryPlan"))]
+        rel_ops = [rel_op for rel_op in rel_ops if rel_op is not None]
+        if not rel_ops:
+            raise ValueError("the showplan does not contain a query plan")
+
+        # batches with several statements, e.g., for temporary tables, have one plan per statement
+        children = [self.build_plan(rel_op) for rel_op in rel_ops]
+        root = InnerNode(Result(-1), exact_cardinality=children[-1].exact_cardinality, estimated_cardinality=children[-1].estimated_cardinality,
+                         children=children, system_representation="// added by benchy")
+        attribute_times(root)
+        return QueryPlan(text=query, plan=root, raw=self.raw_plan(query, json_plan))
+
+    def build_initial_plan(self, rel_op: ElementTree.Element) -> Generator[ElementTree.Element, PlanNode, PlanNode]:
+        plan = self.operator_attributes(rel_op)
+        operator = self.create_empty_operator(self.operator_name(plan), int(plan["NodeId"]))
+        operator.fill(plan, DBMSType.SQLServer)
+
+        # the estimate is per execution of the operator, the actual rows are summed over all executions
+        estimated_cardinality = None
+        if "EstimateRows" in plan:
+            executions = 1 + float(plan.get("EstimateRebinds", 0)) + float(plan.get("EstimateRewinds", 0))
+            estimated_cardinality = round(float(plan["EstimateRows"]) * executions)
+
+        exact_cardinality = None
+        loops = None
+        self_time = None
+        cumulative_time = None
+        counters = rel_op.find(_tag("RunTimeInformation"))
+        if counters is not None:
+            threads = counters.findall(_tag("RunTimeCountersPerThread"))
+            exact_cardinality = sum(int(thread.get("ActualRows", 0)) for thread in threads)
+            loops = sum(int(thread.get("ActualExecutions", 0)) for thread in threads)
+            elapsed = [float(thread.get("ActualElapsedms")) for thread in threads if thread.get("ActualElapsedms") is not None]
+            if elapsed:
+                # operators in row mode report their time including the children, operators in batch mode their own
+                if any(thread.get("ActualExecutionMode") == "Batch" for thread in threads):
+                    self_time = max(elapsed)
+                else:
+                    cumulative_time = max(elapsed)
+
+        system_representation = plan if self.include_system_representation else None
+
+        children = []
+        for element in rel_op:
+            for child in element.findall(_tag("RelOp")):
+                children.append((yield child))
+
+        if not children:
+            return LeafNode(operator, estimated_cardinality, exact_cardinality, system_representation=system_representation,
+                            self_time=self_time, cumulative_time=cumulative_time, loops=loops)
+        return InnerNode(operator, estimated_cardinality, exact_cardinality, children, system_representation=system_representation,
+                         self_time=self_time, cumulative_time=cumulative_time, loops=loops)
+
+    def operator_attributes(self, rel_op: ElementTree.Element) -> dict:
+        """
+        Returns:
+            dict: The attributes of a RelOp element and the scanned table, without the children.
+        """
+        plan = dict(rel_op.attrib)
+        for element in rel_op:
+            table = element.find(_tag("Object"))
+            if table is not None and table.get("Table"):
+                plan["Table"] = table.get("Table").strip("[]")
+        return plan
+
+    def operator_name(self, plan: dict) -> str:
+        """
+        Returns:
+            str: The physical operator, hash matches are qualified by their logical operator, as they implement joins,
+            aggregations, and unions.
+        """
+        if plan["PhysicalOp"] == "Hash Match" and plan["LogicalOp"] in ["Aggregate", "Partial Aggregate", "Flow Distinct"]:
+            return "Hash Match Aggregate"
+        if plan["PhysicalOp"] == "Hash Match" and plan["LogicalOp"] == "Union":
+            return "Hash Match Union"
+        return plan["PhysicalOp"]
+
+    def create_empty_operator(self, operator_name: str, operator_id: int) -> QueryOperator:
+        match operator_name:
+            case "Table Scan" | "Index Scan" | "Clustered Index Scan" | "Index Seek" | "Clustered Index Seek" | "Columnstore Index Scan" | "RID Lookup" | "Key Lookup":
+                return TableScan(operator_id)
+            case "Hash Match" | "Merge Join" | "Nested Loops" | "Adaptive Join":
+                return Join(operator_id)
+            case "Hash Match Aggregate" | "Stream Aggregate":
+                return GroupBy(operator_id)
+            case "Sort" | "Top N Sort":
+                return Sort(operator_id)
+            case "Top":
+                return CustomOperator("Limit", operator_id)
+            case "Filter":
+                return Select(operator_id)
+            case "Compute Scalar":
+                return Map(operator_id)
+            case "Concatenation" | "Hash Match Union":
+                return SetOperation(operator_id)
+            case "Window Aggregate" | "Sequence Project" | "Window Spool":
+                return Window(operator_id)
+            case "Constant Scan":
+                return InlineTable(operator_id)
+            case "Parallelism":
+                return CustomOperator("Gather", operator_id)
+            case "Assert":
+                return CustomOperator("AssertSingle", operator_id)
+            case other:
+                # SQL Server has many auxiliary operators (spools, bitmaps, segments, ...), they are kept by name
+                return CustomOperator(other, operator_id)
+
+    def is_leaf_operator(self, rel_op: ElementTree.Element) -> bool:
+        return not any(element.find(_tag("RelOp")) is not None for element in rel_op)
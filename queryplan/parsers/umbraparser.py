@@ -1,3 +1,5 @@
+from typing import Generator
+
 from queryplan.parsers.planparser import PlanParser
 from queryplan.plannode import InnerNode, LeafNode, PlanNode
 from queryplan.queryoperator import ArrayUnnest, CustomOperator, DBMSType, EarlyProbe, GroupBy, GroupJoin, InlineTable, Iteration, IterationScan, Join, Map, OperatorType, PipelineBreakerScan, RegexSplit, Result, Select, SetOperation, Sort, TableScan, Temp, Window
@@ -5,14 +7,15 @@ from queryplan.queryplan import QueryPlan
 
 
 class UmbraParser(PlanParser):
+    name = "umbra"
 
     def __init__(self, include_system_representation=True, duplicate_shared_pipelines=False):
-        super().__init__()
+        super().__init__(include_system_representation=include_system_representation, duplicate_shared_pipelines=duplicate_shared_pipelines)
         self.include_system_representation = include_system_representation
         self.duplicate_shared_pipelines = duplicate_shared_pipelines
 
     def parse_json_plan(self, query: str, json_plan: dict) -> QueryPlan:
-        plan = self.build_initial_plan(json_plan['plan'])
+        plan = self.build_plan(json_plan['plan'])
         if self.duplicate_shared_pipelines:
             self.append_shared_pipelines()
 
@@ -24,10 +27,10 @@ class UmbraParser(PlanParser):
 
         root = InnerNode(Result(-1), exact_cardinality=plan.exact_cardinality, estimated_cardinality=plan.estimated_cardinality,
                          children=[plan], system_representation=system_representation)
-        return QueryPlan(text=query, plan=root)
+        return QueryPlan(text=query, plan=root, raw=self.raw_plan(query, json_plan))
 
     # Builds the plan without shared pipelines
-    def build_initial_plan(self, json_plan: dict) -> PlanNode:
+    def build_initial_plan(self, json_plan: dict) -> Generator[dict, PlanNode, PlanNode]:
         operator_name = json_plan["operator"]
         operator_id = json_plan["operatorId"]
         operator = self.create_empty_operator(operator_name, operator_id)
@@ -45,6 +48,7 @@ class UmbraParser(PlanParser):
         if "cardinality" in json_plan:
             estimated_cardinality = json_plan["cardinality"]
 
+        # the analyzed plan only counts the tuples, the operators have no times or memory
         exact_cardinality = estimated_cardinality
         if "analyzePlanCardinality" in json_plan:
             exact_cardinality = json_plan["analyzePlanCardinality"]
@@ -56,7 +60,7 @@ class UmbraParser(PlanParser):
             children = []
             # Handle magic operator
             if "magic" in json_plan:
-                child = self.build_initial_plan(json_plan["magic"])
+                child = yield json_plan["magic"]
                 magic_id = child.operator.operator_id
                 self.shared_pipelines[magic_id] = child
                 children.append(child)
@@ -66,17 +70,17 @@ class UmbraParser(PlanParser):
                 if "pipelineBreaker" in json_plan:
                     if self.duplicate_shared_pipelines:
                         scanned_id = json_plan["scannedOperator"]
-                        child = self.build_initial_plan(json_plan["pipelineBreaker"])
+                        child = yield json_plan["pipelineBreaker"]
                         self.shared_pipelines[scanned_id] = child
                     else:
-                        children.append(self.build_initial_plan(json_plan["pipelineBreaker"]))
+                        children.append((yield json_plan["pipelineBreaker"]))
             elif "input" in json_plan:
                 # Has one child in the plan
-                children.append(self.build_initial_plan(json_plan["input"]))
+                children.append((yield json_plan["input"]))
             elif "left" in json_plan and "right" in json_plan:
                 # Has two children in the plan
-                children.append(self.build_initial_plan(json_plan["left"]))
-                children.append(self.build_initial_plan(json_plan["right"]))
+                children.append((yield json_plan["left"]))
+                children.append((yield json_plan["right"]))
 
                 # Set estimated cardinality of the table scan to 0, we do not execute this operation
                 if json_plan["physicalOperator"] == "indexnljoin":
@@ -84,11 +88,11 @@ class UmbraParser(PlanParser):
             elif "arguments" in json_plan:
                 # Set operator with multiple children
                 for item in json_plan["arguments"]:
-                    children.append(self.build_initial_plan(item["input"]))
+                    children.append((yield item["input"]))
             elif "inputs" in json_plan:
                 # Multiway join with multiple inputs
                 for item in json_plan["inputs"]:
-                    children.append(self.build_initial_plan(item["op"]))
+                    children.append((yield item["op"]))
 
             if self.duplicate_shared_pipelines:
                 # Store temp scan inner nodes
@@ -1,26 +1,111 @@
 from abc import ABC, abstractmethod
-from typing import Union
+from typing import Callable, Iterator, List, TypeVar, Union
 
 from queryplan.queryoperator import QueryOperator
 
+T = TypeVar("T")
+
 
 class PlanNode(ABC):
+    """
+    A node of a query plan. Besides the cardinalities, nodes carry the runtime and memory the system attributes to the
+    operator, normalized to milliseconds and bytes. The self time excludes the children, the cumulative time includes
+    them; both are summed over all loops of the operator. Attributes the system does not report are None.
+    """
+
+    # plans can have many thousand nodes, slots keep them compact
+    __slots__ = ("operator", "estimated_cardinality", "exact_cardinality", "system_representation", "self_time", "cumulative_time", "peak_memory", "loops")
 
-    def __init__(self, operator: QueryOperator, estimated_cardinality: int | None, exact_cardinality: int | None, system_representation: any):
+    def __init__(self, operator: QueryOperator, estimated_cardinality: int | None, exact_cardinality: int | None, system_representation: any,
+                 self_time: float | None = None, cumulative_time: float | None = None, peak_memory: int | None = None, loops: int | None = None):
         self.operator = operator
         self.estimated_cardinality = estimated_cardinality
         self.exact_cardinality = exact_cardinality
         self.system_representation = [system_representation]
+        self.self_time = self_time
+        self.cumulative_time = cumulative_time
+        self.peak_memory = peak_memory
+        self.loops = loops
+
+    def attributes(self) -> Iterator[tuple[str, any]]:
+        """
+        Returns:
+            Iterator[tuple[str, any]]: The attributes of the node except the operator and the children.
+        """
+        for attr in PlanNode.__slots__[1:]:
+            yield attr, getattr(self, attr)
 
 
 class LeafNode(PlanNode):
+    __slots__ = ()
+
+    def __init__(self, operator: QueryOperator, estimated_cardinality: int | None, exact_cardinality: int | None, system_representation: any,
+                 self_time: float | None = None, cumulative_time: float | None = None, peak_memory: int | None = None, loops: int | None = None):
+        super().__init__(operator, estimated_cardinality, exact_cardinality, system_representation, self_time, cumulative_time, peak_memory, loops)
 
-    def __init__(self, operator: QueryOperator, estimated_cardinality: int | None, exact_cardinality: int | None, system_representation: any):
-        super().__init__(operator, estimated_cardinality, exact_cardinality, system_representation)
 
 class InnerNode(PlanNode):
+    __slots__ = ("children",)
 
     def __init__(self, operator: QueryOperator, estimated_cardinality: Union[None, int],
-                 exact_cardinality: Union[None, int], children, system_representation: any):
-        super().__init__(operator, estimated_cardinality, exact_cardinality, system_representation)
-        self.children = children
\ No newline at end of file
+                 exact_cardinality: Union[None, int], children, system_representation: any,
+                 self_time: float | None = None, cumulative_time: float | None = None, peak_memory: int | None = None, loops: int | None = None):
+        super().__init__(operator, estimated_cardinality, exact_cardinality, system_representation, self_time, cumulative_time, peak_memory, loops)
+        self.children = children
+
+
+def preorder(plan_node: PlanNode) -> Iterator[PlanNode]:
+    """
+    Iterate over the nodes of a plan in pre-order, using an explicit stack instead of recursion.
+    """
+    stack = [plan_node]
+    while stack:
+        node = stack.pop()
+        yield node
+        if isinstance(node, InnerNode):
+            stack.extend(reversed(node.children))
+
+
+def postorder(plan_node: PlanNode) -> Iterator[PlanNode]:
+    """
+    Iterate over the nodes of a plan in post-order, i.e., every node after its children, using an explicit stack
+    instead of recursion.
+    """
+    stack = [(plan_node, False)]
+    while stack:
+        node, visited = stack.pop()
+        if visited or not isinstance(node, InnerNode):
+            yield node
+            continue
+        stack.append((node, True))
+        stack.extend((child, False) for child in reversed(node.children))
+
+
+def fold(plan_node: PlanNode, combine: Callable[[PlanNode, List[T]], T]) -> T:
+    """
+    Evaluate a plan bottom-up without recursion.
+
+    Args:
+        plan_node (PlanNode): The root of the plan.
+        combine (Callable[[PlanNode, List[T]], T]): Called for every node in post-order with the node and the results of
+            its children.
+
+    Returns:
+        T: The result for the root.
+    """
+    # the results of the visited nodes whose parent is not combined yet
+    results = []
+    stack = [(plan_node, False)]
+    while stack:
+        node, visited = stack.pop()
+        children = node.children if isinstance(node, InnerNode) else []
+        if children and not visited:
+            stack.append((node, True))
+            stack.extend((child, False) for child in reversed(children))
+            continue
+
+        split = len(results) - len(children)
+        inputs = results[split:]
+        del results[split:]
+        results.append(combine(node, inputs))
+    return results[0]
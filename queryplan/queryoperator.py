@@ -9,6 +9,10 @@ class DBMSType(int, Enum):
     Postgres = 2
     Hyper = 3
     DuckDB = 4
+    SQLServer = 5
+    ClickHouse = 6
+    MonetDB = 7
+    SingleStore = 8
 
 
 class OperatorType(Enum):
@@ -52,6 +56,20 @@ class QueryOperator(ABC):
         return
 
 
+def join_type(name: str) -> str:
+    """
+    Returns:
+        str: The join type in the notation of the plans, e.g., `leftouter` for "Left Outer Join" or `leftsemi` for
+        "LEFT SEMI".
+    """
+    name = name.lower().replace("join", "").replace("outer", "").replace("anti semi", "anti").split()
+    if not name or name == ["cross"]:
+        return "inner"
+    if name in (["left"], ["right"], ["full"]):
+        return name[0] + "outer"
+    return "".join(name)
+
+
 class Result(QueryOperator):
 
     def __init__(self, operator_id: int):
@@ -80,11 +98,25 @@ class TableScan(QueryOperator):
                 case "Index Scan" | "Index Only Scan":
                     self.table_name = plan["Relation Name"]
                     self.type = "index"
+                case "Bitmap Heap Scan":
+                    self.table_name = plan["Relation Name"]
+                    self.type = "bitmap"
+                case "Bitmap Index Scan":
+                    self.type = "bitmap"
                 case _:
                     log_warn(f"Unknown table scan type: {plan['Node Type']}")
         elif dbms_type == DBMSType.DuckDB:
-            table_name = plan["extra_info"]["Text"] if "Text" in plan["extra_info"] else None
+            # DuckDB 1.1 and newer report the scanned table as "Table"
+            table_name = plan["extra_info"].get("Table", plan["extra_info"].get("Text"))
             self.table_name = table_name
+        elif dbms_type == DBMSType.SQLServer:
+            self.table_name = plan.get("Table")
+            self.type = "index" if "Seek" in plan["PhysicalOp"] or "Lookup" in plan["PhysicalOp"] else "sequential"
+        elif dbms_type == DBMSType.ClickHouse:
+            # e.g., "clickhouse.lineitem"
+            self.table_name = plan["Description"].split(".")[-1] if plan.get("Description") else None
+        elif dbms_type == DBMSType.MonetDB or dbms_type == DBMSType.SingleStore:
+            self.table_name = plan.get("table")
 
 
 class InlineTable(QueryOperator):
@@ -156,6 +188,12 @@ class GroupBy(QueryOperator):
             self.method = "hash"
         elif dbms_type == DBMSType.Postgres:
             self.method = plan["Node Type"] if plan["Node Type"] in ["Unique", "Group"] else plan["Strategy"]
+        elif dbms_type == DBMSType.SQLServer:
+            self.method = "hash" if plan["PhysicalOp"] == "Hash Match" else "stream"
+        elif dbms_type == DBMSType.ClickHouse:
+            self.method = "hash"
+        elif dbms_type == DBMSType.SingleStore:
+            self.method = "hash" if "Hash" in plan["executor"] else "stream"
 
 
 class Join(QueryOperator):
@@ -227,6 +265,29 @@ class Join(QueryOperator):
                 self.method = "hash"
             elif name == "Nested Loop":
                 self.method = "nl"
+        elif dbms_type == DBMSType.SQLServer:
+            self.type = join_type(plan["LogicalOp"])
+            self.method = {"Hash Match": "hash", "Merge Join": "merge", "Nested Loops": "nl", "Adaptive Join": "adaptive"}.get(plan["PhysicalOp"])
+        elif dbms_type == DBMSType.ClickHouse:
+            self.type = join_type(f"{plan.get('Type', '')} {plan.get('Strictness', '') if plan.get('Strictness', '').lower() in ['semi', 'anti'] else ''}")
+            algorithm = plan.get("Algorithm", "")
+            if "Merge" in algorithm:
+                self.method = "merge"
+            elif "Hash" in algorithm:
+                self.method = "hash"
+            elif "Direct" in algorithm:
+                self.method = "index"
+        elif dbms_type == DBMSType.MonetDB:
+            self.type = join_type(plan["operator"].replace("semijoin", "left semi").replace("antijoin", "left anti"))
+        elif dbms_type == DBMSType.SingleStore:
+            self.type = join_type(plan.get("type", "inner"))
+            name = plan["executor"]
+            if name.startswith("Hash"):
+                self.method = "hash"
+            elif name.startswith("Merge"):
+                self.method = "merge"
+            elif name.startswith("NestedLoop"):
+                self.method = "nl"
 
 
 class GroupJoin(QueryOperator):
@@ -272,6 +333,14 @@ class SetOperation(QueryOperator):
                 self.type = "unionall"
         if dbms_type == DBMSType.Hyper:
             self.type = plan["operator"]
+        if dbms_type == DBMSType.SQLServer:
+            self.type = "unionall" if plan["PhysicalOp"] == "Concatenation" else plan["LogicalOp"].lower().replace(" ", "")
+        if dbms_type == DBMSType.ClickHouse:
+            self.type = "unionall" if plan["Node Type"] == "Union" else plan["Node Type"].lower()
+        if dbms_type == DBMSType.MonetDB:
+            self.type = {"munion": "unionall", "union": "unionall"}.get(plan["operator"], plan["operator"])
+        if dbms_type == DBMSType.SingleStore:
+            self.type = "unionall"
 
 
 class Window(QueryOperator):
@@ -1,11 +1,16 @@
+import datetime
 import decimal
 import json
+import math
 from dataclasses import dataclass
+from typing import Optional
 
+from queryplan.decoder.jsondecoder import QueryPlanJsonDecoder
 from queryplan.encoder.jsonencoder import QueryPlanJsonEncoder
 from queryplan.encoder.serdeskeys import *
 from queryplan.encoder.xmlencoder import QueryPlanXmlEncoder
 from queryplan.plannode import PlanNode
+from util import deepjson
 
 
 @dataclass(kw_only=True)
@@ -16,6 +21,8 @@ class QueryPlan:
 
     text: str
     plan: PlanNode
+    # the plan as reported by the system, see PlanParser.raw_plan
+    raw: Optional[dict] = None
 
 
 def encode_query_plan(query_plan: QueryPlan, format: str = "json") -> str:
@@ -40,7 +47,22 @@ def encode_query_plan(query_plan: QueryPlan, format: str = "json") -> str:
         QUERY_PLAN_KEY: plan
     }
     # major hack to convert NaNs to strings
-    return json.dumps(json_dict, cls=DecimalEncoder)
+    return deepjson.dumps(json_dict, cls=DecimalEncoder)
+
+
+def decode_query_plan(encoded: str) -> QueryPlan:
+    """
+    Restore a query plan encoded as json by `encode_query_plan`.
+
+    Args:
+        encoded (str): The encoded query plan.
+
+    Returns:
+        QueryPlan: The query plan.
+    """
+    json_dict = deepjson.loads(encoded)
+    plan = QueryPlanJsonDecoder().decode_plan_node(json_dict[QUERY_PLAN_KEY])
+    return QueryPlan(text=json_dict[QUERY_TEXT_KEY], plan=plan)
 
 
 class DecimalEncoder(json.JSONEncoder):
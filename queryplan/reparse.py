@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+import argparse
+import csv
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Tuple
+
+import simplejson as json
+
+from queryplan.fingerprint import plan_fingerprint
+from queryplan.parsers.clickhouseparser import ClickHouseParser
+from queryplan.parsers.duckdbparser import DuckDBParser
+from queryplan.parsers.hyperparser import HyperParser
+from queryplan.parsers.monetdbparser import MonetDBParser
+from queryplan.parsers.planparser import PlanParser
+from queryplan.parsers.postgresparser import PostgresParser
+from queryplan.parsers.singlestoreparser import SingleStoreParser
+from queryplan.parsers.sqlserverparser import SQLServerParser
+from queryplan.parsers.umbraparser import UmbraParser
+from queryplan.queryplan import QueryPlan, encode_query_plan
+from util import deepjson, logger
+from util.blobstore import BlobStore
+from util.resultcsv import plan_store
+
+
+parsers = {parser.name: parser for parser in [ClickHouseParser, DuckDBParser, HyperParser, MonetDBParser, PostgresParser, SingleStoreParser, SQLServerParser, UmbraParser]}
+
+
+def parse_raw_plan(raw: dict) -> QueryPlan:
+    """
+    Parse a raw plan stored by ResultCSV with the current version of its parser.
+
+    Args:
+        raw (dict): The raw plan, see PlanParser.raw_plan.
+
+    Returns:
+        QueryPlan: The parsed plan.
+    """
+    parser: PlanParser = parsers[raw["parser"]](**raw["options"])
+    return parser.parse_json_plan(raw["query"], raw["plan"])
+
+
+def _reparse(task: Tuple[str, str]) -> Tuple[str, Optional[str], Optional[str], Optional[str]]:
+    directory, key = task
+    try:
+        raw = deepjson.loads(BlobStore(directory).get(key).decode(), cls=json.JSONDecoder, allow_nan=True)
+        query_plan = parse_raw_plan(raw)
+        return key, encode_query_plan(query_plan), plan_fingerprint(query_plan), None
+    except Exception as e:
+        return key, None, None, f"{type(e).__name__}: {e}"
+
+
+def reparse(filename: str, workers: Optional[int] = None):
+    """
+    Parse all raw plans of a result csv again and replace the normalized plans and their fingerprints. Plans that fail
+    to parse keep their previous version.
+
+    Args:
+        filename (str): The result csv.
+        workers (Optional[int]): The number of processes (default: the number of cpus).
+    """
+    if filename.endswith(".parquet"):
+        # the committed parquet files are never rewritten, the plans are parsed again in the csv
+        logger.log_warn(f"{filename} is a columnar result directory, convert it to csv with `python -m util.resultparquet` first")
+        return
+
+    store = plan_store(filename)
+    with open(filename, "r") as file:
+        reader = csv.DictReader(file)
+        fieldnames = reader.fieldnames
+        rows = list(reader)
+
+    if "raw_plan" not in fieldnames:
+        logger.log_warn(f"{filename} does not contain raw plans")
+        return
+
+    # identical raw plans are stored once and only need to be parsed once
+    keys = sorted({row["raw_plan"] for row in rows if row["raw_plan"]})
+    logger.log_driver(f"Parsing {len(keys)} raw plans of {filename}")
+
+    plans = {}
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        with logger.LogProgress("Parsing plans...", len(keys)) as progress:
+            for key, encoded, fingerprint, error in executor.map(_reparse, [(store.directory, key) for key in keys], chunksize=16):
+                progress.next(f"Parsing {key}...")
+                if error is not None:
+                    logger.log_warn(f"Could not parse raw plan {key}: {error}")
+                else:
+                    plans[key] = (encoded, fingerprint)
+                progress.finish()
+
+    changed = 0
+    for row in rows:
+        if row["raw_plan"] not in plans:
+            continue
+
+        encoded, fingerprint = plans[row["raw_plan"]]
+        # keep plans inline if they were stored inline
+        plan = encoded if row["plan"].startswith("{") else store.put(encoded.encode())
+        changed += plan != row["plan"]
+        row["plan"] = plan
+        if "plan_fingerprint" in row:
+            row["plan_fingerprint"] = fingerprint
+
+    # replace the result csv atomically
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(filename)), suffix=".csv")
+    try:
+        with os.fdopen(fd, "w") as file:
+            writer = csv.DictWriter(file, fieldnames=fieldnames)
+            writer.writeheader()
+            writer.writerows(rows)
+        os.replace(tmp, filename)
+    except Exception:
+        os.remove(tmp)
+        raise
+
+    logger.log_driver(f"Updated {changed} of {len(rows)} plans in {filename}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parse the raw plans stored with benchmark results again with the current plan parsers")
+    parser.add_argument("filenames", nargs="+", help="result csvs, must not be written by a running benchmark")
+    parser.add_argument("-j", "--workers", dest="workers", type=int, default=None, help="number of processes (default: number of cpus)")
+    args = parser.parse_args()
+
+    for filename in args.filenames:
+        reparse(filename, args.workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+import argparse
+import itertools
+import sys
+import time
+from typing import Callable, Dict, List, Optional
+
+from queryplan.decoder.binarydecoder import QueryPlanBinaryDecoder
+from queryplan.encoder.binaryencoder import QueryPlanBinaryEncoder
+from queryplan.fingerprint import plan_fingerprint
+from queryplan.parsers.duckdbparser import DuckDBParser
+from queryplan.parsers.hyperparser import HyperParser
+from queryplan.parsers.planparser import PlanParser
+from queryplan.parsers.postgresparser import PostgresParser
+from queryplan.parsers.umbraparser import UmbraParser
+from queryplan.plannode import InnerNode, preorder
+from queryplan.queryplan import QueryPlan, decode_query_plan, encode_query_plan
+from util import formatter, logger
+
+# Synthetic plans in the formats of the systems, to measure plan processing on plans far larger than the plans of the
+# benchmarks, e.g., generated queries joining thousands of tables. A "deep" plan is a left-deep chain of hash joins, a
+# "union" plan is a long UNION ALL of table scans.
+
+
+def postgres_plan(nodes: int, shape: str) -> dict:
+    def operator(node_type: str, rows: int, **attrs) -> dict:
+        return {"Node Type": node_type, "Plan Rows": rows, "Actual Rows": rows, "Actual Total Time": 0.5, "Actual Loops": 1, **attrs}
+
+    def scan(i: int) -> dict:
+        return operator("Seq Scan", 1000, **{"Relation Name": f"t{i}"})
+
+    if shape == "union":
+        root = operator("Append", nodes * 1000, Plans=[scan(i) for i in range(nodes)])
+    else:
+        # the innermost relation is a cte, as in recursive and repeated subqueries
+        cte = operator("Seq Scan", 1000, **{"Relation Name": "t0", "Parent Relationship": "InitPlan", "Subplan Name": "CTE c"})
+        root = operator("CTE Scan", 1000, **{"CTE Name": "c"})
+        for i in range(1, nodes // 3 + 1):
+            build = operator("Hash", 1000, **{"Peak Memory Usage": 64}, Plans=[scan(i)])
+            root = operator("Hash Join", 1000, **{"Join Type": "Inner"}, Plans=[root, build])
+        root = operator("Aggregate", 1, Strategy="Plain", Plans=[cte, root])
+    return {"Plan": root}
+
+
+def duckdb_plan(nodes: int, shape: str) -> dict:
+    def operator(operator_type: str, rows: int, extra_info: dict, children: List[dict]) -> dict:
+        return {"operator_type": operator_type, "extra_info": {"Estimated Cardinality": str(rows), **extra_info}, "operator_cardinality": rows,
+                "operator_timing": 0.0005, "children": children}
+
+    def scan(i: int) -> dict:
+        return operator("TABLE_SCAN", 1000, {"Table": f"t{i}"}, [])
+
+    root = scan(0)
+    if shape == "union":
+        # unions are binary in DuckDB, a long UNION ALL is a deep plan as well
+        for i in range(1, nodes // 2 + 1):
+            root = operator("UNION", (i + 1) * 1000, {}, [root, scan(i)])
+    else:
+        for i in range(1, nodes // 2 + 1):
+            root = operator("HASH_JOIN", 1000, {"Join Type": "INNER"}, [root, scan(i)])
+    root = operator("UNGROUPED_AGGREGATE", 1, {}, [root])
+    return {"children": [root]}
+
+
+def hyper_plan(nodes: int, shape: str) -> dict:
+    ids = itertools.count()
+
+    def operator(name: str, rows: int, **attrs) -> dict:
+        return {"operator": name, "operatorId": next(ids), "cardinality": rows, "analyze": {"tuple-count": rows}, **attrs}
+
+    def scan(i: int) -> dict:
+        return operator("tablescan", 1000, debugName={"value": f"t{i}"})
+
+    if shape == "union":
+        return operator("unionall", nodes * 1000, input=[scan(i) for i in range(nodes)])
+
+    # the first scan materializes the innermost relation, the second one scans it again
+    temp = operator("temp", 1000, input=scan(0))
+    root = operator("explicitscan", 1000, input=temp)
+    for i in range(1, nodes // 2):
+        root = operator("join", 1000, method="hash", left=root, right=scan(i))
+    root = operator("join", 1000, method="hash", left=root, right=operator("explicitscan", 1000, input=temp["operatorId"]))
+    return operator("groupby", 1, input=root)
+
+
+def umbra_plan(nodes: int, shape: str) -> dict:
+    ids = itertools.count()
+
+    def operator(name: str, rows: int, **attrs) -> dict:
+        return {"operator": name, "operatorId": next(ids), "cardinality": rows, "analyzePlanCardinality": rows, **attrs}
+
+    def scan(i: int) -> dict:
+        return operator("tablescan", 1000, tablename=f"t{i}", tableSize=1000)
+
+    if shape == "union":
+        root = operator("setoperation", nodes * 1000, operation="unionall", arguments=[{"input": scan(i)} for i in range(nodes)])
+    else:
+        temp = operator("temp", 1000, input=scan(0))
+        root = operator("pipelinebreakerscan", 1000, scannedOperator=temp["operatorId"], pipelineBreaker=temp)
+        for i in range(1, nodes // 2):
+            root = operator("join", 1000, physicalOperator="hashjoin", type="inner", left=root, right=scan(i))
+        root = operator("join", 1000, physicalOperator="hashjoin", type="inner", left=root,
+                        right=operator("pipelinebreakerscan", 1000, scannedOperator=temp["operatorId"]))
+        root = operator("groupby", 1, input=root)
+    return {"plan": root}
+
+
+generators: Dict[str, tuple[Callable[[], PlanParser], Callable[[int, str], dict]]] = {
+    "postgres": (PostgresParser, postgres_plan),
+    "duckdb": (DuckDBParser, duckdb_plan),
+    "hyper": (lambda: HyperParser(duplicate_shared_pipelines=True), hyper_plan),
+    "umbra": (lambda: UmbraParser(duplicate_shared_pipelines=True), umbra_plan),
+}
+
+
+def measure(step: Callable, repetitions: int):
+    """
+    Returns:
+        tuple: The result of the step and its fastest runtime over all repetitions in milliseconds.
+    """
+    fastest = None
+    result = None
+    for _ in range(repetitions):
+        begin = time.perf_counter()
+        result = step()
+        runtime = (time.perf_counter() - begin) * 1000
+        fastest = runtime if fastest is None else min(fastest, runtime)
+    return result, fastest
+
+
+def stress(systems: List[str], shapes: List[str], nodes: int, repetitions: int):
+    """
+    Parse, encode, decode, and fingerprint synthetic plans and report the fastest runtime of each step.
+
+    Args:
+        systems (List[str]): The plan formats.
+        shapes (List[str]): The plan shapes, "deep" or "union".
+        nodes (int): The approximate number of operators per plan.
+        repetitions (int): The number of repetitions of every step.
+    """
+    for system in systems:
+        create_parser, generate = generators[system]
+        for shape in shapes:
+            json_plan = generate(nodes, shape)
+            logger.log_header(f"{system} {shape}")
+
+            query_plan, runtime = measure(lambda: create_parser().parse_json_plan("", json_plan), repetitions)
+            logger.log_driver(f"{'parse'.ljust(16)} {formatter.format_time(runtime).rjust(12)}")
+
+            encoded, runtime = measure(lambda: encode_query_plan(query_plan), repetitions)
+            logger.log_driver(f"{'encode json'.ljust(16)} {formatter.format_time(runtime).rjust(12)}  {len(encoded):,} bytes")
+            encoded_xml, runtime = measure(lambda: encode_query_plan(query_plan, "xml"), repetitions)
+            logger.log_driver(f"{'encode xml'.ljust(16)} {formatter.format_time(runtime).rjust(12)}  {len(encoded_xml):,} bytes")
+            binary, runtime = measure(lambda: QueryPlanBinaryEncoder().encode(query_plan), repetitions)
+            logger.log_driver(f"{'encode binary'.ljust(16)} {formatter.format_time(runtime).rjust(12)}  {len(binary):,} bytes")
+
+            decoded, runtime = measure(lambda: decode_query_plan(encoded), repetitions)
+            logger.log_driver(f"{'decode json'.ljust(16)} {formatter.format_time(runtime).rjust(12)}")
+            decoded_binary, runtime = measure(lambda: QueryPlanBinaryDecoder().decode(binary), repetitions)
+            logger.log_driver(f"{'decode binary'.ljust(16)} {formatter.format_time(runtime).rjust(12)}")
+
+            fingerprint, runtime = measure(lambda: plan_fingerprint(query_plan), repetitions)
+            logger.log_driver(f"{'fingerprint'.ljust(16)} {formatter.format_time(runtime).rjust(12)}")
+
+            if encode_query_plan(decoded) != encoded or encode_query_plan(decoded_binary) != encoded:
+                logger.log_error(f"{system} {shape} plan changed in an encoding round trip")
+
+
+def compare_plans(expected: QueryPlan, actual: QueryPlan) -> Optional[str]:
+    """
+    Compare two plans node by node in pre-order: the node and operator classes, the operator attributes, and the node
+    attributes, including the system representation.
+
+    Returns:
+        Optional[str]: A description of the first difference, None if the plans are equal.
+    """
+    if expected.text != actual.text:
+        return "the query text differs"
+    expected_nodes, actual_nodes = preorder(expected.plan), preorder(actual.plan)
+    for i, (e, a) in enumerate(zip(expected_nodes, actual_nodes)):
+        if type(e) is not type(a) or type(e.operator) is not type(a.operator):
+            return f"node {i} is a {type(a).__name__} {type(a.operator).__name__}, expected a {type(e).__name__} {type(e.operator).__name__}"
+        if vars(e.operator) != vars(a.operator):
+            return f"the operator of node {i} differs: expected {vars(e.operator)}, got {vars(a.operator)}"
+        if dict(e.attributes()) != dict(a.attributes()):
+            return f"the attributes of node {i} differ: expected {dict(e.attributes())}, got {dict(a.attributes())}"
+        if isinstance(e, InnerNode) and len(e.children) != len(a.children):
+            return f"node {i} has {len(a.children)} children, expected {len(e.children)}"
+    if next(expected_nodes, None) is not None or next(actual_nodes, None) is not None:
+        return "the plans have a different number of nodes"
+    return None
+
+
+def check(systems: List[str], shapes: List[str], nodes: int) -> bool:
+    """
+    Check that the synthetic plans of every plan format survive the round trip through the binary plan encoding
+    unchanged, without running a system.
+
+    Args:
+        systems (List[str]): The plan formats.
+        shapes (List[str]): The plan shapes, "deep" or "union".
+        nodes (int): The approximate number of operators per plan.
+
+    Returns:
+        bool: Whether all plans are unchanged.
+    """
+    unchanged = True
+    for system in systems:
+        create_parser, generate = generators[system]
+        for shape in shapes:
+            query_plan = create_parser().parse_json_plan(f"{system} {shape}", generate(nodes, shape))
+            difference = compare_plans(query_plan, QueryPlanBinaryDecoder().decode(QueryPlanBinaryEncoder().encode(query_plan)))
+            if difference is None:
+                logger.log_driver(f"{system} {shape} plan unchanged in the binary round trip")
+            else:
+                logger.log_error(f"{system} {shape} plan changed in the binary round trip, {difference}")
+                unchanged = False
+    return unchanged
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure plan parsing, encoding, and decoding on synthetic plans with many operators")
+    parser.add_argument("-s", "--systems", dest="systems", nargs="*", default=list(generators.keys()), choices=list(generators.keys()), help="plan formats (default: all)")
+    parser.add_argument("--shapes", dest="shapes", nargs="*", default=["deep", "union"], choices=["deep", "union"], help="plan shapes (default: all)")
+    parser.add_argument("-n", "--nodes", dest="nodes", type=int, default=10000, help="approximate number of operators per plan (default: 10000)")
+    parser.add_argument("-r", "--repetitions", dest="repetitions", type=int, default=3, help="repetitions of every step (default: 3)")
+    parser.add_argument("--check", dest="check", default=False, action="store_true",
+                        help="only check the binary round trip node by node, exit with status 1 if a plan changed")
+    args = parser.parse_args()
+
+    if args.check:
+        if not check(args.systems, args.shapes, args.nodes):
+            sys.exit(1)
+        return
+
+    stress(args.systems, args.shapes, args.nodes, args.repetitions)
+
+
+if __name__ == "__main__":
+    main()
@@ -7,12 +7,26 @@ from types import SimpleNamespace
 
 from benchmark import run_benchmarks
 from benchmarks.benchmark import benchmarks
+from queryplan.decoder.binarydecoder import QueryPlanBinaryDecoder
+from queryplan.encoder.binaryencoder import QueryPlanBinaryEncoder
+from queryplan.queryplan import decode_query_plan, encode_query_plan
 from util import logger, schemajson
+from util.resultcsv import read_results
 
 workdir = os.getcwd()
 csv.field_size_limit(sys.maxsize)
 
 
+def check_plan_round_trip(encoded: str, query: str):
+    """
+    Checks that a stored plan survives the round trip through the binary plan encoding unchanged.
+    """
+    query_plan = decode_query_plan(encoded)
+    binary = QueryPlanBinaryEncoder().encode(query_plan)
+    if encode_query_plan(QueryPlanBinaryDecoder().decode(binary)) != encode_query_plan(query_plan):
+        raise Exception(f"Plan of query '{query}' changed in the binary round trip.")
+
+
 def main():
     parser = argparse.ArgumentParser(description="Test OLAPBench.")
     parser.add_argument("filenames", nargs="*", default=[], help="Optional list of configuration files")
@@ -60,27 +74,27 @@ def main():
         for b in definition["benchmarks"]:
             benchmark = benchmark_descriptions[b["name"]].instantiate("data", b)
 
-            with open(os.path.join(output_dir, benchmark.result_name + ".csv"), "r") as csvfile:
-                reader = csv.DictReader(csvfile)
+            for row in read_results(os.path.join(output_dir, benchmark.result_name + ".csv")):
+                dbms = row["dbms"]
+                version = row["version"]
+                state = row["state"]
+                query = row["query"]
 
-                for row in reader:
-                    dbms = row["dbms"]
-                    version = row["version"]
-                    state = row["state"]
-                    query = row["query"]
+                if dbms != dbms:
+                    raise Exception(f"System name '{dbms}' in output does not match the definition.")
 
-                    if dbms != dbms:
-                        raise Exception(f"System name '{dbms}' in output does not match the definition.")
+                if version not in versions:
+                    raise Exception(f"Version '{version}' in output does not match the definition.")
 
-                    if version not in versions:
-                        raise Exception(f"Version '{version}' in output does not match the definition.")
+                if state not in ["success", "timeout", "global_timeout"]:
+                    raise Exception(f"Unexpected state '{state}' in output.")
 
-                    if state not in ["success", "timeout", "global_timeout"]:
-                        raise Exception(f"Unexpected state '{state}' in output.")
+                if row.get("plan"):
+                    check_plan_round_trip(row["plan"], query)
 
-                    if version not in results:
-                        results[version] = []
-                    results[row["version"]].append(query)
+                if version not in results:
+                    results[version] = []
+                results[row["version"]].append(query)
 
         queries = [name for name, _ in benchmark.queries(dbms)]
         for version in results:
@@ -0,0 +1,73 @@
+import hashlib
+import os
+import tempfile
+import zlib
+
+
+class BlobStore:
+    """
+    Content-addressed store for compressed blobs in a directory. Blobs are keyed by the hash of their content, so that
+    identical blobs, e.g., the same query plan of several versions, are stored only once.
+    """
+
+    def __init__(self, directory: str, compression_level: int = 6):
+        self.directory = directory
+        self._compression_level = compression_level
+
+    @staticmethod
+    def key(data: bytes) -> str:
+        """
+        Returns:
+            str: The key of a blob, the hex digest of its content.
+        """
+        return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], key)
+
+    def __contains__(self, key: str) -> bool:
+        return os.path.exists(self._path(key))
+
+    def put(self, data: bytes) -> str:
+        """
+        Store a blob if it is not stored yet.
+
+        Args:
+            data (bytes): The blob.
+
+        Returns:
+            str: The key of the blob.
+        """
+        key = self.key(data)
+        path = self._path(key)
+        if os.path.exists(path):
+            return key
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # write to a temporary file first, so that concurrent readers and writers never see a partial blob
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path))
+        try:
+            with os.fdopen(fd, "wb") as file:
+                file.write(zlib.compress(data, self._compression_level))
+            os.replace(tmp, path)
+        except Exception:
+            os.remove(tmp)
+            raise
+        return key
+
+    def get(self, key: str) -> bytes:
+        """
+        Args:
+            key (str): The key of the blob.
+
+        Returns:
+            bytes: The blob.
+
+        Raises:
+            KeyError: If no blob is stored for the key.
+        """
+        try:
+            with open(self._path(key), "rb") as file:
+                return zlib.decompress(file.read())
+        except FileNotFoundError:
+            raise KeyError(key)
@@ -0,0 +1,164 @@
+import os
+import threading
+import time
+from typing import Optional
+
+from util import logger
+
+cgroup_root = "/sys/fs/cgroup"
+
+
+class Cgroup:
+    """
+    The cgroup v2 of a docker container, providing the resources consumed by all processes in the container.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+
+    @staticmethod
+    def of_container(container) -> Optional['Cgroup']:
+        """
+        Look up the cgroup of a running docker container.
+
+        Args:
+            container: The docker container.
+
+        Returns:
+            Optional[Cgroup]: The cgroup, or None if the container is not running or cgroup v2 is not available.
+        """
+        try:
+            container.reload()
+            pid = container.attrs["State"]["Pid"]
+            with open(f"/proc/{pid}/cgroup", "r") as file:
+                for line in file:
+                    # the unified hierarchy has the hierarchy id 0 and no controllers
+                    if line.startswith("0::"):
+                        path = os.path.join(cgroup_root, line[3:].strip().lstrip("/"))
+                        if os.path.isfile(os.path.join(path, "cpu.stat")):
+                            return Cgroup(path)
+        except Exception as e:
+            logger.log_warn_verbose(f"Could not determine the cgroup of the container: {e}")
+
+        return None
+
+    @property
+    def name(self) -> str:
+        """The path of the cgroup relative to the cgroup root, as expected by tools like perf."""
+        return os.path.relpath(self.path, cgroup_root)
+
+    def _read(self, file: str) -> str:
+        with open(os.path.join(self.path, file), "r") as f:
+            return f.read()
+
+    def memory_current(self) -> int:
+        return int(self._read("memory.current"))
+
+    def cpu_stat(self) -> dict:
+        """
+        Returns:
+            dict: The cumulative cpu times of the cgroup in microseconds (usage_usec, user_usec, system_usec).
+        """
+        stat = {}
+        for line in self._read("cpu.stat").splitlines():
+            key, value = line.split()
+            stat[key] = int(value)
+        return stat
+
+    def io_stat(self) -> dict:
+        """
+        Returns:
+            dict: The cumulative I/O of the cgroup summed over all devices (rbytes, wbytes, rios, wios).
+        """
+        stat = {"rbytes": 0, "wbytes": 0, "rios": 0, "wios": 0}
+        try:
+            content = self._read("io.stat")
+        except OSError:
+            # the io controller is not enabled for the cgroup
+            return stat
+
+        for line in content.splitlines():
+            for entry in line.split()[1:]:
+                key, value = entry.split("=")
+                if key in stat:
+                    stat[key] += int(value)
+        return stat
+
+
+class CgroupMonitor:
+    """
+    Accounts the resources a cgroup consumed between entering and exiting the monitor.
+
+    The peak memory is taken from memory.peak, which is reset on entry if the kernel supports it (Linux 6.12+).
+    Otherwise, memory.current is sampled every `interval` seconds in a background thread of the benchmark process, which
+    competes with the client for the GIL; the interval is coarse to keep this overhead small, at the cost of missing
+    short memory peaks.
+    """
+
+    def __init__(self, cgroup: Cgroup, interval: float = 0.05):
+        self._cgroup = cgroup
+        self._interval = interval
+
+        self._peak_fd = None
+        self._sampler = None
+        self._stop = threading.Event()
+        self._memory_peak = 0
+
+    def __enter__(self):
+        self._memory_peak = self._cgroup.memory_current()
+        try:
+            # writing to memory.peak resets the peak for reads through the same file descriptor
+            self._peak_fd = os.open(os.path.join(self._cgroup.path, "memory.peak"), os.O_RDWR)
+            os.write(self._peak_fd, b"reset")
+        except OSError:
+            if self._peak_fd is not None:
+                os.close(self._peak_fd)
+                self._peak_fd = None
+            self._stop.clear()
+            self._sampler = threading.Thread(target=self._sample, daemon=True)
+            self._sampler.start()
+
+        self._cpu = self._cgroup.cpu_stat()
+        self._io = self._cgroup.io_stat()
+        self._begin = time.time()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._end = time.time()
+        cpu = self._cgroup.cpu_stat()
+        io = self._cgroup.io_stat()
+
+        if self._peak_fd is not None:
+            os.lseek(self._peak_fd, 0, os.SEEK_SET)
+            self._memory_peak = max(self._memory_peak, int(os.read(self._peak_fd, 64)))
+            os.close(self._peak_fd)
+            self._peak_fd = None
+        if self._sampler is not None:
+            self._stop.set()
+            self._sampler.join()
+            self._sampler = None
+
+        self._cpu = {key: cpu[key] - self._cpu.get(key, 0) for key in cpu}
+        self._io = {key: io[key] - self._io.get(key, 0) for key in io}
+
+    def _sample(self):
+        while not self._stop.wait(self._interval):
+            try:
+                self._memory_peak = max(self._memory_peak, self._cgroup.memory_current())
+            except OSError:
+                return
+
+    def metrics(self) -> dict:
+        """
+        Returns:
+            dict: The consumed resources with the times in milliseconds and the memory and I/O in bytes.
+        """
+        elapsed = (self._end - self._begin) * 1e6
+        return {
+            "cgroup.memory_peak": self._memory_peak,
+            "cgroup.cpu_user": self._cpu.get("user_usec", 0) / 1000,
+            "cgroup.cpu_system": self._cpu.get("system_usec", 0) / 1000,
+            "cgroup.cpu_utilization": self._cpu.get("usage_usec", 0) / elapsed if elapsed > 0 else 0,
+            "cgroup.io_read_bytes": self._io["rbytes"],
+            "cgroup.io_write_bytes": self._io["wbytes"],
+        }
@@ -0,0 +1,145 @@
+import json
+import re
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+
+def dumps(obj, cls=json.JSONEncoder, **kwargs) -> str:
+    """
+    Serialize an object to json like `json.dumps`, but also objects that are nested too deeply for the recursive
+    encoder, e.g., plans with thousands of operators.
+
+    Args:
+        obj: The object.
+        cls: The encoder class, either of `json` or of `simplejson`.
+        **kwargs: The arguments of the encoder.
+
+    Returns:
+        str: The json string.
+    """
+    encoder = cls(**kwargs)
+    try:
+        return encoder.encode(obj)
+    except RecursionError:
+        return _dumps(obj, encoder)
+
+
+def loads(s: str, cls=json.JSONDecoder, **kwargs):
+    """
+    Deserialize a json string like `json.loads`, but also strings that are nested too deeply for the recursive decoder.
+
+    Args:
+        s (str): The json string.
+        cls: The decoder class, either of `json` or of `simplejson`.
+        **kwargs: The arguments of the decoder, object hooks are not supported.
+
+    Returns:
+        The object.
+    """
+    decoder = cls(**kwargs)
+    try:
+        return decoder.decode(s)
+    except RecursionError:
+        return _loads(s, decoder)
+
+
+def _dumps(obj, encoder) -> str:
+    parts = []
+    # the stack holds the values still to write and the closing brackets and separators between them
+    stack = [obj]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, _Token):
+            parts.append(value.text)
+        elif isinstance(value, dict):
+            parts.append("{")
+            stack.append(_Token("}"))
+            items = list(value.items())
+            for i in reversed(range(len(items))):
+                key, val = items[i]
+                stack.append(val)
+                key = key if isinstance(key, str) else json.dumps(key)
+                stack.append(_Token(encoder.encode(key) + encoder.key_separator))
+                if i:
+                    stack.append(_Token(encoder.item_separator))
+        elif isinstance(value, (list, tuple)):
+            parts.append("[")
+            stack.append(_Token("]"))
+            for i in reversed(range(len(value))):
+                stack.append(value[i])
+                if i:
+                    stack.append(_Token(encoder.item_separator))
+        else:
+            parts.append(encoder.encode(value))
+    return "".join(parts)
+
+
+class _Token:
+    __slots__ = ("text",)
+
+    def __init__(self, text: str):
+        self.text = text
+
+
+def _loads(s: str, decoder):
+    scan = decoder.scan_once
+
+    def skip(pos: int) -> int:
+        return _WHITESPACE.match(s, pos).end()
+
+    def key(pos: int) -> tuple[str, int]:
+        if s[pos:pos + 1] != '"':
+            raise json.JSONDecodeError("Expecting property name enclosed in double quotes", s, pos)
+        name, pos = scan(s, pos)
+        pos = skip(pos)
+        if s[pos:pos + 1] != ":":
+            raise json.JSONDecodeError("Expecting ':' delimiter", s, pos)
+        return name, skip(pos + 1)
+
+    # open containers with the key of the value that is parsed next
+    stack = []
+    pos = skip(0)
+    while True:
+        c = s[pos] if pos < len(s) else ""
+        if c == "{" or c == "[":
+            container = {} if c == "{" else []
+            pos = skip(pos + 1)
+            if s[pos:pos + 1] != ("}" if c == "{" else "]"):
+                name = None
+                if c == "{":
+                    name, pos = key(pos)
+                stack.append([container, name])
+                continue
+            value, pos = container, pos + 1
+        else:
+            try:
+                value, pos = scan(s, pos)
+            except StopIteration:
+                raise json.JSONDecodeError("Expecting value", s, pos) from None
+
+        # add the value to its container and close all containers that end after it
+        while True:
+            if not stack:
+                pos = skip(pos)
+                if pos != len(s):
+                    raise json.JSONDecodeError("Extra data", s, pos)
+                return value
+
+            entry = stack[-1]
+            container = entry[0]
+            if isinstance(container, dict):
+                container[entry[1]] = value
+            else:
+                container.append(value)
+
+            pos = skip(pos)
+            c = s[pos] if pos < len(s) else ""
+            if c == ",":
+                pos = skip(pos + 1)
+                if isinstance(container, dict):
+                    entry[1], pos = key(pos)
+                break
+            if c != ("}" if isinstance(container, dict) else "]"):
+                raise json.JSONDecodeError("Expecting ',' delimiter", s, pos)
+            stack.pop()
+            value, pos = container, pos + 1
@@ -0,0 +1,93 @@
+import datetime
+import decimal
+import hashlib
+import math
+import uuid
+
+import simplejson as json
+
+_MASK = 2 ** 128 - 1
+
+# numbers are compared with this many significant digits, so that the float and decimal results of the systems match
+_PRECISION = decimal.Context(prec=12, rounding=decimal.ROUND_HALF_EVEN)
+# integers below this bound are kept exact, e.g., keys
+_EXACT = 10 ** 15
+
+
+def normalize(value):
+    """
+    Normalize a value of a result row, so that the same value returned by different systems and drivers is encoded the
+    same way: numbers of any type are encoded alike, integers exactly and other numbers rounded to 12 significant
+    digits, trailing blanks of fixed-length strings are removed, and temporal values are encoded in ISO format.
+
+    Args:
+        value: The value.
+
+    Returns:
+        The normalized value, a string, a list of normalized values, or None.
+    """
+    if value is None or isinstance(value, str):
+        return value if value is None else value.rstrip(" ")
+    if isinstance(value, bool):
+        value = int(value)
+    if isinstance(value, float):
+        if math.isnan(value) or math.isinf(value):
+            return str(value)
+        value = decimal.Decimal(repr(value))
+    if isinstance(value, (int, decimal.Decimal)):
+        number = decimal.Decimal(value)
+        if not number.is_finite():
+            return str(float(number))
+        if number == number.to_integral_value() and abs(number) < _EXACT:
+            return str(int(number))
+        return str(_PRECISION.plus(number).normalize(_PRECISION))
+    if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, datetime.timedelta):
+        return normalize(value.total_seconds())
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return bytes(value).hex()
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    if isinstance(value, (list, tuple)):
+        return [normalize(v) for v in value]
+    return str(value)
+
+
+class ResultDigest:
+    """
+    Order-insensitive digest over the rows of a query result.
+
+    Every row is hashed on its own and the row hashes are summed up modulo 2^128. The digest therefore does not depend
+    on the order in which the rows arrive, but still distinguishes results that differ in the multiplicity of a row.
+    The values of the rows are normalized before hashing, so that the digests of different systems are comparable.
+    """
+
+    def __init__(self):
+        self.rows = 0
+        self._sum = 0
+
+    def update(self, rows):
+        """
+        Add a batch of rows to the digest.
+
+        Args:
+            rows: An iterable of rows, each row being a sequence of values.
+        """
+        for row in rows:
+            encoded = json.dumps([normalize(value) for value in row], ensure_ascii=False)
+            self.update_encoded(encoded.encode())
+
+    def update_encoded(self, row: bytes):
+        """
+        Add a single row that is already encoded as bytes to the digest.
+
+        Args:
+            row (bytes): The encoded row.
+        """
+        h = hashlib.blake2b(row, digest_size=16).digest()
+        self._sum = (self._sum + int.from_bytes(h, "little")) & _MASK
+        self.rows += 1
+
+    def hexdigest(self) -> str:
+        return f"{self._sum:032x}"
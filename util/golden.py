@@ -0,0 +1,103 @@
+import hashlib
+import os
+import tempfile
+from typing import Dict, Optional
+
+import simplejson as json
+
+from benchmarks.benchmark import Benchmark
+from dbms.dbms import Result
+from util import logger
+from util.resultcsv import sql_encoder
+
+
+def query_hash(benchmark: Benchmark, query: str) -> str:
+    """
+    Returns:
+        str: The hash of the text of a query file of a benchmark. The specialized variants of a query for the systems
+        share the hash of the query, as they compute the same result.
+    """
+    with open(os.path.join(benchmark.queries_path, query), "r") as file:
+        text = file.read().strip()
+    return hashlib.blake2b(text.encode(), digest_size=8).hexdigest()
+
+
+class GoldenResults:
+    """
+    A cache of correct query results in a directory that can be shared between runs and machines. The results are
+    stored per benchmark (its unique name, e.g., including the scale factor), query file, and hash of the query text, so
+    that a changed query never matches an old result. Every result is stored with its digest, its number of rows, and
+    its first rows, which are the complete result for small results. Results are only added, never replaced.
+    """
+
+    def __init__(self, directory: str, benchmark: Benchmark, rows: int = 100):
+        self.directory = os.path.join(directory, benchmark.unique_name)
+        self.benchmark = benchmark
+        self.rows = rows
+
+    def _path(self, query: str) -> str:
+        return os.path.join(self.directory, f"{query}.{query_hash(self.benchmark, query)}.json")
+
+    def get(self, query: str) -> Optional[dict]:
+        """
+        Returns:
+            Optional[dict]: The golden result of a query with its `digest`, number of `rows`, first rows (`head`), and the
+            `reference` system that computed it, None if there is none.
+        """
+        path = self._path(query)
+        if not os.path.exists(path):
+            return None
+        with open(path, "r") as file:
+            return json.load(file, use_decimal=True)
+
+    def load(self) -> Dict[str, dict]:
+        """
+        Returns:
+            Dict[str, dict]: The golden results of the queries of the benchmark.
+        """
+        golden = {}
+        for query, _ in self.benchmark.queries(""):
+            entry = self.get(query)
+            if entry is not None:
+                golden[query] = entry
+        return golden
+
+    def put(self, query: str, reference: str, result: Result) -> bool:
+        """
+        Store the result of a query as golden result, unless there already is one.
+
+        Args:
+            query (str): The name of the query file.
+            reference (str): The system that computed the result, e.g., its title and version.
+            result (Result): The complete result with its digest.
+
+        Returns:
+            bool: Whether the result was stored.
+        """
+        path = self._path(query)
+        if os.path.exists(path) or result.digest is None:
+            return False
+
+        entry = {
+            "benchmark": self.benchmark.unique_name,
+            "query": query,
+            "query_hash": query_hash(self.benchmark, query),
+            "reference": reference,
+            "digest": result.digest,
+            "rows": result.rows if result.rows is not None else len(result.result),
+            # streamed results have no rows
+            "head": result.result[:self.rows] if result.result or not result.rows else None,
+        }
+
+        os.makedirs(self.directory, exist_ok=True)
+        # write to a temporary file first, so that concurrent readers never see a partial result
+        fd, tmp = tempfile.mkstemp(dir=self.directory, prefix=".", suffix=".json")
+        try:
+            with os.fdopen(fd, "w") as file:
+                json.dump(entry, file, use_decimal=True, default=sql_encoder, allow_nan=True)
+            os.replace(tmp, path)
+        except Exception:
+            os.remove(tmp)
+            raise
+        logger.log_verbose_benchmark(f"Stored the result of {query} computed by {reference} as golden result", self.benchmark)
+        return True
@@ -0,0 +1,234 @@
+import random
+import re
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Set, Tuple
+
+_KEYWORD = re.compile(r"\b(select|from|where|and|or|between)\b", re.IGNORECASE)
+_JOIN_PREDICATE = re.compile(r"^\(?\s*(\w+)\.(\w+)\s*=\s*(\w+)\.(\w+)\s*\)?$")
+_TABLE = re.compile(r"^(\w+)(?:\s+(?:as\s+)?(\w+))?$", re.IGNORECASE)
+
+
+@dataclass
+class JoinQuery:
+    """
+    A select-project-join query with comma-separated tables in the from clause and a conjunctive where clause, e.g.,
+    the queries of the Join Order Benchmark.
+    """
+    select: str
+    # the tables by their alias, in the order of the from clause
+    tables: Dict[str, str]
+    # the equi-join predicates with the two aliases they connect
+    joins: List[Tuple[str, str, str]] = field(default_factory=list)
+    # all other predicates
+    filters: List[str] = field(default_factory=list)
+
+    def neighbors(self, alias: str) -> Set[str]:
+        return {b if a == alias else a for a, b, _ in self.joins if alias in (a, b)}
+
+
+def _top_level(sql: str) -> Iterator[Tuple[int, str]]:
+    """
+    Returns:
+        Iterator[Tuple[int, str]]: The keywords outside of parentheses and string literals with their position.
+    """
+    depth = 0
+    quoted = False
+    i = 0
+    while i < len(sql):
+        c = sql[i]
+        if quoted:
+            if c == "'":
+                quoted = False
+        elif c == "'":
+            quoted = True
+        elif c == "(":
+            depth += 1
+        elif c == ")":
+            depth -= 1
+        elif depth == 0 and (i == 0 or not (sql[i - 1].isalnum() or sql[i - 1] == "_")):
+            match = _KEYWORD.match(sql, i)
+            if match:
+                yield i, match.group(1).lower()
+                i = match.end()
+                continue
+        i += 1
+
+
+def _split_commas(sql: str) -> List[str]:
+    parts = []
+    depth = 0
+    begin = 0
+    for i, c in enumerate(sql):
+        if c == "(":
+            depth += 1
+        elif c == ")":
+            depth -= 1
+        elif c == "," and depth == 0:
+            parts.append(sql[begin:i])
+            begin = i + 1
+    parts.append(sql[begin:])
+    return [part.strip() for part in parts]
+
+
+def parse_join_query(sql: str) -> JoinQuery:
+    """
+    Parse a select-project-join query.
+
+    Args:
+        sql (str): The query, `select ... from t1 as a, t2 as b, ... where ... and ...`.
+
+    Returns:
+        JoinQuery: The parsed query.
+
+    Raises:
+        ValueError: If the query does not have the expected form, e.g., a disjunction at the top level of its where
+            clause.
+    """
+    sql = sql.strip().rstrip(";").strip()
+    keywords = list(_top_level(sql))
+    positions = {}
+    for position, keyword in keywords:
+        if keyword in ["select", "from", "where"]:
+            if keyword in positions:
+                raise ValueError(f"the query has more than one {keyword} clause")
+            positions[keyword] = position
+    if list(positions.keys()) != ["select", "from", "where"] or positions["select"] != 0:
+        raise ValueError("the query is not of the form select ... from ... where ...")
+
+    select = sql[len("select"):positions["from"]].strip()
+    tables = {}
+    for table in _split_commas(sql[positions["from"] + len("from"):positions["where"]]):
+        match = _TABLE.match(table)
+        if not match or match.group(1).lower() == "join":
+            raise ValueError(f"unsupported table in the from clause: {table}")
+        alias = match.group(2) or match.group(1)
+        if alias in tables:
+            raise ValueError(f"duplicate alias {alias}")
+        tables[alias] = match.group(1)
+
+    # split the where clause at its top-level conjunctions, the `and` of a `between` belongs to its predicate
+    predicates = []
+    begin = positions["where"] + len("where")
+    between = False
+    for position, keyword in keywords:
+        if position < begin:
+            continue
+        if keyword == "or":
+            # the predicates are joined again in a different order, which changes the meaning of a disjunction
+            raise ValueError("the where clause is not a conjunction")
+        if keyword == "between":
+            between = True
+        elif keyword == "and" and between:
+            between = False
+        elif keyword == "and":
+            predicates.append(sql[begin:position].strip())
+            begin = position + len("and")
+    predicates.append(sql[begin:].strip())
+
+    query = JoinQuery(select=select, tables=tables)
+    for predicate in predicates:
+        match = _JOIN_PREDICATE.match(predicate)
+        if match and match.group(1) in tables and match.group(3) in tables and match.group(1) != match.group(3):
+            query.joins.append((match.group(1), match.group(3), predicate))
+        else:
+            query.filters.append(predicate)
+    return query
+
+
+def _extend(query: JoinQuery, order: List[str]) -> List[str]:
+    """
+    Returns:
+        List[str]: The aliases that can be joined to a prefix of a left-deep order without a cross product.
+    """
+    joined = set(order)
+    return sorted({neighbor for alias in order for neighbor in query.neighbors(alias)} - joined)
+
+
+def _count_orders(query: JoinQuery, limit: int) -> int:
+    count = 0
+    # depth-first over the prefixes, the first two tables are unordered as the system chooses the build side
+    stack = [[a, b] for a in sorted(query.tables) for b in sorted(query.neighbors(a)) if a < b]
+    while stack and count <= limit:
+        order = stack.pop()
+        if len(order) == len(query.tables):
+            count += 1
+            continue
+        stack.extend(order + [alias] for alias in _extend(query, order))
+    return count
+
+
+def left_deep_orders(query: JoinQuery, budget: int, seed: int = 0) -> List[List[str]]:
+    """
+    Enumerate the left-deep join orders of a query without cross products. Orders that only differ in their first two
+    tables are the same, as the system still chooses the build and probe side of every join. If there are more orders
+    than the budget, a random sample of the orders is returned.
+
+    Args:
+        query (JoinQuery): The query.
+        budget (int): The maximum number of orders.
+        seed (int): The seed of the sample.
+
+    Returns:
+        List[List[str]]: The orders as lists of aliases.
+    """
+    if len(query.tables) < 2:
+        return [list(query.tables)]
+
+    if _count_orders(query, budget) <= budget:
+        orders = []
+        stack = [[a, b] for a in sorted(query.tables) for b in sorted(query.neighbors(a)) if a < b]
+        while stack:
+            order = stack.pop()
+            if len(order) == len(query.tables):
+                orders.append(order)
+            else:
+                stack.extend(order + [alias] for alias in _extend(query, order))
+        return sorted(orders)
+
+    # random walks over the join graph, the orders are far more than the budget, so few walks are duplicates
+    rng = random.Random(seed)
+    orders = set()
+    for _ in range(budget * 100):
+        if len(orders) == budget:
+            break
+        order = [rng.choice(sorted(query.tables))]
+        while len(order) < len(query.tables):
+            candidates = _extend(query, order)
+            if not candidates:
+                break
+            order.append(rng.choice(candidates))
+        if len(order) == len(query.tables):
+            orders.add(tuple(sorted(order[:2]) + order[2:]))
+    return [list(order) for order in sorted(orders)]
+
+
+def explicit_join_query(query: JoinQuery, order: List[str]) -> str:
+    """
+    Rewrite a query into explicit joins in the given order. With `join_collapse_limit = 1`, PostgreSQL joins the tables
+    in the order of the joins in the from clause.
+
+    Args:
+        query (JoinQuery): The query.
+        order (List[str]): The aliases in join order.
+
+    Returns:
+        str: The rewritten query.
+    """
+    def table(alias: str) -> str:
+        return query.tables[alias] if query.tables[alias] == alias else f"{query.tables[alias]} AS {alias}"
+
+    used = set()
+    joined = {order[0]}
+    from_clause = table(order[0])
+    for alias in order[1:]:
+        conditions = []
+        for i, (a, b, predicate) in enumerate(query.joins):
+            if i not in used and ((a == alias and b in joined) or (b == alias and a in joined)):
+                conditions.append(predicate)
+                used.add(i)
+        joined.add(alias)
+        from_clause += f" JOIN {table(alias)} ON {' AND '.join(conditions) if conditions else 'TRUE'}"
+
+    predicates = query.filters + [predicate for i, (_, _, predicate) in enumerate(query.joins) if i not in used]
+    where_clause = f" WHERE {' AND '.join(predicates)}" if predicates else ""
+    return f"SELECT {query.select} FROM {from_clause}{where_clause};"
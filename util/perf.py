@@ -0,0 +1,252 @@
+import os
+import re
+import select
+import shutil
+import signal
+import subprocess
+import tempfile
+import time
+from abc import ABC, abstractmethod
+from collections import Counter
+
+from util import logger
+from util.cgroup import Cgroup
+
+# perf events, keyed by the names Umbra uses for its performance counters
+perf_events = {
+    "cycles": "cycles",
+    "instructions": "instructions",
+    "L1-misses": "L1-dcache-load-misses",
+    "LLC-misses": "LLC-load-misses",
+    "branch-misses": "branch-misses",
+    "task-clock": "task-clock",
+}
+
+
+class _PerfSession(ABC):
+    """
+    A perf session restricted to the processes of a cgroup.
+
+    perf is started with disabled events and enabled through its control fifo, so that the events cover exactly the
+    time between entering and exiting the session and not the startup of perf. If perf fails while the session is
+    open, exiting does not raise, so that the error of the measured query is kept, but stores the failure in `error`.
+    """
+
+    def __init__(self, cgroup: Cgroup, timeout: float = 10):
+        self._cgroup = cgroup
+        self._timeout = timeout
+        self.error = None
+
+    @abstractmethod
+    def _command(self, control: str) -> list[str]:
+        pass
+
+    def __enter__(self):
+        self._dir = tempfile.TemporaryDirectory()
+        ctl = os.path.join(self._dir.name, "ctl")
+        ack = os.path.join(self._dir.name, "ack")
+        os.mkfifo(ctl)
+        os.mkfifo(ack)
+
+        # opening the fifos for reading and writing does not block until perf opened them as well
+        self._ctl = os.open(ctl, os.O_RDWR)
+        self._ack = os.open(ack, os.O_RDWR)
+
+        command = self._command(f"fifo:{ctl},{ack}")
+        logger.log_verbose_process(f'Starting command `{" ".join(command)}`')
+        try:
+            self._process = subprocess.Popen(command, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        except OSError:
+            os.close(self._ctl)
+            os.close(self._ack)
+            self._dir.cleanup()
+            raise
+
+        try:
+            self._control("enable")
+        except Exception:
+            self._close()
+            self._dir.cleanup()
+            raise
+
+        self._begin = time.time()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._end = time.time()
+        try:
+            self._control("disable")
+        except (ChildProcessError, OSError) as e:
+            self.error = e
+        finally:
+            self._close()
+        if self.error is not None:
+            self._dir.cleanup()
+
+    def _control(self, command: str):
+        os.write(self._ctl, f"{command}\n".encode())
+
+        # wait for the acknowledgement of perf
+        ready, _, _ = select.select([self._ack], [], [], self._timeout)
+        if not ready:
+            stderr = self._process.stderr.read().decode() if self._process.poll() is not None else ""
+            raise ChildProcessError(f"perf did not acknowledge `{command}` {stderr}".strip())
+        os.read(self._ack, 64)
+
+    def _close(self):
+        if self._process.poll() is None:
+            self._process.send_signal(signal.SIGINT)
+        try:
+            self._process.wait(timeout=self._timeout)
+        except subprocess.TimeoutExpired:
+            self._process.kill()
+            self._process.wait()
+
+        os.close(self._ctl)
+        os.close(self._ack)
+
+
+class PerfStat(_PerfSession):
+    """
+    Counts hardware performance counters of all processes in a cgroup using `perf stat`.
+    """
+
+    def _command(self, control: str) -> list[str]:
+        self._output = os.path.join(self._dir.name, "perf.csv")
+        events = list(perf_events.values())
+        return ["perf", "stat", "-a", "-x", ",", "-o", self._output, "-D", "-1", "--control", control,
+                "-e", ",".join(events), "-G", ",".join([self._cgroup.name] * len(events))]
+
+    def metrics(self) -> dict:
+        """
+        Returns:
+            dict: The counted events, the instructions per cycle (ipc), and the number of utilized cpus (cpus).
+        """
+        counters = {}
+        try:
+            with open(self._output, "r") as file:
+                for line in file:
+                    fields = line.strip().split(",")
+                    if len(fields) < 3 or line.startswith("#"):
+                        continue
+
+                    value, event = fields[0], fields[2]
+                    for name, perf_event in perf_events.items():
+                        # events might be suffixed with modifiers or prefixed with the pmu on hybrid cpus
+                        if perf_event in event:
+                            try:
+                                counters[name] = counters.get(name, 0) + float(value)
+                            except ValueError:
+                                # <not counted> or <not supported>
+                                pass
+                            break
+        finally:
+            self._dir.cleanup()
+
+        extra = dict(counters)
+        if counters.get("cycles"):
+            extra["ipc"] = counters.get("instructions", 0) / counters["cycles"]
+        elapsed = (self._end - self._begin) * 1000
+        if "task-clock" in counters and elapsed > 0:
+            extra["cpus"] = counters["task-clock"] / elapsed
+        return extra
+
+
+class PerfRecord(_PerfSession):
+    """
+    Records a sampled CPU profile with call stacks of all processes in a cgroup using `perf record`.
+    """
+
+    def __init__(self, cgroup: Cgroup, frequency: int = 999, timeout: float = 10):
+        super().__init__(cgroup, timeout)
+        self._frequency = frequency
+
+    def _command(self, control: str) -> list[str]:
+        self._data = os.path.join(self._dir.name, "perf.data")
+        # cpu-clock is a software event and is therefore available in virtual machines as well
+        return ["perf", "record", "-a", "-g", "-F", str(self._frequency), "-o", self._data, "-D", "-1", "--control", control,
+                "-e", "cpu-clock", "-G", self._cgroup.name]
+
+    def folded(self) -> Counter:
+        """
+        Symbolize the recorded samples and fold them into stacks.
+
+        Returns:
+            Counter: The number of samples per stack, with the stacks given as `command;outermost;...;innermost` frames.
+        """
+        try:
+            command = ["perf", "script", "-i", self._data, "-F", "comm,ip,sym,dso"]
+            logger.log_verbose_process(f'Starting command `{" ".join(command)}`')
+            script = subprocess.run(command, stdin=subprocess.DEVNULL, capture_output=True, text=True, errors="replace", check=True)
+        finally:
+            self._dir.cleanup()
+
+        return fold(script.stdout)
+
+    def save(self, path: str, svg: bool = False) -> list[str]:
+        """
+        Store the folded stacks of the profile and, if requested and `flamegraph.pl` is on the path, a flame graph.
+
+        Args:
+            path (str): The path of the profile without extension.
+            svg (bool): Whether to render a flame graph.
+
+        Returns:
+            list[str]: The written files.
+        """
+        stacks = self.folded()
+        content = "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        files = [path + ".folded"]
+        with open(files[0], "w") as file:
+            file.write(content)
+
+        if svg:
+            flamegraph = shutil.which("flamegraph.pl")
+            if flamegraph is None:
+                logger.log_warn_verbose("flamegraph.pl not found, only storing the folded stacks")
+            else:
+                with open(path + ".svg", "w") as file:
+                    subprocess.run([flamegraph, "--title", os.path.basename(path)], input=content, stdout=file, text=True, check=True)
+                files.append(path + ".svg")
+
+        return files
+
+
+_offset = re.compile(r"\+0x[0-9a-f]+$")
+
+
+def fold(script: str) -> Counter:
+    """
+    Fold the samples printed by `perf script` into stacks.
+
+    Args:
+        script (str): The output of `perf script` with the fields comm, ip, sym, and dso.
+
+    Returns:
+        Counter: The number of samples per stack.
+    """
+    stacks = Counter()
+    for sample in script.split("\n\n"):
+        lines = sample.strip("\n").splitlines()
+        if not lines:
+            continue
+
+        frames = []
+        for line in lines[1:]:
+            # <ip> <symbol>+<offset> (<dso>)
+            fields = line.strip().split(maxsplit=1)
+            if len(fields) < 2:
+                continue
+            symbol, _, dso = fields[1].rpartition(" (")
+            symbol = _offset.sub("", symbol)
+            if not symbol or symbol == "[unknown]":
+                symbol = f"[{os.path.basename(dso.rstrip(')'))}]"
+            frames.append(symbol.replace(";", ":"))
+
+        # perf prints the innermost frame first
+        frames.append(lines[0].strip().replace(";", ":"))
+        stacks[";".join(reversed(frames))] += 1
+
+    return stacks
@@ -1,13 +1,22 @@
 import csv
 import datetime
 import decimal
+import fcntl
 import math
 import os
+import sys
 from statistics import mean, median
+from typing import Callable, Iterator, List, Optional
 
 import simplejson as json
 from dbms.dbms import Result
+from queryplan.fingerprint import plan_fingerprint
 from queryplan.queryplan import encode_query_plan
+from util import deepjson, logger
+from util.blobstore import BlobStore
+
+# results with inline plans and rows exceed the default field size limit of the csv module
+csv.field_size_limit(sys.maxsize)
 
 
 def sql_encoder(obj):
@@ -18,11 +27,75 @@ def sql_encoder(obj):
     raise TypeError("Type %s not serializable" % type(obj))
 
 
+def plan_store(filename: str) -> BlobStore:
+    """
+    Returns:
+        BlobStore: The store for the query plans of a result csv, the `_plans` directory next to it.
+    """
+    return BlobStore(os.path.splitext(filename)[0] + "_plans")
+
+
+def result_store(filename: str) -> BlobStore:
+    """
+    Returns:
+        BlobStore: The store for the result rows of a result csv or directory, the `_results` directory next to it.
+    """
+    return BlobStore(os.path.splitext(filename)[0] + "_results")
+
+
+def read_results(filename: str, columns: Optional[List[str]] = None, resolve: bool = True) -> Iterator[dict]:
+    """
+    Read the rows of a result csv written by ResultCSV or of a result directory (`.parquet`) written by ResultParquet.
+    Plans and results that are kept in a store are resolved, so that the plan column always contains the encoded plan
+    and the result column the json encoded rows. Comparing results by their digest does not need to read the results.
+
+    Args:
+        filename (str): The result csv or directory.
+        columns (Optional[List[str]]): The columns to read (default: all).
+        resolve (bool): Whether to resolve the keys of stored plans and results.
+
+    Returns:
+        Iterator[dict]: The rows, keyed by column, formatted like the rows of a result csv.
+    """
+    store = plan_store(filename)
+    results = result_store(filename)
+
+    def resolved(row: dict) -> dict:
+        if not resolve:
+            return row
+        # inline plans are json objects and inline results json arrays, everything else is the key of a stored blob
+        if row.get("plan") and not row["plan"].startswith("{"):
+            row["plan"] = store.get(row["plan"]).decode()
+        if row.get("result") and not row["result"].startswith("["):
+            row["result"] = results.get(row["result"]).decode()
+        return row
+
+    if filename.endswith(".parquet"):
+        # pyarrow is only needed for the columnar results
+        from util.resultparquet import read_rows
+        for row in read_rows(filename, columns):
+            yield resolved(row)
+        return
+
+    with open(filename, "r") as file:
+        for row in csv.DictReader(file):
+            if columns is not None:
+                row = {column: row.get(column, "") for column in columns}
+            yield resolved(row)
+
+
 class ResultCSV:
-    def __init__(self, filename: str, append: bool = False):
+    def __init__(self, filename: str, append: bool = False, store_plans: bool = True, store_results: bool = True, store_raw_plans: bool = True):
         self.filename = filename
-        self.filename_current = filename + "_current"
         self.append = append
+        # the callbacks of the results that are not committed yet
+        self.pending = []
+        # plans are deduplicated in a content-addressed store, the csv only refers to them by their key
+        self.plan_store = plan_store(filename) if store_plans else None
+        # the plans as reported by the systems are kept, so that they can be parsed again
+        self.raw_plan_store = plan_store(filename) if store_raw_plans else None
+        # results are deduplicated the same way, the same result of several systems and versions is stored only once
+        self.result_store = result_store(filename) if store_results else None
 
         self.fieldnames = ["title", "dbms", "version", "query", "state"]
         self.metrics = ["client_total", "total", "execution", "compilation"]
@@ -31,16 +104,25 @@ class ResultCSV:
             self.fieldnames.append(metric + "_mean")
             self.fieldnames.append(metric + "_median")
 
-        self.fieldnames.extend(["rows", "message", "extra", "result", "plan"])
+        self.fieldnames.extend(["rows", "message", "extra", "result", "digest", "plan_fingerprint", "plan", "raw_plan", "plan_samples"])
 
     def __enter__(self):
         if os.path.exists(self.filename) and self.append:
             self.append = True
+
+            with open(self.filename, "r") as file:
+                header = next(csv.reader(file), None)
+            if header and header != self.fieldnames:
+                if set(header) <= set(self.fieldnames):
+                    self._upgrade()
+                else:
+                    logger.log_warn(f"{self.filename} has an unknown layout, only writing its existing columns")
+                    self.fieldnames = header
         else:
             self.append = False
         self.file = open(self.filename, "a" if self.append else "w")
 
-        self.writer = csv.DictWriter(self.file, fieldnames=self.fieldnames)
+        self.writer = csv.DictWriter(self.file, fieldnames=self.fieldnames, extrasaction="ignore")
         if not self.append:
             self.writer.writeheader()
             self.file.flush()
@@ -50,11 +132,38 @@ class ResultCSV:
     def __exit__(self, exc_type, exc_val, exc_tb):
         self.file.close()
 
-    def start_olap(self, title: str, query: str):
-        with open(self.filename_current, "w") as file:
-            file.write(f"{title},{query}")
+    def _upgrade(self):
+        """
+        Rewrite results that were written by an older version with the current columns, the new columns stay empty.
+        """
+        logger.log_warn(f"{self.filename} was written by an older version, rewriting it with the current columns")
+        with open(self.filename, "r+") as file:
+            # other processes appending to the results wait for the rewrite
+            fcntl.flock(file, fcntl.LOCK_EX)
+            tmp = self.filename + ".upgrade"
+            with open(tmp, "w") as upgraded:
+                writer = csv.DictWriter(upgraded, fieldnames=self.fieldnames, restval="")
+                writer.writeheader()
+                writer.writerows(csv.DictReader(file))
+            os.replace(tmp, self.filename)
 
-    def olap(self, title: str, dbms: str, version: str, query: str, result: Result):
+    def olap(self, title: str, dbms: str, version: str, query: str, result: Result, committed: Optional[Callable[[], None]] = None):
+        """
+        Write the result of a query.
+
+        Args:
+            committed (Optional[Callable[[], None]]): Called once the result is committed to the results.
+        """
+        if committed is not None:
+            self.pending.append(committed)
+        self.write(self.record(title, dbms, version, query, result))
+
+    def record(self, title: str, dbms: str, version: str, query: str, result: Result) -> dict:
+        """
+        Returns:
+            dict: The columns of the result of a query, with the timings as lists, the extra information as dict, and
+            the result rows and plans stored in their stores.
+        """
         row = {
             "title": title,
             "dbms": dbms,
@@ -63,23 +172,122 @@ class ResultCSV:
             "state": result.state,
             "rows": result.rows,
             "message": result.message.replace("\n", " "),
-            "extra": json.dumps(result.extra, allow_nan=True),
+            "extra": result.extra,
             "result": "" if result.result is None else json.dumps(result.result, use_decimal=True, default=sql_encoder, allow_nan=True),
+            "digest": result.digest or "",
+            "plan_fingerprint": "" if result.plan is None or isinstance(result.plan.plan, str) else plan_fingerprint(result.plan),
             "plan":  "" if result.plan is None else encode_query_plan(result.plan),
+            "raw_plan": "",
+            "plan_samples": [self.plan_sample(sample) for sample in result.plan_samples],
         }
+        if row["result"] and self.result_store is not None:
+            row["result"] = self.result_store.put(row["result"].encode())
+        if row["plan"] and self.plan_store is not None:
+            row["plan"] = self.plan_store.put(row["plan"].encode())
+        if result.plan is not None and result.plan.raw is not None and self.raw_plan_store is not None:
+            row["raw_plan"] = self.raw_plan_store.put(deepjson.dumps(result.plan.raw, cls=json.JSONEncoder, allow_nan=True, use_decimal=True, default=str).encode())
 
         for metric in self.metrics:
             values = getattr(result, metric)
-            row[metric] = json.dumps(values)
+            row[metric] = values
             if len(values) == 0:
                 values = [float('nan')]
             row[metric + "_mean"] = mean(values)
             row[metric + "_median"] = median(values)
+        return row
 
-        self.writer.writerow(row)
-        self.file.flush()
+    def write(self, row: dict):
+        """
+        Append the columns of a result as csv row, lists and dicts are encoded as json.
+        """
+        row = dict(row)
+        row["extra"] = json.dumps(row["extra"], allow_nan=True)
+        row["plan_samples"] = json.dumps(row["plan_samples"], allow_nan=True) if row["plan_samples"] else ""
+        for metric in self.metrics:
+            row[metric] = json.dumps(row[metric])
 
+        # several processes may append to the same csv, rows larger than the buffer are written in several parts
+        fcntl.flock(self.file, fcntl.LOCK_EX)
         try:
-            os.remove(self.filename_current)
-        except Exception:
-            pass
+            self.writer.writerow(row)
+            self.file.flush()
+        finally:
+            fcntl.flock(self.file, fcntl.LOCK_UN)
+        self.commit()
+
+    def commit(self):
+        """
+        Notify the results that are written.
+        """
+        pending, self.pending = self.pending, []
+        for committed in pending:
+            committed()
+
+    def plan_sample(self, sample: dict) -> dict:
+        """
+        Returns:
+            dict: A sample of the plan stability mode with its plan encoded like the plan of the query and its fingerprint.
+        """
+        plan = sample["plan"]
+        encoded = "" if plan is None else encode_query_plan(plan)
+        if encoded and self.plan_store is not None:
+            encoded = self.plan_store.put(encoded.encode())
+        return {
+            "sample": sample["sample"],
+            "state": sample["state"],
+            "client_total": sample["client_total"],
+            "plan_fingerprint": "" if plan is None or isinstance(plan.plan, str) else plan_fingerprint(plan),
+            "plan": encoded,
+        }
+
+
+class JoinOrderCSV:
+    """
+    The runtimes of the forced join orders of the join order exploration, next to the results of the queries.
+    """
+
+    def __init__(self, filename: str):
+        self.filename = filename
+        self.fieldnames = ["title", "dbms", "version", "query", "join_order", "timeout", "state", "client_total", "client_total_median", "optimizer_median"]
+
+    def __enter__(self):
+        append = os.path.exists(self.filename)
+        self.file = open(self.filename, "a" if append else "w")
+        self.writer = csv.DictWriter(self.file, fieldnames=self.fieldnames)
+        if not append:
+            self.writer.writeheader()
+            self.file.flush()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.file.close()
+
+    def _upgrade(self):
+        """
+        Rewrite results that were written by an older version with the current columns, the new columns stay empty.
+        """
+        logger.log_warn(f"{self.filename} was written by an older version, rewriting it with the current columns")
+        with open(self.filename, "r+") as file:
+            # other processes appending to the results wait for the rewrite
+            fcntl.flock(file, fcntl.LOCK_EX)
+            tmp = self.filename + ".upgrade"
+            with open(tmp, "w") as upgraded:
+                writer = csv.DictWriter(upgraded, fieldnames=self.fieldnames, restval="")
+                writer.writeheader()
+                writer.writerows(csv.DictReader(file))
+            os.replace(tmp, self.filename)
+
+    def join_order(self, title: str, dbms: str, version: str, query: str, join_order: list[str], timeout: float, optimizer_median: float, result: Result):
+        self.writer.writerow({
+            "title": title,
+            "dbms": dbms,
+            "version": version,
+            "query": query,
+            "join_order": ",".join(join_order),
+            "timeout": timeout,
+            "state": result.state,
+            "client_total": json.dumps(result.client_total),
+            "client_total_median": median(result.client_total) if result.client_total else float('nan'),
+            "optimizer_median": optimizer_median,
+        })
+        self.file.flush()
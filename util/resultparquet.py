@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+import argparse
+import csv
+import os
+import tempfile
+import time
+import uuid
+from typing import Iterator, List, Optional
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+import simplejson as json
+
+from util import logger
+from util.blobstore import BlobStore
+from util.resultcsv import ResultCSV, plan_store, result_store
+
+
+metrics = ["client_total", "total", "execution", "compilation"]
+
+schema = pa.schema(
+    [(column, pa.string()) for column in ["title", "dbms", "version", "query", "state"]] +
+    [field for metric in metrics for field in [(metric, pa.list_(pa.float64())), (metric + "_mean", pa.float64()), (metric + "_median", pa.float64())]] +
+    [("rows", pa.int64())] +
+    [(column, pa.string()) for column in ["message", "extra", "result", "digest", "plan_fingerprint", "plan", "raw_plan", "plan_samples"]]
+)
+
+
+class ResultParquet(ResultCSV):
+    """
+    Writes the results as a directory of Parquet files, one file per row group of results. The timings are list
+    columns, the result rows and the plans are kept in side stores and only referred to by their key. Every file is
+    written under a hidden name first and renamed when complete, so that a crash never leaves a partial file and
+    several processes can write to the same directory.
+    """
+
+    def __init__(self, filename: str, append: bool = False, store_plans: bool = True, store_results: bool = True, store_raw_plans: bool = True,
+                 row_group_size: int = 32):
+        super().__init__(filename, append=append, store_plans=store_plans, store_results=store_results, store_raw_plans=store_raw_plans)
+        self.row_group_size = row_group_size
+        self.rows = []
+
+    def __enter__(self):
+        if not self.append and os.path.isdir(self.filename):
+            for part in os.listdir(self.filename):
+                os.remove(os.path.join(self.filename, part))
+        os.makedirs(self.filename, exist_ok=True)
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.commit()
+
+    def write(self, row: dict):
+        row = dict(row)
+        row["extra"] = json.dumps(row["extra"], allow_nan=True)
+        row["plan_samples"] = json.dumps(row["plan_samples"], allow_nan=True) if row["plan_samples"] else None
+        for column in ["result", "digest", "plan_fingerprint", "plan", "raw_plan"]:
+            row[column] = row[column] or None
+        self.rows.append(row)
+        if len(self.rows) >= self.row_group_size:
+            self.commit()
+
+    def commit(self):
+        """
+        Write the buffered results as a new Parquet file.
+        """
+        if not self.rows:
+            super().commit()
+            return
+
+        table = pa.Table.from_pylist(self.rows, schema=schema)
+        # files starting with a dot are ignored by readers until they are renamed
+        fd, tmp = tempfile.mkstemp(dir=self.filename, prefix=".", suffix=".parquet")
+        os.close(fd)
+        try:
+            pq.write_table(table, tmp)
+            os.replace(tmp, os.path.join(self.filename, f"part-{time.time_ns()}-{uuid.uuid4().hex[:8]}.parquet"))
+        except Exception:
+            os.remove(tmp)
+            raise
+        self.rows = []
+        super().commit()
+
+
+def read_table(filename: str, columns: Optional[List[str]] = None) -> pa.Table:
+    """
+    Read the committed results of a result directory.
+
+    Args:
+        filename (str): The result directory.
+        columns (Optional[List[str]]): The columns to read (default: all).
+
+    Returns:
+        pa.Table: The results in the order they were committed, the result rows and plans are keys of their stores.
+    """
+    parts = sorted(part for part in os.listdir(filename) if part.startswith("part-") and part.endswith(".parquet")) if os.path.isdir(filename) else []
+    tables = [pq.read_table(os.path.join(filename, part), columns=columns, schema=schema) for part in parts]
+    if not tables:
+        return schema.empty_table() if columns is None else schema.empty_table().select(columns)
+    return pa.concat_tables(tables)
+
+
+def read_rows(filename: str, columns: Optional[List[str]] = None) -> Iterator[dict]:
+    """
+    Read the results of a result directory as rows formatted like the rows of a result csv, i.e., strings with lists
+    encoded as json. The result rows and plans stay keys of their stores.
+
+    Args:
+        filename (str): The result directory.
+        columns (Optional[List[str]]): The columns to read (default: all).
+
+    Returns:
+        Iterator[dict]: The rows, keyed by column.
+    """
+    table = read_table(filename, columns)
+    for row in table.to_pylist():
+        for column, value in row.items():
+            if value is None:
+                row[column] = ""
+            elif isinstance(value, list):
+                row[column] = json.dumps(value)
+            elif not isinstance(value, str):
+                row[column] = str(value)
+        yield row
+
+
+def _transfer(value: str, source: BlobStore, target: BlobStore, inline: str) -> str:
+    """
+    Returns:
+        str: The key of a stored blob after copying it to the store of the target, inline values are kept.
+    """
+    if not value or value.startswith(inline) or source.directory == target.directory:
+        return value
+    return target.put(source.get(value))
+
+
+def convert(source: str, target: str, row_group_size: int = 1024):
+    """
+    Convert results between a result csv and a result directory. Stored results and plans are copied to the stores of
+    the target if its name differs, the plans of the plan samples stay in the store of the source.
+
+    Args:
+        source (str): The result csv or directory (`.parquet`).
+        target (str): The result directory (`.parquet`) or csv.
+        row_group_size (int): The number of results per Parquet file.
+    """
+    plans = (plan_store(source), plan_store(target))
+    results = (result_store(source), result_store(target))
+
+    def transfer(row: dict) -> dict:
+        row["result"] = _transfer(row.get("result"), *results, inline="[")
+        row["plan"] = _transfer(row.get("plan"), *plans, inline="{")
+        row["raw_plan"] = _transfer(row.get("raw_plan"), *plans, inline="{")
+        return row
+
+    if source.endswith(".parquet"):
+        with ResultCSV(target) as result_csv:
+            for row in read_rows(source):
+                result_csv.writer.writerow(transfer(row))
+        return
+
+    with open(source, "r") as file, ResultParquet(target, row_group_size=row_group_size) as result_parquet:
+        for row in csv.DictReader(file):
+            row = {column: value for column, value in row.items() if column in schema.names}
+            for metric in metrics:
+                row[metric] = json.loads(row[metric], allow_nan=True) if row.get(metric) else []
+                for column in [metric + "_mean", metric + "_median"]:
+                    row[column] = float(row[column]) if row.get(column) else None
+            row["rows"] = int(row["rows"]) if row.get("rows") else None
+            row["extra"] = json.loads(row["extra"], allow_nan=True) if row.get("extra") else {}
+            row["plan_samples"] = json.loads(row["plan_samples"], allow_nan=True) if row.get("plan_samples") else []
+            for column in schema.names:
+                row.setdefault(column, "")
+            result_parquet.write(transfer(row))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert benchmark results between a result csv and a columnar result directory (.parquet)")
+    parser.add_argument("source", help="result csv or result directory")
+    parser.add_argument("target", help="result directory or result csv")
+    args = parser.parse_args()
+
+    convert(args.source, args.target)
+    logger.log_driver(f"Converted {args.source} to {args.target}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,254 @@
+import math
+import os
+import socket
+import sqlite3
+import time
+from statistics import median
+from typing import Dict, List, Optional, Set, Tuple
+
+import simplejson as json
+
+from util import logger
+
+_SCHEMA = """
+create table if not exists benchmarks (
+    benchmark text primary key,
+    result_file text not null
+);
+create table if not exists queries (
+    benchmark text not null,
+    title text not null,
+    query text not null,
+    state text not null,
+    median real,
+    primary key (benchmark, title, query)
+);
+create table if not exists totals (
+    benchmark text not null,
+    title text not null,
+    queries integer not null default 0,
+    success integer not null default 0,
+    error integer not null default 0,
+    fatal integer not null default 0,
+    oom integer not null default 0,
+    timeout integer not null default 0,
+    global_timeout integer not null default 0,
+    wrong_result integer not null default 0,
+    global_time real not null default 0,
+    primary key (benchmark, title)
+);
+create table if not exists running (
+    benchmark text not null,
+    title text not null,
+    query text not null,
+    host text not null,
+    pid integer not null,
+    started real not null,
+    -- the execution finished, but the result is not committed yet
+    completed integer not null default 0,
+    primary key (benchmark, title, query)
+);
+"""
+
+# the states that are counted in the totals, in the order of the columns of the totals
+_STATES = ["success", "error", "fatal", "oom", "timeout", "global_timeout", "wrong_result"]
+
+
+def _alive(host: str, pid: int) -> bool:
+    """
+    Returns:
+        bool: Whether the process that claimed a query may still be running. Processes of other hosts cannot be
+        checked and are assumed to be running.
+    """
+    if host != socket.gethostname():
+        return True
+    if pid <= 0:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class ResumeState:
+    """
+    The state of the executed queries of all benchmarks in a result directory, kept in a SQLite file next to the
+    results. It holds the state and median runtime of every executed query together with running totals per system, so
+    that resuming a benchmark does not read the results, and the queries that are currently executed, so that a crash
+    of the benchmark is detected and several processes can run the same benchmark without executing a query twice.
+    """
+
+    # the outcome of claiming a query
+    CLAIMED = "claimed"
+    CRASHED = "crashed"
+    EXECUTED = "executed"
+    RUNNING = "running"
+
+    def __init__(self, filename: str, benchmark: str, result_file: str):
+        self.filename = filename
+        self.benchmark = benchmark
+        self.result_file = result_file
+        self.host = socket.gethostname()
+        self.pid = os.getpid()
+
+    def __enter__(self):
+        # autocommit, transactions are started explicitly
+        self.connection = sqlite3.connect(self.filename, timeout=60, isolation_level=None)
+        # concurrent readers do not block the writer
+        self.connection.execute("pragma journal_mode = wal")
+        self.connection.executescript(_SCHEMA)
+        if "wrong_result" not in [column for _, column, *_ in self.connection.execute("pragma table_info(totals)")]:
+            self.connection.execute("alter table totals add column wrong_result integer not null default 0")
+
+        with self._transaction():
+            row = self.connection.execute("select result_file from benchmarks where benchmark = ?", (self.benchmark,)).fetchone()
+            if not os.path.exists(self.result_file):
+                # a benchmark is registered after its results were created, so they were cleared since
+                if row is not None:
+                    logger.log_warn(f"{self.result_file} was removed, forgetting the executed queries of {self.benchmark}")
+                    self._forget()
+            elif row is None:
+                self._register()
+                self._import()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.connection.close()
+
+    def _transaction(self) -> sqlite3.Connection:
+        # `begin immediate` takes the write lock right away, so that concurrent claims of a query are serialized
+        self.connection.execute("begin immediate")
+        return self.connection
+
+    def _register(self):
+        self.connection.execute("insert or ignore into benchmarks (benchmark, result_file) values (?, ?)", (self.benchmark, self.result_file))
+
+    def _forget(self):
+        for table in ["benchmarks", "queries", "totals"]:
+            self.connection.execute(f"delete from {table} where benchmark = ?", (self.benchmark,))
+        # the claims of running processes stay, so that their queries are not executed twice
+        for title, query, host, pid in self.connection.execute("select title, query, host, pid from running where benchmark = ?", (self.benchmark,)).fetchall():
+            if not _alive(host, pid):
+                self.connection.execute("delete from running where benchmark = ? and title = ? and query = ?", (self.benchmark, title, query))
+
+    def _import(self):
+        """
+        Build the state from the results of an earlier version, once per benchmark.
+        """
+        from util.resultcsv import read_results
+
+        logger.log_driver(f"Indexing the executed queries of {self.result_file}")
+        for row in read_results(self.result_file, columns=["title", "query", "state", "client_total"]):
+            times = [float(x) for x in json.loads(row["client_total"], allow_nan=True)] if row["client_total"] else []
+            self._record(row["title"], row["query"], row["state"], median(times) if times else None)
+
+        # the crash detection of earlier versions
+        current = self.result_file + "_current"
+        if os.path.exists(current):
+            with open(current, "r") as file:
+                title, query = file.readline().split(",")
+            self.connection.execute("insert or replace into running (benchmark, title, query, host, pid, started) values (?, ?, ?, ?, 0, ?)",
+                                    (self.benchmark, title, query, self.host, time.time()))
+            os.remove(current)
+
+    def _record(self, title: str, query: str, state: str, runtime: Optional[float]):
+        previous = self.connection.execute("select state, median from queries where benchmark = ? and title = ? and query = ?",
+                                           (self.benchmark, title, query)).fetchone()
+        self.connection.execute("insert or replace into queries (benchmark, title, query, state, median) values (?, ?, ?, ?, ?)",
+                                (self.benchmark, title, query, state, runtime))
+        self.connection.execute("insert or ignore into totals (benchmark, title) values (?, ?)", (self.benchmark, title))
+
+        # a query that is executed again replaces its previous result in the totals
+        for sign, (s, m) in [(-1, previous), (1, (state, runtime))] if previous is not None else [(1, (state, runtime))]:
+            updates = ["queries = queries + ?"]
+            values = [sign]
+            if s in _STATES:
+                updates.append(f"{s} = {s} + ?")
+                values.append(sign)
+            if s not in ["fatal", "global_timeout"] and m is not None:
+                updates.append("global_time = global_time + ?")
+                values.append(sign * m)
+            self.connection.execute(f"update totals set {', '.join(updates)} where benchmark = ? and title = ?", (*values, self.benchmark, title))
+
+    def executed_queries(self) -> Dict[str, Set[str]]:
+        """
+        Returns:
+            Dict[str, Set[str]]: The executed queries per title.
+        """
+        executed = {}
+        for title, query in self.connection.execute("select title, query from queries where benchmark = ?", (self.benchmark,)):
+            executed.setdefault(title, set()).add(query)
+        return executed
+
+    def totals(self, title: str) -> dict:
+        """
+        Returns:
+            dict: The number of executed queries, the number of queries per state, the sum of their medians
+            (`global_time`), and the medians of the queries that count towards the runtime (`times`) of a system.
+        """
+        columns = ["queries", *_STATES, "global_time"]
+        row = self.connection.execute(f"select {', '.join(columns)} from totals where benchmark = ? and title = ?", (self.benchmark, title)).fetchone()
+        totals = dict(zip(columns, row)) if row is not None else {column: 0 for column in columns}
+        totals["times"] = [runtime for runtime, in self.connection.execute(
+            "select median from queries where benchmark = ? and title = ? and state not in ('fatal', 'global_timeout', 'wrong_result') and median is not null", (self.benchmark, title))]
+        return totals
+
+    def crashed(self) -> List[Tuple[str, str]]:
+        """
+        Returns:
+            List[Tuple[str, str]]: The title and query of the queries whose execution did not finish and whose process
+            is gone.
+        """
+        rows = self.connection.execute("select title, query, host, pid from running where benchmark = ? and not completed", (self.benchmark,)).fetchall()
+        return [(title, query) for title, query, host, pid in rows if not _alive(host, pid)]
+
+    def claim(self, title: str, query: str) -> str:
+        """
+        Claim a query before executing it.
+
+        Returns:
+            str: CLAIMED if the query can be executed, CRASHED if it can be executed but crashed the system in its last
+            execution, EXECUTED if it was executed in the meantime, and RUNNING if another process is executing it.
+        """
+        with self._transaction():
+            if self.connection.execute("select 1 from queries where benchmark = ? and title = ? and query = ?", (self.benchmark, title, query)).fetchone():
+                return ResumeState.EXECUTED
+
+            self._register()
+            claim = ResumeState.CLAIMED
+            row = self.connection.execute("select host, pid, completed from running where benchmark = ? and title = ? and query = ?",
+                                          (self.benchmark, title, query)).fetchone()
+            if row is not None:
+                host, pid, completed = row
+                if (host, pid) != (self.host, self.pid) and _alive(host, pid):
+                    return ResumeState.RUNNING
+                # a query whose result was lost before it was committed is executed again
+                if not completed:
+                    claim = ResumeState.CRASHED
+
+            self.connection.execute("insert or replace into running (benchmark, title, query, host, pid, started) values (?, ?, ?, ?, ?, ?)",
+                                    (self.benchmark, title, query, self.host, self.pid, time.time()))
+            return claim
+
+    def complete(self, title: str, query: str):
+        """
+        Mark the execution of a claimed query as finished, before its result is written to the results.
+        """
+        self.connection.execute("update running set completed = 1 where benchmark = ? and title = ? and query = ?", (self.benchmark, title, query))
+
+    def finish(self, title: str, query: str, state: str, runtime: float):
+        """
+        Record the result of a claimed query, after it was committed to the results.
+
+        Args:
+            title (str): The title of the system.
+            query (str): The name of the query.
+            state (str): The state of the result.
+            runtime (float): The median runtime (ms), NaN if the query was not executed.
+        """
+        with self._transaction():
+            self._record(title, query, state, None if math.isnan(runtime) else runtime)
+            self.connection.execute("delete from running where benchmark = ? and title = ? and query = ?", (self.benchmark, title, query))
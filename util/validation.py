@@ -0,0 +1,263 @@
+import re
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import simplejson as json
+
+from dbms.dbms import Result
+from util import logger
+from util.digest import normalize
+from util.golden import GoldenResults
+from util.resultcsv import read_results, result_store
+
+_COMMENT = re.compile(r"--[^\n]*|/\*.*?\*/", re.DOTALL)
+_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_ORDER_BY = re.compile(r"\border\s+by\b", re.IGNORECASE)
+_TIMESTAMP = re.compile(r"^(\d{4}-\d{2}-\d{2})[T ](\d{2}:\d{2}:\d{2})(?:\.(\d*))?$")
+
+
+def is_ordered(query: str) -> bool:
+    """
+    Returns:
+        bool: Whether the result of a query is ordered, i.e., whether it has an order by clause outside of subqueries.
+    """
+    query = _LITERAL.sub("''", _COMMENT.sub(" ", query))
+    depth = 0
+    top_level = []
+    for c in query:
+        if c == "(":
+            depth += 1
+        elif c == ")":
+            depth -= 1
+        top_level.append(c if depth == 0 and c != ")" else " ")
+    return _ORDER_BY.search("".join(top_level)) is not None
+
+
+def _normalize_text(value) -> Optional[str]:
+    """
+    Returns:
+        Optional[str]: A non-numeric value normalized like for the digest, with timestamps at midnight reduced to their
+        date and without trailing zeros of fractional seconds, as the systems differ in their date and timestamp types.
+    """
+    value = normalize(value)
+    if value is None:
+        return None
+    if isinstance(value, list):
+        return json.dumps(value)
+    match = _TIMESTAMP.match(value)
+    if match:
+        date, time, fraction = match.groups()
+        fraction = (fraction or "").rstrip("0")
+        if time == "00:00:00" and not fraction:
+            return date
+        return f"{date}T{time}" + (f".{fraction}" if fraction else "")
+    return value
+
+
+def _columns(rows: List[list], width: int) -> List[pd.Series]:
+    return [pd.Series([row[i] for row in rows], dtype=object) for i in range(width)]
+
+
+def _numeric(expected: pd.Series, actual: pd.Series) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    """
+    Returns:
+        Optional[Tuple[np.ndarray, np.ndarray]]: The values of a column of both results as floats with NaN for NULL, if
+        all values of the column are numbers or numeric strings, e.g., decimals returned as strings.
+    """
+    converted = []
+    for column in [expected, actual]:
+        values = column.map(lambda v: float(v) if isinstance(v, bool) else v)
+        numbers = pd.to_numeric(values, errors="coerce")
+        if (numbers.isna() & values.notna()).any():
+            return None
+        converted.append(numbers.to_numpy(dtype=np.float64))
+    return converted[0], converted[1]
+
+
+def _show(value) -> str:
+    return "NULL" if pd.isna(value) else repr(value.item() if isinstance(value, np.generic) else value)
+
+
+def compare_results(expected: List[list], actual: List[list], ordered: bool, relative_tolerance: float = 1e-6, absolute_tolerance: float = 1e-9) -> Optional[str]:
+    """
+    Compare the rows of two results column by column. Numeric columns, including decimals and numeric strings, are
+    compared with a tolerance, all other columns after normalizing their values like for the digest. NULL only equals
+    NULL. Unordered results are sorted first. Ordered results are compared in sequence; if they only match in a
+    different order, they are accepted if a column that is not constant matches in sequence, as rows with equal sort keys
+    may come in any order.
+
+    Args:
+        expected (List[list]): The rows of the reference result.
+        actual (List[list]): The rows of the result to check.
+        ordered (bool): Whether the order of the rows is part of the result.
+        relative_tolerance (float): The relative tolerance of numbers.
+        absolute_tolerance (float): The absolute tolerance of numbers, for values close to zero.
+
+    Returns:
+        Optional[str]: A description of the first difference, None if the results match.
+    """
+    if len(expected) != len(actual):
+        return f"expected {len(expected)} rows, got {len(actual)}"
+    if not expected:
+        return None
+
+    width = len(expected[0])
+    if any(len(row) != width for row in expected) or any(len(row) != width for row in actual):
+        return f"expected {width} columns, got {max(len(row) for row in actual)}"
+
+    columns = []
+    for expected_column, actual_column in zip(_columns(expected, width), _columns(actual, width)):
+        numeric = _numeric(expected_column, actual_column)
+        if numeric is not None:
+            columns.append(numeric)
+        else:
+            columns.append(tuple(column.map(_normalize_text).to_numpy(dtype=object) for column in [expected_column, actual_column]))
+
+    def equal(i: int, expected_order: np.ndarray, actual_order: np.ndarray) -> np.ndarray:
+        e, a = columns[i][0][expected_order], columns[i][1][actual_order]
+        if e.dtype == np.float64:
+            return np.isclose(e, a, rtol=relative_tolerance, atol=absolute_tolerance, equal_nan=True)
+        return (e == a) | (pd.isna(e) & pd.isna(a))
+
+    def differences(expected_order: np.ndarray, actual_order: np.ndarray) -> Optional[str]:
+        for i in range(width):
+            equal_rows = equal(i, expected_order, actual_order)
+            if not equal_rows.all():
+                row = int(np.argmin(equal_rows))
+                return (f"{int((~equal_rows).sum())} rows differ in column {i + 1}, e.g., expected {_show(columns[i][0][expected_order][row])}, "
+                        f"got {_show(columns[i][1][actual_order][row])}")
+        return None
+
+    identity = np.arange(len(expected))
+    if ordered:
+        in_sequence = differences(identity, identity)
+        if in_sequence is None:
+            return None
+
+    # sort by the text columns first, as they are exact, the numbers may differ within the tolerance
+    keys = sorted(range(width), key=lambda i: columns[i][0].dtype == np.float64)
+
+    def order(side: int) -> np.ndarray:
+        frame = pd.DataFrame({str(i): columns[i][side] for i in keys})
+        return frame.sort_values(by=[str(i) for i in keys], na_position="first", kind="mergesort").index.to_numpy()
+
+    unordered = differences(order(0), order(1))
+    if not ordered or unordered is not None:
+        return unordered
+
+    # The same rows in a different order. The sort keys are unknown, but the rows of a correctly ordered result tie
+    # with the reference rows at their position in the sort keys, so at least one column that is not constant has to
+    # match in sequence.
+    for i in range(width):
+        values = columns[i][0]
+        if values.dtype == np.float64:
+            constant = np.isclose(values, values[0], rtol=relative_tolerance, atol=absolute_tolerance, equal_nan=True).all()
+        else:
+            constant = all(value == values[0] or (pd.isna(value) and pd.isna(values[0])) for value in values)
+        if not constant and equal(i, identity, identity).all():
+            return None
+    return f"the rows are in a different order, {in_sequence}"
+
+
+class Validator:
+    """
+    Validates the results of the systems against the results of a reference system or against golden results. Results
+    are only compared if both are complete, i.e., have a digest. Unordered results with equal digests are accepted without
+    looking at the rows, all other results are compared row by row with a tolerance for numbers.
+    """
+
+    def __init__(self, reference: Optional[str] = None, relative_tolerance: float = 1e-6, absolute_tolerance: float = 1e-9,
+                 golden: Optional[GoldenResults] = None):
+        self.reference = reference
+        self.relative_tolerance = relative_tolerance
+        self.absolute_tolerance = absolute_tolerance
+        # the digest and a function returning the rows of the reference result per query
+        self.references: Dict[str, Tuple[str, Callable[[], Optional[list]]]] = {}
+        # the golden results per query, the results of the reference system are added to them
+        self.golden = golden
+        self.golden_results = golden.load() if golden is not None else {}
+
+    def load(self, filename: str):
+        """
+        Load the reference results of an earlier run. The rows are only read if a result has to be compared row by row.
+
+        Args:
+            filename (str): The result csv or directory.
+        """
+        store = result_store(filename)
+
+        def rows(encoded: str) -> Callable[[], Optional[list]]:
+            # inline results are json arrays, everything else is the key of a stored result
+            return lambda: json.loads(encoded if encoded.startswith("[") else store.get(encoded).decode(), use_decimal=True) if encoded else None
+
+        for row in read_results(filename, columns=["title", "query", "state", "digest", "result"], resolve=False):
+            if row["title"] == self.reference and row["state"] == Result.SUCCESS and row["digest"]:
+                self.references[row["query"]] = (row["digest"], rows(row["result"]))
+
+    def add_reference(self, query: str, reference: str, result: Result):
+        """
+        Use a result of the reference system as the reference result of a query, and as its golden result if there is
+        none yet.
+
+        Args:
+            query (str): The name of the query.
+            reference (str): The reference system, e.g., its title and version.
+            result (Result): The result of the reference system.
+        """
+        if result.state != Result.SUCCESS or result.digest is None:
+            return
+
+        # streamed results have no rows
+        rows = result.result if result.result or not result.rows else None
+        self.references[query] = (result.digest, lambda: rows)
+        if self.golden is not None and query not in self.golden_results and self.golden.put(query, reference, result):
+            self.golden_results[query] = self.golden.get(query)
+
+    def expected(self, query: str, title: str) -> Optional[Tuple[str, str, Callable[[], Optional[list]]]]:
+        """
+        Returns:
+            Optional[Tuple[str, str, Callable[[], Optional[list]]]]: The source, the digest, and a function returning the
+            rows of the result a system has to return for a query, None if it is unknown. The results of the reference
+            system are preferred, as they include all rows, the reference system itself is validated against the golden
+            results.
+        """
+        if title != self.reference and query in self.references:
+            return self.reference, *self.references[query]
+        if query in self.golden_results:
+            entry = self.golden_results[query]
+            # the first rows are the complete result for small results
+            complete = entry["head"] is not None and len(entry["head"]) == entry["rows"]
+            return "the golden result", entry["digest"], lambda: entry["head"] if complete else None
+        return None
+
+    def validate(self, query: str, sql: str, title: str, result: Result) -> Optional[str]:
+        """
+        Args:
+            query (str): The name of the query.
+            sql (str): The query, to find out whether its result is ordered.
+            title (str): The title of the system.
+            result (Result): The result to check.
+
+        Returns:
+            Optional[str]: A description of the difference to the expected result, None if the result matches or cannot
+            be compared row by row.
+        """
+        expected = self.expected(query, title)
+        if expected is None or result.digest is None:
+            return None
+
+        source, digest, expected_rows = expected
+        # the digest ignores the order of the rows, ordered results are compared row by row
+        ordered = is_ordered(sql)
+        if digest == result.digest and not ordered:
+            return None
+
+        rows = expected_rows()
+        if rows is None or (not result.result and result.rows):
+            # Streamed results and large golden results can only be compared by their digest, which has no tolerance:
+            # numbers that round differently are not wrong, so the result stays unverified.
+            if digest != result.digest:
+                logger.log_warn(f"Could not verify the result of {query} of {title}, its digest differs from {source} and there are no rows to compare")
+            return None
+        return compare_results(rows, result.result, ordered, self.relative_tolerance, self.absolute_tolerance)